@@ -73,7 +73,7 @@ st.markdown("""
 
 
 # Importar módulos de páginas
-from paginas import dashboard, pacientes, prontuario, partos, internacoes, relatorios, medicos
+from paginas import dashboard, pacientes, prontuario, partos, internacoes, laboratorio, relatorios, medicos
 
 # ============================================================================
 # SIDEBAR - NAVEGAÇÃO
@@ -91,6 +91,7 @@ pagina = st.sidebar.radio(
         "📋 Prontuário",
         "👶 Partos",
         "🛏️ Internações",
+        "🧪 Laboratório",
         "👨‍⚕️ Médicos",
         "📈 Relatórios"
     ],
@@ -133,6 +134,9 @@ elif pagina == "👶 Partos":
 elif pagina == "🛏️ Internações":
     internacoes.render()
 
+elif pagina == "🧪 Laboratório":
+    laboratorio.render()
+
 elif pagina == "👨‍⚕️ Médicos":
     medicos.render()
 
@@ -0,0 +1,327 @@
+"""
+Regras clínicas vetorizadas usadas pela camada de dados.
+
+As funções recebem colunas inteiras (uma linha por paciente ou registro) e
+calculam tudo com operações NumPy, sem laço por linha.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# ESCORE DE ALERTA OBSTÉTRICO (MEOWS)
+# ============================================================================
+
+# Faixas [mín, máx) de gatilho vermelho e amarelo por parâmetro, conforme o
+# MEOWS (Modified Early Obstetric Warning Score). Mínimo inclusivo e máximo
+# exclusivo, para que valores decimais não caiam entre duas faixas; None =
+# sem limite.
+LIMIARES_MEOWS = {
+    'temp': {
+        'vermelho': [(None, 35.0), (38.0, None)],
+        'amarelo': [(35.0, 36.0)],
+    },
+    'pa_sistolica': {
+        'vermelho': [(None, 90), (160, None)],
+        'amarelo': [(90, 101), (150, 160)],
+    },
+    'pa_diastolica': {
+        'vermelho': [(101, None)],
+        'amarelo': [(90, 101)],
+    },
+    'fr': {
+        'vermelho': [(None, 10), (30, None)],
+        'amarelo': [(21, 30)],
+    },
+    'fc': {
+        'vermelho': [(None, 40), (120, None)],
+        'amarelo': [(40, 51), (100, 120)],
+    },
+}
+
+NIVEIS_MEOWS = ['Normal', 'Atenção', 'Alerta']
+
+
+def _na_faixa(valores: np.ndarray, faixas: list) -> np.ndarray:
+    dentro = np.zeros(len(valores), dtype=bool)
+    for minimo, maximo in faixas:
+        faixa = ~np.isnan(valores)
+        if minimo is not None:
+            faixa &= valores >= minimo
+        if maximo is not None:
+            faixa &= valores < maximo
+        dentro |= faixa
+    return dentro
+
+
+def calcular_meows(sinais: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gatilhos MEOWS para cada linha de `sinais` (colunas pa_sistolica,
+    pa_diastolica, fc, temp, fr).
+
+    Retorna amarelos, vermelhos, pontuação (2 por vermelho, 1 por amarelo)
+    e nível: 'Alerta' com um gatilho vermelho ou dois amarelos, 'Atenção'
+    com um amarelo e 'Normal' sem gatilhos. Valores ausentes não disparam.
+    """
+    amarelos = np.zeros(len(sinais), dtype=np.int64)
+    vermelhos = np.zeros(len(sinais), dtype=np.int64)
+
+    for parametro, faixas in LIMIARES_MEOWS.items():
+        valores = pd.to_numeric(sinais[parametro], errors='coerce').to_numpy(dtype=float)
+        vermelho = _na_faixa(valores, faixas['vermelho'])
+        vermelhos += vermelho
+        amarelos += _na_faixa(valores, faixas['amarelo']) & ~vermelho
+
+    nivel = np.select(
+        [(vermelhos >= 1) | (amarelos >= 2), amarelos == 1],
+        ['Alerta', 'Atenção'],
+        default='Normal'
+    )
+
+    return pd.DataFrame({
+        'amarelos': amarelos,
+        'vermelhos': vermelhos,
+        'pontuacao': 2 * vermelhos + amarelos,
+        'nivel': nivel,
+    }, index=sinais.index)
+
+
+# ============================================================================
+# RESULTADOS DE EXAMES
+# ============================================================================
+
+# Analitos numéricos reconhecidos nos laudos: rótulo normalizado ->
+# (nome, unidade padrão, mínimo e máximo de referência na gestação)
+ANALITOS = {
+    'hb': ('Hemoglobina', 'g/dL', 11.0, 16.0),
+    'ht': ('Hematócrito', '%', 33.0, 45.0),
+    'leuc': ('Leucócitos', '/mm³', 4000.0, 15000.0),
+    'glicemia': ('Glicemia', 'mg/dL', 65.0, 92.0),
+    'ila': ('ILA', 'cm', 5.0, 25.0),
+    'peso estimado': ('Peso fetal estimado', 'g', None, None),
+}
+
+# Trechos do laudo separados por "|" ou ", " (vírgula decimal fica intacta)
+SEPARADOR_RESULTADOS = r'\s*\|\s*|,\s+'
+
+# "Hb: 11.2", "Ht: 35%", "95 mg/dL", "ILA 12.3cm", "peso estimado 3000g"
+PADRAO_RESULTADO = r'^(?P<rotulo>[^\d:]*):?\s*(?P<valor>\d+(?:[.,]\d+)?)\s*(?P<unidade>\S*)$'
+
+
+def referencia_analito(analito: str) -> tuple:
+    """(mínimo, máximo) de referência do analito pelo nome ((None, None) se não houver)."""
+    for nome, _, minimo, maximo in ANALITOS.values():
+        if nome == analito:
+            return minimo, maximo
+    return None, None
+
+
+def extrair_resultados(exames: pd.DataFrame) -> pd.DataFrame:
+    """
+    Valores numéricos dos laudos em texto livre, uma linha por analito:
+    posição do exame em `exames`, analito, valor, unidade e se está fora da
+    faixa de referência. Trechos sem número ("Feto único", "Proteinúria +")
+    são ignorados; um valor sem rótulo ("95 mg/dL") recebe o nome do exame.
+    """
+    textos = exames['resultado'].fillna('').astype(str).reset_index(drop=True)
+    # Só laudos com algum número passam pelo split/regex (a maioria é só texto)
+    textos = textos[textos.str.contains(r'\d', regex=True)]
+    trechos = textos.str.split(SEPARADOR_RESULTADOS, regex=True).explode()
+    partes = trechos.str.strip().str.extract(PADRAO_RESULTADO)
+    partes = partes[partes['valor'].notna()]
+
+    posicoes = partes.index.to_numpy(dtype=np.int64)
+    tipos = exames['tipo'].astype(str).str.lower().to_numpy()[posicoes]
+    rotulos = partes['rotulo'].fillna('').str.strip().str.lower().to_numpy(dtype=object)
+    rotulos = pd.Series(np.where(rotulos == '', tipos, rotulos))
+
+    nomes = {rotulo: a[0] for rotulo, a in ANALITOS.items()}
+    unidades = {rotulo: a[1] for rotulo, a in ANALITOS.items()}
+    minimos = rotulos.map({rotulo: a[2] for rotulo, a in ANALITOS.items()}).to_numpy(dtype=float)
+    maximos = rotulos.map({rotulo: a[3] for rotulo, a in ANALITOS.items()}).to_numpy(dtype=float)
+
+    unidade = partes['unidade'].fillna('').to_numpy(dtype=object)
+    valores = partes['valor'].str.replace(',', '.', regex=False).astype(float).to_numpy()
+
+    return pd.DataFrame({
+        'posicao': posicoes,
+        'analito': rotulos.map(nomes).fillna(rotulos.str.capitalize()).to_numpy(dtype=object),
+        'valor': valores,
+        'unidade': np.where(unidade == '', rotulos.map(unidades).fillna('').to_numpy(dtype=object), unidade),
+        'alterado': (valores < minimos) | (valores > maximos),
+    })
+
+
+# ============================================================================
+# CLASSIFICAÇÃO DE ROBSON
+# ============================================================================
+
+APRESENTACOES = ['Cefálica', 'Pélvica', 'Transversa']
+INICIOS_TRABALHO_PARTO = ['Espontâneo', 'Induzido', 'Cesárea antes do TP']
+
+GRUPOS_ROBSON = {
+    1: 'Nulípara, feto único cefálico, ≥37 sem, TP espontâneo',
+    2: 'Nulípara, feto único cefálico, ≥37 sem, induzido ou cesárea antes do TP',
+    3: 'Multípara sem cesárea anterior, feto único cefálico, ≥37 sem, TP espontâneo',
+    4: 'Multípara sem cesárea anterior, feto único cefálico, ≥37 sem, induzido ou cesárea antes do TP',
+    5: 'Com cesárea anterior, feto único cefálico, ≥37 sem',
+    6: 'Nulípara, feto único pélvico',
+    7: 'Multípara, feto único pélvico (inclui cesárea anterior)',
+    8: 'Gestação múltipla (inclui cesárea anterior)',
+    9: 'Situação transversa ou oblíqua (inclui cesárea anterior)',
+    10: 'Feto único cefálico, <37 sem (inclui cesárea anterior)',
+}
+
+
+def classificar_robson(partos: pd.DataFrame) -> np.ndarray:
+    """
+    Grupo de Robson (1 a 10) de cada parto. Colunas usadas: partos_anteriores,
+    cesarea_anterior, fetos, apresentacao, ig_semanas e inicio_trabalho_parto.
+
+    Dados ausentes caem na situação mais comum: nenhum parto anterior,
+    feto único, apresentação cefálica, termo e trabalho de parto espontâneo.
+    """
+    cicatriz = (partos['cesarea_anterior'] == True).to_numpy()
+    anteriores = pd.to_numeric(partos['partos_anteriores'], errors='coerce').fillna(0).to_numpy()
+    nulipara = (anteriores == 0) & ~cicatriz
+    multipla = pd.to_numeric(partos['fetos'], errors='coerce').fillna(1).to_numpy() > 1
+    transversa = (partos['apresentacao'] == 'Transversa').to_numpy(dtype=bool)
+    pelvica = (partos['apresentacao'] == 'Pélvica').to_numpy(dtype=bool)
+    pretermo = pd.to_numeric(partos['ig_semanas'], errors='coerce').to_numpy(dtype=float) < 37
+    espontaneo = (partos['inicio_trabalho_parto'].fillna('Espontâneo') == 'Espontâneo').to_numpy(dtype=bool)
+
+    # A ordem das condições segue a precedência da classificação
+    return np.select(
+        [
+            multipla,
+            transversa,
+            pelvica & nulipara,
+            pelvica,
+            pretermo,
+            cicatriz,
+            nulipara & espontaneo,
+            nulipara,
+            espontaneo,
+        ],
+        [8, 9, 6, 7, 10, 5, 1, 2, 3],
+        default=4
+    )
+
+
+# ============================================================================
+# CRESCIMENTO NEONATAL
+# ============================================================================
+
+# Semanas de IG com valor de referência; entre elas os valores são interpolados
+SEMANAS_REFERENCIA = [24, 26, 28, 30, 32, 34, 36, 37, 38, 39, 40, 41, 42]
+
+# Mediana e desvio-padrão ao nascer por medida, sexo e semana de
+# SEMANAS_REFERENCIA (valores aproximados das curvas de Fenton). Para usar a
+# tabela oficial do serviço basta substituir os números.
+REFERENCIA_CRESCIMENTO = {
+    'peso': {  # g
+        'Masculino': {
+            'mediana': [680, 900, 1150, 1450, 1800, 2250, 2700, 2950, 3150, 3350, 3500, 3650, 3750],
+            'dp': [100, 140, 190, 250, 300, 360, 420, 430, 440, 440, 450, 450, 460],
+        },
+        'Feminino': {
+            'mediana': [630, 850, 1080, 1370, 1720, 2150, 2600, 2850, 3050, 3250, 3400, 3520, 3620],
+            'dp': [95, 135, 180, 240, 290, 350, 410, 420, 430, 430, 440, 440, 450],
+        },
+    },
+    'comprimento': {  # cm
+        'Masculino': {
+            'mediana': [31.0, 34.0, 36.5, 39.0, 41.5, 44.0, 46.5, 47.5, 48.5, 49.5, 50.5, 51.0, 51.5],
+            'dp': [1.8, 1.9, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0],
+        },
+        'Feminino': {
+            'mediana': [30.5, 33.4, 35.9, 38.4, 40.9, 43.4, 45.9, 46.9, 47.9, 48.9, 49.8, 50.3, 50.8],
+            'dp': [1.8, 1.9, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0],
+        },
+    },
+    'perimetro_cefalico': {  # cm
+        'Masculino': {
+            'mediana': [22.0, 24.0, 25.8, 27.5, 29.2, 31.0, 32.6, 33.3, 34.0, 34.5, 35.0, 35.4, 35.7],
+            'dp': [1.2, 1.2, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3],
+        },
+        'Feminino': {
+            'mediana': [21.5, 23.5, 25.3, 27.0, 28.7, 30.5, 32.1, 32.8, 33.5, 34.0, 34.5, 34.9, 35.2],
+            'dp': [1.2, 1.2, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3, 1.3],
+        },
+    },
+}
+
+# Percentis de peso que delimitam PIG (pequeno) e GIG (grande para a IG)
+PERCENTIL_PIG = 10
+PERCENTIL_GIG = 90
+
+# (medida, sexo) -> (semanas, medianas, dps) como vetores, montados uma vez
+_tabelas_crescimento = None
+
+
+def _get_tabelas_crescimento() -> dict:
+    global _tabelas_crescimento
+    if _tabelas_crescimento is None:
+        semanas = np.asarray(SEMANAS_REFERENCIA, dtype=float)
+        _tabelas_crescimento = {
+            (medida, sexo): (semanas, np.asarray(ref['mediana'], dtype=float), np.asarray(ref['dp'], dtype=float))
+            for medida, por_sexo in REFERENCIA_CRESCIMENTO.items()
+            for sexo, ref in por_sexo.items()
+        }
+    return _tabelas_crescimento
+
+
+def referencia_crescimento(medida: str, sexo: str, ig_semanas: float) -> tuple:
+    """(mediana, dp) da medida ao nascer para o sexo e a IG, interpolados na referência."""
+    semanas, medianas, dps = _get_tabelas_crescimento()[(medida, sexo)]
+    return float(np.interp(ig_semanas, semanas, medianas)), float(np.interp(ig_semanas, semanas, dps))
+
+
+def _normal_acumulada(z: np.ndarray) -> np.ndarray:
+    """Φ(z) pela aproximação de erf de Abramowitz-Stegun (erro < 1,5e-7)."""
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    polinomio = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - polinomio * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+def avaliar_crescimento(rns: pd.DataFrame) -> pd.DataFrame:
+    """
+    Escore z e percentil de peso, comprimento e perímetro cefálico de cada
+    RN (colunas sexo, ig_semanas e as medidas), ajustados por sexo e IG com
+    interpolação linear na referência. Sem sexo conhecido ou com IG fora da
+    tabela o RN fica sem avaliação (NaN).
+
+    classificacao_peso: 'PIG' abaixo do P10, 'GIG' acima do P90, 'AIG' entre
+    eles.
+    """
+    tabelas = _get_tabelas_crescimento()
+    ig = pd.to_numeric(rns['ig_semanas'], errors='coerce').to_numpy(dtype=float)
+    sexo = rns['sexo'].to_numpy(dtype=object)
+    dentro = (ig >= SEMANAS_REFERENCIA[0]) & (ig <= SEMANAS_REFERENCIA[-1])
+
+    resultado = {}
+    for medida in REFERENCIA_CRESCIMENTO:
+        valores = pd.to_numeric(rns[medida], errors='coerce').to_numpy(dtype=float)
+        mediana = np.full(len(rns), np.nan)
+        dp = np.full(len(rns), np.nan)
+        for (medida_ref, sexo_ref), (semanas, medianas, dps) in tabelas.items():
+            if medida_ref != medida:
+                continue
+            linhas = (sexo == sexo_ref) & dentro
+            mediana[linhas] = np.interp(ig[linhas], semanas, medianas)
+            dp[linhas] = np.interp(ig[linhas], semanas, dps)
+
+        z = (valores - mediana) / dp
+        resultado[f'z_{medida}'] = z
+        resultado[f'percentil_{medida}'] = 100 * _normal_acumulada(z)
+
+    percentil = resultado['percentil_peso']
+    resultado['classificacao_peso'] = np.select(
+        [percentil < PERCENTIL_PIG, percentil > PERCENTIL_GIG, percentil >= PERCENTIL_PIG],
+        ['PIG', 'GIG', 'AIG'],
+        default=None
+    )
+    return pd.DataFrame(resultado, index=rns.index)
@@ -7,8 +7,19 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
+import threading
 from faker import Faker
 
+from indices import (
+    IndiceTexto, IndiceCPF, IndiceFaixa, IndiceBitmap, IndiceAgrupado, FilaPrioridade,
+    IndiceInvertido,
+    normalizar_texto, normalizar_serie, normalizar_cpf
+)
+from clinico import (
+    calcular_meows, extrair_resultados, classificar_robson, avaliar_crescimento, referencia_crescimento,
+    APRESENTACOES, GRUPOS_ROBSON
+)
+
 fake = Faker('pt_BR')
 
 # Seed para reprodutibilidade
@@ -48,6 +59,11 @@ MEDICOS = [
 
 ESPECIALIDADES = ['Obstetrícia', 'Neonatologia', 'Anestesiologia', 'Pediatria', 'Ginecologia']
 
+# IG no parto em semanas completas (28 a 42) e peso de cada uma no sorteio:
+# cerca de 12% de partos pré-termo
+SEMANAS_PARTO = list(range(28, 43))
+PESOS_SEMANAS_PARTO = [1, 1, 1, 1, 1, 1, 2, 2, 2, 8, 18, 25, 22, 12, 3]
+
 LEITOS = [
     {'id': f'PP-{i:02d}', 'setor': 'Pré-parto', 'tipo': 'Enfermaria'} for i in range(1, 11)
 ] + [
@@ -102,21 +118,32 @@ def gerar_paciente(id_paciente: int) -> dict:
     }
 
 
-def gerar_recem_nascido(id_rn: int, id_mae: int, nome_mae: str, data_parto: datetime) -> dict:
-    """Gera dados de um recém-nascido."""
+def gerar_recem_nascido(id_rn: int, id_parto: int, id_mae: int, nome_mae: str, data_parto: datetime,
+                        ig_semanas: float, ordem: int = 0) -> dict:
+    """
+    Gera dados de um recém-nascido (`ordem` numera os gemelares: RN 1, RN 2...).
+    Peso, comprimento e perímetro cefálico são sorteados em torno da
+    referência para o sexo e a IG do parto, com escores z correlacionados.
+    """
     sexo = random.choice(['Masculino', 'Feminino'])
+    z = random.gauss(0, 1)
+    medidas = {}
+    for medida in ('peso', 'comprimento', 'perimetro_cefalico'):
+        mediana, dp = referencia_crescimento(medida, sexo, ig_semanas)
+        medidas[medida] = mediana + dp * (0.8 * z + 0.6 * random.gauss(0, 1))
 
     return {
         'id': id_rn,
+        'id_parto': id_parto,
         'id_mae': id_mae,
         'nome_mae': nome_mae,
-        'nome': f"RN de {nome_mae.split()[0]}",
+        'nome': f"RN {ordem} de {nome_mae.split()[0]}" if ordem else f"RN de {nome_mae.split()[0]}",
         'sexo': sexo,
         'data_nascimento': data_parto,
         'hora_nascimento': f"{random.randint(0, 23):02d}:{random.randint(0, 59):02d}",
-        'peso': random.randint(2500, 4200),  # gramas
-        'comprimento': round(random.uniform(45, 55), 1),  # cm
-        'perimetro_cefalico': round(random.uniform(32, 38), 1),  # cm
+        'peso': int(round(medidas['peso'])),  # gramas
+        'comprimento': round(medidas['comprimento'], 1),  # cm
+        'perimetro_cefalico': round(medidas['perimetro_cefalico'], 1),  # cm
         'apgar_1min': random.randint(6, 10),
         'apgar_5min': random.randint(7, 10),
         'apgar_10min': random.randint(8, 10),
@@ -189,7 +216,7 @@ def gerar_parto(id_parto: int, paciente: dict) -> dict:
     """Gera registro de parto."""
     data_parto = datetime.now() - timedelta(days=random.randint(0, 30))
 
-    return {
+    parto = {
         'id': id_parto,
         'id_paciente': paciente['id'],
         'nome_paciente': paciente['nome'],
@@ -212,6 +239,28 @@ def gerar_parto(id_parto: int, paciente: dict) -> dict:
         'perda_sanguinea_estimada': f"{random.randint(200, 800)} mL",
     }
 
+    # IG e paridade no momento do parto ficam no próprio registro: DUM e
+    # num_partos da paciente descrevem a situação atual dela (o parto
+    # registrado já conta em num_partos)
+    cesarea = parto['tipo_parto'] == 'Cesárea'
+    indicacao = parto['indicacao_cesarea']
+    parto['ig_semanas'] = random.choices(SEMANAS_PARTO, weights=PESOS_SEMANAS_PARTO)[0]
+    parto['ig_dias'] = random.randint(0, 6)
+    parto['partos_anteriores'] = max(paciente['num_partos'] - 1, 1 if indicacao == 'Cesárea anterior' else 0)
+
+    # Variáveis da classificação de Robson, coerentes com a indicação sorteada
+    parto['apresentacao'] = (
+        'Pélvica' if indicacao == 'Apresentação pélvica'
+        else random.choices(APRESENTACOES, weights=[94, 5, 1])[0]
+    )
+    parto['inicio_trabalho_parto'] = (
+        'Induzido' if indicacao == 'Falha de indução'
+        else 'Cesárea antes do TP' if cesarea and random.random() < 0.4
+        else random.choices(['Espontâneo', 'Induzido'], weights=[3, 1])[0]
+    )
+    parto['cesarea_anterior'] = indicacao == 'Cesárea anterior' or (parto['partos_anteriores'] > 0 and random.random() < 0.3)
+    return parto
+
 
 # ============================================================================
 # GERAÇÃO DO DATASET COMPLETO
@@ -254,23 +303,34 @@ def gerar_dados_completos(num_pacientes: int = 50):
             parto = gerar_parto(id_parto, paciente)
             partos.append(parto)
 
-            # Gerar recém-nascido
-            rn = gerar_recem_nascido(
-                id_rn, i, paciente['nome'],
-                datetime.combine(parto['data_parto'], datetime.min.time())
-            )
-            recem_nascidos.append(rn)
+            # Gerar recém-nascido(s): ~3% de gestações gemelares
+            quantidade_rns = 2 if random.random() < 0.03 else 1
+            for ordem in range(1, quantidade_rns + 1):
+                rn = gerar_recem_nascido(
+                    id_rn, id_parto, i, paciente['nome'],
+                    datetime.combine(parto['data_parto'], datetime.min.time()),
+                    parto['ig_semanas'] + parto['ig_dias'] / 7,
+                    ordem if quantidade_rns > 1 else 0
+                )
+                recem_nascidos.append(rn)
+                id_rn += 1
 
             id_parto += 1
-            id_rn += 1
+
+    df_pacientes = pd.DataFrame(pacientes)
+    df_medicos = pd.DataFrame(MEDICOS)
+
+    # Nome normalizado (sem acentos/caixa) usado pelas buscas
+    df_pacientes['nome_normalizado'] = normalizar_serie(df_pacientes['nome'])
+    df_medicos['nome_normalizado'] = normalizar_serie(df_medicos['nome'])
 
     return {
-        'pacientes': pd.DataFrame(pacientes),
+        'pacientes': df_pacientes,
         'recem_nascidos': pd.DataFrame(recem_nascidos),
         'evolucoes': pd.DataFrame(evolucoes),
         'exames': pd.DataFrame(exames),
         'partos': pd.DataFrame(partos),
-        'medicos': pd.DataFrame(MEDICOS),
+        'medicos': df_medicos,
         'leitos': pd.DataFrame(LEITOS),
     }
 
@@ -283,25 +343,1119 @@ def get_dados():
     global _dados_cache
     if _dados_cache is None:
         _dados_cache = gerar_dados_completos(50)
+    if _pacientes_pendentes:
+        _consolidar_pacientes()
+    if _ig_calculada_em != datetime.now().date():
+        _atualizar_idade_gestacional()
     return _dados_cache
 
 
+# ============================================================================
+# VERSÕES DAS TABELAS
+# ============================================================================
+
+# Contador de alterações por tabela (usado para invalidar caches derivados)
+_versoes = {}
+
+
+def get_versao(tabela: str) -> int:
+    """Retorna a versão atual de uma tabela (incrementada a cada escrita)."""
+    return _versoes.get(tabela, 0)
+
+
+def _registrar_alteracao(tabela: str):
+    """Marca uma tabela como alterada."""
+    _versoes[tabela] = _versoes.get(tabela, 0) + 1
+
+
+# ============================================================================
+# IDADE GESTACIONAL
+# ============================================================================
+
+# Dia em que a IG das pacientes foi calculada pela última vez
+_ig_calculada_em = None
+
+
+def calcular_idade_gestacional(dum, hoje=None) -> tuple:
+    """
+    IG em (semanas, dias) a partir das DUMs, numa única passada vetorizada.
+
+    Aceita uma data ou uma coluna/array de datas; DUM ausente resulta em NaN.
+    """
+    hoje = np.datetime64(hoje or datetime.now().date(), 'D')
+    dum = pd.to_datetime(pd.Series(np.atleast_1d(dum)), errors='coerce').to_numpy('datetime64[D]')
+
+    total = (hoje - dum).astype('timedelta64[D]').astype(float)
+    total[np.isnat(dum)] = np.nan
+    return total // 7, total % 7
+
+
+def _atualizar_idade_gestacional():
+    """Recalcula semanas_gestacao e dias_gestacao de todas as pacientes (uma vez por dia)."""
+    global _ig_calculada_em
+    with _lock_escrita:
+        hoje = datetime.now().date()
+        pacientes = _dados_cache['pacientes']
+        semanas, dias = calcular_idade_gestacional(pacientes['dum'], hoje)
+
+        anteriores = pd.to_numeric(pacientes['semanas_gestacao'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        mudou = 'dias_gestacao' not in pacientes or not np.array_equal(anteriores, semanas, equal_nan=True)
+
+        # Inteiros anuláveis: uma DUM ausente não transforma a coluna em float
+        pacientes['semanas_gestacao'] = pd.array(semanas, dtype='Int64')
+        pacientes['dias_gestacao'] = pd.array(dias, dtype='Int64')
+        _ig_calculada_em = hoje
+
+        if mudou:
+            if _indices_pacientes is not None:
+                _indices_pacientes['semanas_gestacao'] = IndiceFaixa(semanas, pacientes.index)
+            _registrar_alteracao('pacientes')
+
+
+# ============================================================================
+# ÍNDICES DE BUSCA DE PACIENTES
+# ============================================================================
+
+# Construídos na primeira busca e mantidos pelas funções de escrita
+_indices_pacientes = None
+
+# Colunas com índice de faixa (numéricas) e bitmap (categóricas)
+COLUNAS_FAIXA_PACIENTES = ['semanas_gestacao', 'idade']
+COLUNAS_BITMAP_PACIENTES = ['status', 'comorbidades', 'medico_responsavel']
+
+
+def _get_indices_pacientes():
+    """Retorna os índices de busca das pacientes (com cache)."""
+    global _indices_pacientes
+    if _indices_pacientes is None:
+        pacientes = get_dados()['pacientes']
+        _indices_pacientes = {
+            'nome': IndiceTexto(pacientes['nome_normalizado'], pacientes.index),
+            'cpf': IndiceCPF(pacientes['cpf'], pacientes.index),
+        }
+        for coluna in COLUNAS_FAIXA_PACIENTES:
+            valores = pd.to_numeric(pacientes[coluna], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            _indices_pacientes[coluna] = IndiceFaixa(valores, pacientes.index)
+        for coluna in COLUNAS_BITMAP_PACIENTES:
+            _indices_pacientes[coluna] = IndiceBitmap(pacientes[coluna], pacientes.index)
+    return _indices_pacientes
+
+
+def _indexar_paciente(posicao: int, paciente: dict = None):
+    """Atualiza os índices de busca para a paciente na posição informada."""
+    if _indices_pacientes is None:
+        return
+    if paciente is None:
+        paciente = get_dados()['pacientes'].loc[posicao]
+    _indices_pacientes['nome'].definir(posicao, paciente['nome_normalizado'])
+    _indices_pacientes['cpf'].definir(posicao, paciente['cpf'])
+    for coluna in COLUNAS_FAIXA_PACIENTES + COLUNAS_BITMAP_PACIENTES:
+        _indices_pacientes[coluna].definir(posicao, paciente[coluna])
+
+
+def buscar_pacientes(nome: str = "", cpf: str = "", limite: int = None) -> pd.DataFrame:
+    """
+    Busca pacientes por trecho do nome e/ou do CPF usando os índices.
+
+    O nome é comparado sem acentos e sem diferenciar maiúsculas (coluna
+    nome_normalizado). Sem nenhum critério retorna todas as pacientes. O resultado segue a ordem
+    de cadastro e pode ser limitado a `limite` linhas (ex.: autocompletar).
+    """
+    pacientes = get_dados()['pacientes']
+    nome = normalizar_texto(nome)
+    cpf = cpf.strip() if cpf else ""
+
+    if not nome and not cpf:
+        return pacientes if limite is None else pacientes.head(limite)
+
+    indices = _get_indices_pacientes()
+    if nome and cpf:
+        posicoes = np.intersect1d(indices['nome'].buscar(nome), indices['cpf'].buscar(cpf))[:limite]
+    elif nome:
+        posicoes = indices['nome'].buscar(nome, limite)
+    else:
+        posicoes = indices['cpf'].buscar(cpf, limite)
+
+    return pacientes.loc[posicoes]
+
+
+# ============================================================================
+# PLANEJADOR DE CONSULTAS DE PACIENTES
+# ============================================================================
+
+STATUS_INTERNADAS = ['Internada', 'Em trabalho de parto', 'Pós-parto']
+
+
+def _planejar_consulta_pacientes(nome: str = "", cpf: str = "", medico: str = None,
+                                 ig: tuple = None, idade: tuple = None,
+                                 alto_risco: bool = False, status: list = None) -> list:
+    """
+    Monta o plano da consulta: lista de predicados (nome, estimativa,
+    materializar, filtrar) ordenada da estimativa mais seletiva para a menos.
+
+    `materializar()` devolve as posições que atendem ao predicado e
+    `filtrar(posicoes)` a máscara do predicado sobre posições já selecionadas.
+    Nome e CPF não têm contagem barata e entram com estimativa zero: quando
+    informados, são quase sempre os mais seletivos.
+    """
+    indices = _get_indices_pacientes()
+    plano = []
+
+    nome = normalizar_texto(nome)
+    if nome:
+        plano.append((
+            'nome', 0,
+            lambda: np.sort(indices['nome'].buscar(nome)),
+            lambda pos: np.isin(pos, indices['nome'].buscar(nome)),
+        ))
+
+    cpf = cpf.strip() if cpf else ""
+    if cpf:
+        plano.append((
+            'cpf', 0,
+            lambda: np.sort(indices['cpf'].buscar(cpf)),
+            lambda pos: np.isin(pos, indices['cpf'].buscar(cpf)),
+        ))
+
+    def bitmap(coluna, valores, negar=False):
+        indice = indices[coluna]
+        return (
+            coluna, indice.contar(valores, negar),
+            lambda: indice.buscar(valores, negar),
+            lambda pos: indice.contem(pos, valores, negar),
+        )
+
+    def faixa(coluna, minimo, maximo):
+        indice = indices[coluna]
+        return (
+            coluna, indice.contar(minimo, maximo),
+            lambda: indice.buscar(minimo, maximo),
+            lambda pos: indice.contem(pos, minimo, maximo),
+        )
+
+    if medico and medico != 'Todos':
+        plano.append(bitmap('medico_responsavel', [medico]))
+    if status:
+        plano.append(bitmap('status', status))
+    if alto_risco:
+        plano.append(bitmap('comorbidades', ['Nenhuma'], negar=True))
+    if ig is not None:
+        plano.append(faixa('semanas_gestacao', *ig))
+    if idade is not None:
+        plano.append(faixa('idade', *idade))
+
+    return sorted(plano, key=lambda predicado: predicado[1])
+
+
+def consultar_pacientes(nome: str = "", cpf: str = "", leito: str = "", medico: str = None,
+                        ig: tuple = None, idade: tuple = None,
+                        alto_risco: bool = False, status: list = None) -> pd.DataFrame:
+    """
+    Busca combinada de pacientes (Busca Avançada).
+
+    O predicado mais seletivo é materializado pelo seu índice; os demais só
+    testam as posições que sobraram, do mais ao menos seletivo, parando se o
+    conjunto ficar vazio. O trecho do leito, sem índice, é aplicado por
+    último. Apenas o resultado final vira DataFrame, na ordem de cadastro.
+
+    `ig` e `idade` são intervalos (mínimo, máximo) inclusivos.
+    """
+    pacientes = get_dados()['pacientes']
+    plano = _planejar_consulta_pacientes(nome, cpf, medico, ig, idade, alto_risco, status)
+
+    if plano:
+        posicoes = plano[0][2]()
+        for _, _, _, filtrar in plano[1:]:
+            if len(posicoes) == 0:
+                break
+            posicoes = posicoes[filtrar(posicoes)]
+    else:
+        posicoes = np.arange(len(pacientes))
+
+    if leito and len(posicoes) > 0:
+        leitos = pd.Series(pacientes['leito'].to_numpy()[posicoes], dtype=object)
+        posicoes = posicoes[leitos.str.contains(leito, case=False, regex=False, na=False).to_numpy()]
+
+    return pacientes.iloc[posicoes]
+
+
+# ============================================================================
+# CONSULTA PAGINADA DE PACIENTES
+# ============================================================================
+
+COLUNAS_ORDENACAO_PACIENTES = ['id', 'nome', 'idade', 'semanas_gestacao', 'convenio', 'status', 'leito', 'medico_responsavel']
+
+# Ordem das linhas por coluna e sentido: (coluna, crescente) -> (versão, posições ordenadas)
+_ordens_pacientes = {}
+
+
+def _ordem_pacientes(coluna: str, crescente: bool = True) -> np.ndarray:
+    """
+    Posições das pacientes ordenadas pela coluna (cache por versão da tabela).
+    Valores ausentes ficam no fim nos dois sentidos.
+    """
+    pacientes = get_dados()['pacientes']
+    versao = (get_versao('pacientes'), len(pacientes))
+
+    guardado = _ordens_pacientes.get((coluna, crescente))
+    if guardado is None or guardado[0] != versao:
+        chave = 'nome_normalizado' if coluna == 'nome' else coluna
+        rotulos = pacientes.sort_values(chave, ascending=crescente, kind='stable', na_position='last').index
+        guardado = (versao, pacientes.index.get_indexer(rotulos))
+        _ordens_pacientes[(coluna, crescente)] = guardado
+    return guardado[1]
+
+
+def listar_pacientes(status: list = None, convenios: list = None, setor: str = None,
+                     ordenar_por: str = 'id', crescente: bool = True,
+                     offset: int = 0, limite: int = 50):
+    """
+    Consulta paginada de pacientes.
+
+    Retorna (pagina, total): apenas as `limite` linhas a partir de `offset`
+    das pacientes que atendem aos filtros, na ordem pedida, e o total de
+    pacientes encontradas. A ordenação por coluna fica em cache até a
+    tabela mudar, então cada página custa um filtro vetorizado e um recorte.
+    """
+    pacientes = get_dados()['pacientes']
+
+    mascara = np.ones(len(pacientes), dtype=bool)
+    if status:
+        mascara &= pacientes['status'].isin(status).to_numpy()
+    if convenios:
+        mascara &= pacientes['convenio'].isin(convenios).to_numpy()
+    if setor and setor != 'Todos':
+        leitos_setor = [l['id'] for l in LEITOS if l['setor'] == setor]
+        mascara &= pacientes['leito'].isin(leitos_setor).to_numpy()
+
+    coluna = ordenar_por if ordenar_por in COLUNAS_ORDENACAO_PACIENTES else 'id'
+    ordem = _ordem_pacientes(coluna, crescente)
+
+    selecionadas = ordem[mascara[ordem]]
+    return pacientes.iloc[selecionadas[offset:offset + limite]], len(selecionadas)
+
+
+# ============================================================================
+# CADASTRO DE PACIENTES
+# ============================================================================
+
+# Escritas concorrentes (várias sessões do Streamlit) passam por este lock
+_lock_escrita = threading.RLock()
+
+# Próximo id por tabela, inicializado a partir do maior id existente
+_sequencias = {}
+
+# Pacientes cadastradas e ainda não incorporadas ao DataFrame. Cada cadastro
+# só acrescenta aqui (O(1)); a próxima leitura via get_dados() incorpora
+# todas as pendentes com um único concat, em vez de um concat por cadastro.
+_pacientes_pendentes = []
+
+
+def _proximo_id(tabela: str) -> int:
+    """Aloca o próximo id da tabela."""
+    with _lock_escrita:
+        if tabela not in _sequencias:
+            df = _dados_cache[tabela]
+            _sequencias[tabela] = int(df['id'].max()) + 1 if len(df) > 0 else 1
+        novo_id = _sequencias[tabela]
+        _sequencias[tabela] += 1
+        return novo_id
+
+
+def _consolidar_pacientes():
+    """Incorpora as pacientes pendentes ao DataFrame de pacientes."""
+    global _pacientes_pendentes
+    with _lock_escrita:
+        if not _pacientes_pendentes:
+            return
+        pendentes, _pacientes_pendentes = _pacientes_pendentes, []
+        pacientes = _dados_cache['pacientes']
+        novas = pd.DataFrame(pendentes, columns=pacientes.columns)
+        novas.index = pd.RangeIndex(len(pacientes), len(pacientes) + len(novas))
+        _dados_cache['pacientes'] = pd.concat([pacientes, novas])
+
+
+def _formatar_cpf(cpf: str) -> str:
+    digitos = normalizar_cpf(cpf)
+    return f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}"
+
+
+def adicionar_paciente(nova_paciente: dict) -> int:
+    """
+    Cadastra uma nova paciente e retorna o id alocado.
+
+    Exige nome e CPF com 11 dígitos, e rejeita CPF já cadastrado (consulta
+    O(1) no índice de CPF). Idade, IG e DPP são calculadas a partir da data
+    de nascimento e da DUM, quando informadas. Levanta ValueError se os
+    dados forem inválidos.
+    """
+    nome = (nova_paciente.get('nome') or '').strip()
+    cpf = nova_paciente.get('cpf') or ''
+    if not nome or not cpf:
+        raise ValueError("Nome e CPF são obrigatórios.")
+    if len(normalizar_cpf(cpf)) != 11:
+        raise ValueError("CPF deve ter 11 dígitos.")
+
+    hoje = datetime.now().date()
+    paciente = {
+        'comorbidades': 'Nenhuma',
+        'alergias': 'Nenhuma',
+        'status': 'Internada',
+        'data_internacao': None,
+        'leito': None,
+        **nova_paciente,
+        'nome': nome,
+        'cpf': _formatar_cpf(cpf),
+        'nome_normalizado': normalizar_texto(nome),
+    }
+
+    if paciente.get('data_nascimento') is not None:
+        paciente['idade'] = (hoje - paciente['data_nascimento']).days // 365
+    if paciente.get('dum') is not None:
+        semanas, dias = divmod((hoje - paciente['dum']).days, 7)
+        paciente['semanas_gestacao'], paciente['dias_gestacao'] = semanas, dias
+        paciente['dpp'] = paciente['dum'] + timedelta(weeks=40)
+
+    if _dados_cache is None:
+        get_dados()
+    with _lock_escrita:
+        indices = _get_indices_pacientes()
+        existente = indices['cpf'].posicao(cpf)
+        if existente is not None:
+            id_existente = _id_na_posicao(existente)
+            raise ValueError(f"CPF já cadastrado (paciente {id_existente}).")
+
+        paciente['id'] = _proximo_id('pacientes')
+        posicao = len(_dados_cache['pacientes']) + len(_pacientes_pendentes)
+        _pacientes_pendentes.append(paciente)
+        _indexar_paciente(posicao, paciente)
+        _registrar_alteracao('pacientes')
+
+    return paciente['id']
+
+
+def _id_na_posicao(posicao: int) -> int:
+    """Id da paciente numa posição (que pode ainda estar pendente)."""
+    pacientes = _dados_cache['pacientes']
+    if posicao < len(pacientes):
+        return int(pacientes['id'].iat[posicao])
+    return _pacientes_pendentes[posicao - len(pacientes)]['id']
+
+
 def atualizar_paciente(id_paciente: int, dados_atualizados: dict):
     """Atualiza dados de um paciente."""
     global _dados_cache
     dados = get_dados()
-    idx = dados['pacientes'][dados['pacientes']['id'] == id_paciente].index
-    if len(idx) > 0:
-        for key, value in dados_atualizados.items():
-            dados['pacientes'].loc[idx[0], key] = value
+    with _lock_escrita:
+        idx = dados['pacientes'][dados['pacientes']['id'] == id_paciente].index
+        if len(idx) > 0:
+            for key, value in dados_atualizados.items():
+                dados['pacientes'].loc[idx[0], key] = value
+            if 'nome' in dados_atualizados:
+                dados['pacientes'].loc[idx[0], 'nome_normalizado'] = normalizar_texto(dados_atualizados['nome'])
+            if dados_atualizados.get('dum') is not None:
+                semanas, dias = divmod((datetime.now().date() - dados_atualizados['dum']).days, 7)
+                dados['pacientes'].loc[idx[0], ['semanas_gestacao', 'dias_gestacao']] = [semanas, dias]
+                dados['pacientes'].loc[idx[0], 'dpp'] = dados_atualizados['dum'] + timedelta(weeks=40)
+            _indexar_paciente(idx[0])
+            _registrar_alteracao('pacientes')
+            if 'comorbidades' in dados_atualizados:
+                _reordenar_exames_paciente(id_paciente)
 
 
 def adicionar_evolucao(nova_evolucao: dict):
     """Adiciona nova evolução ao histórico."""
     global _dados_cache
     dados = get_dados()
-    nova_evolucao['id'] = len(dados['evolucoes']) + 1
-    dados['evolucoes'] = pd.concat([dados['evolucoes'], pd.DataFrame([nova_evolucao])], ignore_index=True)
+    with _lock_escrita:
+        nova_evolucao['id'] = _proximo_id('evolucoes')
+        posicao = len(dados['evolucoes'])
+        dados['evolucoes'] = pd.concat([dados['evolucoes'], pd.DataFrame([nova_evolucao])], ignore_index=True)
+        _indexar_registro_prontuario('evolucoes', posicao, nova_evolucao)
+        _atualizar_meows(nova_evolucao)
+        _indexar_texto_evolucao(posicao, nova_evolucao)
+        _registrar_alteracao('evolucoes')
+
+
+# ============================================================================
+# REGISTROS DO PRONTUÁRIO POR PACIENTE
+# ============================================================================
+
+# Coluna que ordena os registros de cada paciente, por tabela
+CAMPO_DATA_PRONTUARIO = {'evolucoes': 'data_hora', 'exames': 'data_solicitacao'}
+
+# tabela -> IndiceAgrupado (id_paciente -> posições ordenadas por data)
+_indices_prontuario = {}
+
+
+def _instantes(datas) -> np.ndarray:
+    """Datas/horários como inteiros (ns) para ordenação."""
+    return pd.to_datetime(pd.Series(datas)).to_numpy('datetime64[ns]').view(np.int64)
+
+
+def _get_indice_prontuario(tabela: str) -> IndiceAgrupado:
+    """Índice id_paciente -> posições da tabela ordenadas por data (com cache)."""
+    if tabela not in _indices_prontuario:
+        df = get_dados()[tabela]
+        _indices_prontuario[tabela] = IndiceAgrupado(
+            df['id_paciente'], _instantes(df[CAMPO_DATA_PRONTUARIO[tabela]]), df.index
+        )
+    return _indices_prontuario[tabela]
+
+
+def _indexar_registro_prontuario(tabela: str, posicao: int, registro: dict):
+    """Acrescenta um registro recém-inserido ao índice por paciente."""
+    if tabela in _indices_prontuario:
+        instante = _instantes([registro[CAMPO_DATA_PRONTUARIO[tabela]]])[0]
+        _indices_prontuario[tabela].adicionar(registro['id_paciente'], instante, posicao)
+
+
+def _registros_paciente(tabela: str, id_paciente: int, inicio: int = 0, limite: int = None) -> pd.DataFrame:
+    posicoes = _get_indice_prontuario(tabela).buscar(id_paciente, decrescente=True, inicio=inicio, limite=limite)
+    return get_dados()[tabela].iloc[posicoes]
+
+
+def get_evolucoes_paciente(id_paciente: int, inicio: int = 0, limite: int = None) -> pd.DataFrame:
+    """Evoluções da paciente, da mais recente para a mais antiga (opcionalmente paginadas)."""
+    return _registros_paciente('evolucoes', id_paciente, inicio, limite)
+
+
+def contar_evolucoes_paciente(id_paciente: int) -> int:
+    return _get_indice_prontuario('evolucoes').contar(id_paciente)
+
+
+def get_exames_paciente(id_paciente: int, inicio: int = 0, limite: int = None) -> pd.DataFrame:
+    """Exames da paciente, do mais recente para o mais antigo (opcionalmente paginados)."""
+    return _registros_paciente('exames', id_paciente, inicio, limite)
+
+
+def contar_exames_paciente(id_paciente: int) -> int:
+    return _get_indice_prontuario('exames').contar(id_paciente)
+
+
+# (versão da tabela de exames, id_paciente, status) -> exames agrupados por tipo
+_exames_agrupados = {}
+
+
+def exames_paciente_por_tipo(id_paciente: int, status: str = None) -> dict:
+    """
+    Exames da paciente agrupados por tipo em uma única passada (groupby):
+    tipo -> exames do mais recente para o mais antigo, com os tipos na
+    ordem do exame mais recente. Cache por paciente até a tabela mudar.
+    """
+    exames = get_dados()['exames']
+    versao = (get_versao('exames'), len(exames))
+    chave = (versao, id_paciente, status)
+
+    if chave not in _exames_agrupados:
+        for antiga in [k for k in _exames_agrupados if k[0] != versao]:
+            del _exames_agrupados[antiga]
+        registros = get_exames_paciente(id_paciente)
+        if status is not None:
+            registros = registros[registros['status'] == status]
+        _exames_agrupados[chave] = dict(list(registros.groupby('tipo', sort=False)))
+    return _exames_agrupados[chave]
+
+
+def _separar_sinais_vitais(evolucoes: pd.DataFrame) -> pd.DataFrame:
+    """Sinais vitais das evoluções em colunas numéricas, com a PA separada em sistólica e diastólica."""
+    sinais = pd.DataFrame(evolucoes['sinais_vitais'].tolist(), index=evolucoes.index)
+    if sinais.empty:
+        sinais = pd.DataFrame(columns=['pa', 'fc', 'temp', 'fr'])
+
+    pa = sinais['pa'].astype(str).str.split('/', n=1, expand=True).reindex(columns=[0, 1])
+    return pd.DataFrame({
+        'data_hora': evolucoes['data_hora'],
+        'pa_sistolica': pd.to_numeric(pa[0], errors='coerce'),
+        'pa_diastolica': pd.to_numeric(pa[1], errors='coerce'),
+        'fc': pd.to_numeric(sinais['fc'], errors='coerce'),
+        'temp': pd.to_numeric(sinais['temp'], errors='coerce'),
+        'fr': pd.to_numeric(sinais['fr'], errors='coerce'),
+    }, index=evolucoes.index)
+
+
+def sinais_vitais_paciente(id_paciente: int) -> pd.DataFrame:
+    """
+    Série de sinais vitais da paciente em ordem cronológica, com a PA
+    separada em sistólica e diastólica (uma linha por evolução).
+    """
+    evolucoes = get_evolucoes_paciente(id_paciente).iloc[::-1]
+    return _separar_sinais_vitais(evolucoes).reset_index(drop=True)
+
+
+# ============================================================================
+# ESCORE DE ALERTA OBSTÉTRICO (MEOWS)
+# ============================================================================
+
+# Escore da evolução mais recente de cada paciente, indexado por id_paciente.
+# Calculado de uma vez para todas e atualizado a cada nova evolução.
+_meows = None
+
+
+def _calcular_meows(evolucoes: pd.DataFrame) -> pd.DataFrame:
+    sinais = _separar_sinais_vitais(evolucoes)
+    resultado = pd.concat([sinais, calcular_meows(sinais)], axis=1)
+    resultado.index = evolucoes['id_paciente'].to_numpy()
+    resultado.index.name = 'id_paciente'
+    return resultado
+
+
+def get_meows() -> pd.DataFrame:
+    """
+    MEOWS de todas as pacientes a partir da última evolução de cada uma:
+    sinais vitais, gatilhos amarelos/vermelhos, pontuação e nível.
+    """
+    global _meows
+    if _meows is None:
+        evolucoes = get_dados()['evolucoes']
+        ordem = np.argsort(_instantes(evolucoes['data_hora']), kind='stable')
+        ultimas = evolucoes.iloc[ordem].drop_duplicates('id_paciente', keep='last')
+        _meows = _calcular_meows(ultimas)
+    return _meows
+
+
+def meows_paciente(id_paciente: int) -> dict:
+    """MEOWS da última evolução da paciente (None se ela não tem evoluções)."""
+    meows = get_meows()
+    if id_paciente not in meows.index:
+        return None
+    return meows.loc[id_paciente].to_dict()
+
+
+def _atualizar_meows(evolucao: dict):
+    """Recalcula o escore da paciente se a evolução inserida é a mais recente dela."""
+    if _meows is None:
+        return
+    id_paciente = evolucao['id_paciente']
+    if id_paciente in _meows.index:
+        anterior = _instantes([_meows.at[id_paciente, 'data_hora']])[0]
+        if _instantes([evolucao['data_hora']])[0] < anterior:
+            return
+    nivel_anterior = _meows.at[id_paciente, 'nivel'] if id_paciente in _meows.index else None
+    _meows.loc[id_paciente] = _calcular_meows(pd.DataFrame([evolucao])).iloc[0]
+    if _meows.at[id_paciente, 'nivel'] != nivel_anterior:
+        _reordenar_exames_paciente(id_paciente)
+
+
+# ============================================================================
+# BUSCA NO TEXTO DAS EVOLUÇÕES
+# ============================================================================
+
+CAMPOS_TEXTO_EVOLUCOES = ['descricao', 'conduta']
+
+# Índice invertido de descrição e conduta (montado na primeira busca e
+# atualizado a cada nova evolução)
+_indice_texto_evolucoes = None
+
+# (versão da tabela, posições da evolução mais recente para a mais antiga)
+_ordem_evolucoes = None
+
+
+def _get_indice_texto_evolucoes() -> IndiceInvertido:
+    global _indice_texto_evolucoes
+    if _indice_texto_evolucoes is None:
+        evolucoes = get_dados()['evolucoes']
+        _indice_texto_evolucoes = IndiceInvertido(
+            {campo: evolucoes[campo] for campo in CAMPOS_TEXTO_EVOLUCOES}, evolucoes.index
+        )
+    return _indice_texto_evolucoes
+
+
+def _indexar_texto_evolucao(posicao: int, evolucao: dict):
+    if _indice_texto_evolucoes is not None:
+        _indice_texto_evolucoes.definir(posicao, {campo: evolucao.get(campo) for campo in CAMPOS_TEXTO_EVOLUCOES})
+
+
+def _evolucoes_recentes_primeiro() -> np.ndarray:
+    """Posições de todas as evoluções por data decrescente (cache por versão da tabela)."""
+    global _ordem_evolucoes
+    evolucoes = get_dados()['evolucoes']
+    versao = (get_versao('evolucoes'), len(evolucoes))
+    if _ordem_evolucoes is None or _ordem_evolucoes[0] != versao:
+        ordem = np.argsort(_instantes(evolucoes['data_hora']), kind='stable')[::-1]
+        _ordem_evolucoes = (versao, ordem)
+    return _ordem_evolucoes[1]
+
+
+def buscar_evolucoes(consulta: str, id_paciente: int = None, offset: int = 0, limite: int = 50):
+    """
+    Busca por palavras na descrição e na conduta das evoluções, sem
+    diferenciar acentos nem maiúsculas. Aceita frases entre aspas, OU e
+    negação com hífen (ver indices.interpretar_consulta).
+
+    Retorna (pagina, total) como listar_pacientes: as `limite` evoluções a
+    partir de `offset`, da mais recente para a mais antiga, e o total
+    encontrado. Com `id_paciente`, busca só no prontuário dela.
+    """
+    evolucoes = get_dados()['evolucoes']
+    mascara = _get_indice_texto_evolucoes().mapa(consulta)
+
+    if id_paciente is None:
+        ordem = _evolucoes_recentes_primeiro()
+    else:
+        ordem = _get_indice_prontuario('evolucoes').buscar(id_paciente, decrescente=True)
+
+    selecionadas = ordem[mascara[ordem]]
+    return evolucoes.iloc[selecionadas[offset:offset + limite]], len(selecionadas)
+
+
+# ============================================================================
+# RESULTADOS DE EXAMES
+# ============================================================================
+
+# Resultados numéricos dos exames concluídos, uma linha por analito
+# (extraídos dos laudos em texto livre na primeira consulta)
+_resultados_exames = None
+
+# id_paciente -> posições em _resultados_exames ordenadas pela data do resultado
+_indice_resultados = None
+
+
+def _tabela_resultados(exames: pd.DataFrame) -> pd.DataFrame:
+    concluidos = exames[exames['status'] == 'Concluído']
+    resultados = extrair_resultados(concluidos)
+    origem = concluidos.iloc[resultados['posicao'].to_numpy()]
+    return pd.DataFrame({
+        'id_exame': origem['id'].to_numpy(),
+        'id_paciente': origem['id_paciente'].to_numpy(),
+        'tipo': origem['tipo'].to_numpy(),
+        'data_resultado': pd.to_datetime(origem['data_resultado']).to_numpy(),
+        'analito': resultados['analito'].to_numpy(),
+        'valor': resultados['valor'].to_numpy(),
+        'unidade': resultados['unidade'].to_numpy(),
+        'alterado': resultados['alterado'].to_numpy(),
+    })
+
+
+def get_resultados_exames() -> pd.DataFrame:
+    """
+    Resultados tipados dos exames concluídos: id_exame, id_paciente, tipo,
+    data_resultado, analito, valor, unidade e alterado (fora da referência).
+    """
+    global _resultados_exames, _indice_resultados
+    if _resultados_exames is None:
+        _resultados_exames = _tabela_resultados(get_dados()['exames'])
+        _indice_resultados = IndiceAgrupado(
+            _resultados_exames['id_paciente'], _instantes(_resultados_exames['data_resultado']),
+            _resultados_exames.index
+        )
+    return _resultados_exames
+
+
+def resultados_exames_paciente(id_paciente: int, analito: str = None) -> pd.DataFrame:
+    """Resultados numéricos da paciente em ordem cronológica (opcionalmente de um só analito)."""
+    resultados = get_resultados_exames().iloc[_indice_resultados.buscar(id_paciente)]
+    if analito is not None:
+        resultados = resultados[resultados['analito'] == analito]
+    return resultados
+
+
+def resultados_alterados(analito: str = None, ids_pacientes=None) -> pd.DataFrame:
+    """
+    Resultados fora da faixa de referência em todo o hospital, do mais
+    recente para o mais antigo. `ids_pacientes` restringe a um grupo de
+    pacientes (ex.: as internadas).
+    """
+    resultados = get_resultados_exames()
+    filtro = resultados['alterado'].to_numpy()
+    if analito is not None:
+        filtro = filtro & (resultados['analito'] == analito).to_numpy()
+    if ids_pacientes is not None:
+        filtro = filtro & np.isin(resultados['id_paciente'].to_numpy(), np.asarray(list(ids_pacientes)))
+    return resultados[filtro].sort_values('data_resultado', ascending=False, kind='stable')
+
+
+def _indexar_resultados_exame(posicao: int):
+    """Acrescenta os resultados de um exame recém-concluído à tabela de resultados."""
+    global _resultados_exames
+    if _resultados_exames is None:
+        return
+    novos = _tabela_resultados(get_dados()['exames'].iloc[[posicao]])
+    novos.index = pd.RangeIndex(len(_resultados_exames), len(_resultados_exames) + len(novos))
+    _resultados_exames = pd.concat([_resultados_exames, novos])
+    for linha, id_paciente, instante in zip(novos.index, novos['id_paciente'], _instantes(novos['data_resultado'])):
+        _indice_resultados.adicionar(id_paciente, instante, linha)
+
+
+# ============================================================================
+# FILA DE EXAMES DO LABORATÓRIO
+# ============================================================================
+
+URGENCIAS_EXAME = ['Rotina', 'Urgente']
+
+# Quanto cada fator de risco adianta o pedido na fila, como se tivesse sido
+# solicitado antes: pedidos antigos continuam subindo, mas urgências e
+# pacientes de risco passam à frente da rotina recente
+ANTECIPACAO_FILA_EXAMES = {
+    'Urgente': timedelta(days=2),
+    'Alto risco': timedelta(days=1),
+    'MEOWS em alerta': timedelta(days=2),
+}
+
+# Exames pendentes por prioridade (itens = id do exame) e posição de cada
+# um na tabela de exames; construídos no primeiro acesso à fila
+_fila_exames = None
+_posicoes_pendentes = None
+
+
+# Índice id -> posição por tabela. Ids não mudam e linhas só são
+# acrescentadas, então basta reconstruir quando a tabela cresce.
+_ids_tabelas = {}
+
+
+def _posicoes_ids(tabela: str, ids) -> np.ndarray:
+    """Posição de cada id na tabela (-1 se não existir)."""
+    df = get_dados()[tabela]
+    indice = _ids_tabelas.get(tabela)
+    if indice is None or len(indice) != len(df):
+        indice = _ids_tabelas[tabela] = pd.Index(df['id'].to_numpy())
+    return indice.get_indexer(np.asarray(list(ids)))
+
+
+def _posicoes_pacientes(ids) -> np.ndarray:
+    """Posição de cada id na tabela de pacientes (-1 se não existir)."""
+    return _posicoes_ids('pacientes', ids)
+
+
+def _fatores_risco_exames(exames: pd.DataFrame) -> pd.DataFrame:
+    """Fatores de ANTECIPACAO_FILA_EXAMES presentes em cada pedido (colunas booleanas)."""
+    posicoes = _posicoes_pacientes(exames['id_paciente'])
+    alto_risco = np.zeros(len(exames), dtype=bool)
+    encontradas = posicoes >= 0
+    comorbidades = get_dados()['pacientes']['comorbidades'].iloc[posicoes[encontradas]]
+    alto_risco[encontradas] = (comorbidades != 'Nenhuma').to_numpy()
+    urgencia = exames['urgencia'] if 'urgencia' in exames else pd.Series(None, index=exames.index)
+    meows = get_meows()['nivel'].reindex(exames['id_paciente'].to_numpy())
+
+    return pd.DataFrame({
+        'Urgente': (urgencia == 'Urgente').to_numpy(),
+        'Alto risco': alto_risco,
+        'MEOWS em alerta': (meows == 'Alerta').to_numpy(),
+    }, index=exames.index)
+
+
+def _prioridades_exames(exames: pd.DataFrame) -> np.ndarray:
+    """Chave da fila: instante da solicitação menos as antecipações por risco (ns)."""
+    fatores = _fatores_risco_exames(exames)
+    prioridades = _instantes(exames['data_solicitacao'])
+    for fator, antecipacao in ANTECIPACAO_FILA_EXAMES.items():
+        prioridades = prioridades - fatores[fator].to_numpy() * pd.Timedelta(antecipacao).value
+    return prioridades
+
+
+def _get_fila_exames() -> FilaPrioridade:
+    global _fila_exames, _posicoes_pendentes
+    if _fila_exames is None:
+        exames = get_dados()['exames']
+        pendentes = exames[exames['status'] == 'Pendente']
+        _posicoes_pendentes = dict(zip(pendentes['id'].tolist(), pendentes.index.tolist()))
+        _fila_exames = FilaPrioridade(pendentes['id'], _prioridades_exames(pendentes))
+    return _fila_exames
+
+
+def _reordenar_exames_paciente(id_paciente: int):
+    """
+    Recalcula a prioridade dos exames pendentes da paciente na fila, depois
+    de uma mudança nos fatores de risco dela (MEOWS ou comorbidades).
+    """
+    if _fila_exames is None:
+        return
+    exames = get_dados()['exames']
+    posicoes = _get_indice_prontuario('exames').buscar(id_paciente)
+    pendentes = exames.iloc[posicoes]
+    pendentes = pendentes[pendentes['id'].isin(_posicoes_pendentes)]
+    for id_exame, prioridade in zip(pendentes['id'].tolist(), _prioridades_exames(pendentes).tolist()):
+        _fila_exames.atualizar(id_exame, prioridade)
+
+
+def fila_exames_pendentes(inicio: int = 0, limite: int = 50) -> pd.DataFrame:
+    """
+    Exames pendentes do hospital, do mais para o menos prioritário, a partir
+    de `inicio`. Acrescenta a espera em dias e os fatores de risco de cada
+    pedido. Só o topo do heap é percorrido, qualquer que seja o tamanho da fila.
+    """
+    ids = _get_fila_exames().primeiros(inicio + limite)[inicio:]
+    pagina = get_dados()['exames'].iloc[[_posicoes_pendentes[i] for i in ids]]
+
+    fatores = _fatores_risco_exames(pagina)
+    espera = pd.Timestamp(datetime.now().date()) - pd.to_datetime(pagina['data_solicitacao'])
+    return pagina.assign(
+        espera_dias=espera.dt.days.to_numpy(),
+        fatores_risco=[', '.join(f for f in fatores.columns if linha[f]) for linha in fatores.to_dict('records')],
+    )
+
+
+def contar_exames_pendentes() -> int:
+    return len(_get_fila_exames())
+
+
+def solicitar_exame(id_paciente: int, tipo: str, solicitante: str, urgencia: str = 'Rotina',
+                    observacoes: str = '') -> int:
+    """
+    Registra um pedido de exame como 'Pendente', coloca-o na fila do
+    laboratório e retorna o id do exame. Levanta ValueError se a paciente
+    não existir.
+    """
+    dados = get_dados()
+    posicao_paciente = _posicoes_pacientes([id_paciente])[0]
+    if posicao_paciente < 0:
+        raise ValueError(f"Paciente {id_paciente} não encontrada.")
+
+    with _lock_escrita:
+        exame = {
+            'id': _proximo_id('exames'),
+            'id_paciente': id_paciente,
+            'nome_paciente': dados['pacientes']['nome'].iat[posicao_paciente],
+            'tipo': tipo,
+            'data_solicitacao': datetime.now().date(),
+            'data_resultado': None,
+            'resultado': None,
+            'status': 'Pendente',
+            'solicitante': solicitante,
+            'urgencia': urgencia,
+            'observacoes': observacoes,
+        }
+        posicao = len(dados['exames'])
+        dados['exames'] = pd.concat([dados['exames'], pd.DataFrame([exame])], ignore_index=True)
+        _indexar_registro_prontuario('exames', posicao, exame)
+        if _fila_exames is not None:
+            _fila_exames.inserir(exame['id'], _prioridades_exames(pd.DataFrame([exame]))[0])
+            _posicoes_pendentes[exame['id']] = posicao
+        _registrar_alteracao('exames')
+
+    return exame['id']
+
+
+def concluir_exame(id_exame: int, resultado: str):
+    """
+    Registra o resultado de um exame pendente e o retira da fila. Levanta
+    ValueError se o exame não estiver pendente.
+    """
+    fila = _get_fila_exames()
+    with _lock_escrita:
+        if id_exame not in fila:
+            raise ValueError(f"Exame {id_exame} não está pendente.")
+        fila.remover(id_exame)
+        posicao = _posicoes_pendentes.pop(id_exame)
+
+        exames = get_dados()['exames']
+        exames.loc[posicao, ['resultado', 'status', 'data_resultado']] = [resultado, 'Concluído', datetime.now().date()]
+        _indexar_resultados_exame(posicao)
+        _registrar_alteracao('exames')
+
+
+# ============================================================================
+# PARTOS E RECÉM-NASCIDOS
+# ============================================================================
+
+# (versão da tabela de recém-nascidos, índice id_parto -> posições dos RNs)
+_rns_por_parto = None
+
+
+def _get_indice_rns_parto() -> IndiceAgrupado:
+    """Índice id_parto -> recém-nascidos (refeito quando a tabela muda)."""
+    global _rns_por_parto
+    recem_nascidos = get_dados()['recem_nascidos']
+    versao = (get_versao('recem_nascidos'), len(recem_nascidos))
+    if _rns_por_parto is None or _rns_por_parto[0] != versao:
+        _rns_por_parto = (versao, IndiceAgrupado(
+            recem_nascidos['id_parto'], recem_nascidos['id'], recem_nascidos.index
+        ))
+    return _rns_por_parto[1]
+
+
+def get_parto(id_parto: int):
+    """Registro do parto pelo id (consulta no índice id -> posição), ou None."""
+    posicao = _posicoes_ids('partos', [id_parto])[0]
+    return None if posicao < 0 else get_dados()['partos'].iloc[posicao]
+
+
+def recem_nascidos_do_parto(id_parto: int) -> pd.DataFrame:
+    """Recém-nascidos do parto (mais de um em gestações múltiplas), na ordem de nascimento."""
+    return get_dados()['recem_nascidos'].iloc[_get_indice_rns_parto().buscar(id_parto)]
+
+
+# (versão da tabela de partos, índice ordenado de data_parto em dias)
+_datas_partos = None
+
+
+def _dias(datas) -> np.ndarray:
+    """Datas como número de dias (float, NaN se ausente), a chave do índice de datas."""
+    dias = pd.to_datetime(pd.Series(datas)).to_numpy('datetime64[D]')
+    return np.where(np.isnat(dias), np.nan, dias.astype(np.int64))
+
+
+def _get_indice_datas_partos() -> IndiceFaixa:
+    """Índice das datas de parto (refeito quando a tabela muda)."""
+    global _datas_partos
+    partos = get_dados()['partos']
+    versao = (get_versao('partos'), len(partos))
+    if _datas_partos is None or _datas_partos[0] != versao:
+        _datas_partos = (versao, IndiceFaixa(_dias(partos['data_parto']), partos.index))
+    return _datas_partos[1]
+
+
+def _fatia_periodo_partos(inicio=None, fim=None) -> np.ndarray:
+    minimo = None if inicio is None else _dias([inicio])[0]
+    maximo = None if fim is None else _dias([fim])[0]
+    return _get_indice_datas_partos().fatia(minimo, maximo)
+
+
+def partos_no_periodo(inicio=None, fim=None) -> pd.DataFrame:
+    """
+    Partos com data entre `inicio` e `fim` (inclusive; None = sem limite),
+    em ordem de data. Duas buscas binárias no índice e uma fatia: O(log n + k).
+    """
+    return get_dados()['partos'].iloc[_fatia_periodo_partos(inicio, fim)]
+
+
+def contar_partos_periodo(inicio=None, fim=None) -> int:
+    """Quantidade de partos no período, só com as buscas binárias (O(log n))."""
+    return len(_fatia_periodo_partos(inicio, fim))
+
+
+# (versão da tabela, posições dos RNs do nascimento mais recente para o mais antigo)
+_ordem_recem_nascidos = None
+
+
+def _rns_recentes_primeiro() -> np.ndarray:
+    global _ordem_recem_nascidos
+    recem_nascidos = get_dados()['recem_nascidos']
+    versao = (get_versao('recem_nascidos'), len(recem_nascidos))
+    if _ordem_recem_nascidos is None or _ordem_recem_nascidos[0] != versao:
+        ordem = np.argsort(_instantes(recem_nascidos['data_nascimento']), kind='stable')[::-1]
+        _ordem_recem_nascidos = (versao, ordem)
+    return _ordem_recem_nascidos[1]
+
+
+def listar_recem_nascidos(sexos: list = None, alojamento_conjunto: bool = None,
+                          offset: int = 0, limite: int = 25):
+    """
+    Consulta paginada de recém-nascidos, do nascimento mais recente para o
+    mais antigo. Retorna (pagina, total) como listar_pacientes; os filtros
+    são aplicados sobre a tabela inteira e só a página é materializada.
+    """
+    recem_nascidos = get_dados()['recem_nascidos']
+
+    mascara = np.ones(len(recem_nascidos), dtype=bool)
+    if sexos:
+        mascara &= recem_nascidos['sexo'].isin(sexos).to_numpy()
+    if alojamento_conjunto is not None:
+        mascara &= recem_nascidos['alojamento_conjunto'].to_numpy(dtype=bool) == alojamento_conjunto
+
+    ordem = _rns_recentes_primeiro()
+    selecionados = ordem[mascara[ordem]]
+    return recem_nascidos.iloc[selecionados[offset:offset + limite]], len(selecionados)
+
+
+# ============================================================================
+# CLASSIFICAÇÃO DE ROBSON
+# ============================================================================
+
+# (versões de partos e recém-nascidos, grupo de Robson por parto)
+_robson = None
+
+
+def get_robson() -> pd.DataFrame:
+    """
+    Grupo de Robson de todos os partos (colunas id, grupo e cesarea), na
+    ordem da tabela de partos. Usa a paridade e a IG registradas no parto e
+    o número de RNs dele numa passada vetorizada; fica em cache até partos
+    ou recém-nascidos mudarem.
+    """
+    global _robson
+    dados = get_dados()
+    partos = dados['partos']
+    versao = tuple((get_versao(t), len(dados[t])) for t in ('partos', 'recem_nascidos'))
+
+    if _robson is None or _robson[0] != versao:
+        def coluna(nome, padrao=None):
+            return partos[nome] if nome in partos else padrao
+
+        variaveis = pd.DataFrame({
+            'partos_anteriores': coluna('partos_anteriores'),
+            'cesarea_anterior': coluna('cesarea_anterior', False),
+            'fetos': _get_indice_rns_parto().contar_varios(partos['id']),
+            'apresentacao': coluna('apresentacao'),
+            'ig_semanas': coluna('ig_semanas'),
+            'inicio_trabalho_parto': coluna('inicio_trabalho_parto'),
+        }, index=partos.index)
+
+        _robson = (versao, pd.DataFrame({
+            'id': partos['id'],
+            'grupo': classificar_robson(variaveis),
+            'cesarea': (partos['tipo_parto'] == 'Cesárea').to_numpy(),
+        }, index=partos.index))
+    return _robson[1]
+
+
+def resumo_robson() -> pd.DataFrame:
+    """
+    Tabela de Robson, uma linha por grupo: partos, cesáreas, tamanho do
+    grupo (% dos partos), taxa de cesárea no grupo e contribuição do grupo
+    para as cesáreas, absoluta (% dos partos) e relativa (% das cesáreas).
+    """
+    robson = get_robson()
+    grupos = robson['grupo'].to_numpy()
+    partos = np.bincount(grupos, minlength=11)[1:]
+    cesareas = np.bincount(grupos, weights=robson['cesarea'].to_numpy(dtype=float), minlength=11)[1:].astype(int)
+    total_partos = max(len(robson), 1)
+    total_cesareas = max(int(cesareas.sum()), 1)
+
+    return pd.DataFrame({
+        'grupo': list(GRUPOS_ROBSON),
+        'descricao': list(GRUPOS_ROBSON.values()),
+        'partos': partos,
+        'cesareas': cesareas,
+        'tamanho_grupo': 100 * partos / total_partos,
+        'taxa_cesarea': 100 * cesareas / np.maximum(partos, 1),
+        'contribuicao_absoluta': 100 * cesareas / total_partos,
+        'contribuicao_relativa': 100 * cesareas / total_cesareas,
+    })
+
+
+# ============================================================================
+# CRESCIMENTO NEONATAL
+# ============================================================================
+
+# (versões de recém-nascidos e partos, avaliação de crescimento por RN)
+_crescimento_rns = None
+
+
+def get_crescimento_rns() -> pd.DataFrame:
+    """
+    IG ao nascer, escores z, percentis e classificação do peso (PIG, AIG,
+    GIG) de todos os RNs, com o mesmo índice da tabela. A IG é a registrada
+    no parto do RN (id_parto). Calculado de uma vez e guardado até
+    recém-nascidos ou partos mudarem.
+    """
+    global _crescimento_rns
+    dados = get_dados()
+    recem_nascidos = dados['recem_nascidos']
+    versao = tuple((get_versao(t), len(dados[t])) for t in ('recem_nascidos', 'partos'))
+
+    if _crescimento_rns is None or _crescimento_rns[0] != versao:
+        partos = dados['partos']
+        posicoes = _posicoes_ids('partos', recem_nascidos['id_parto'])
+        ig = np.full(len(recem_nascidos), np.nan)
+        if 'ig_semanas' in partos:
+            ig_partos = (
+                pd.to_numeric(partos['ig_semanas'], errors='coerce').to_numpy(dtype=float)
+                + pd.to_numeric(partos['ig_dias'], errors='coerce').fillna(0).to_numpy(dtype=float) / 7
+            )
+            encontrados = posicoes >= 0
+            ig[encontrados] = ig_partos[posicoes[encontrados]]
+
+        medidas = recem_nascidos[['sexo', 'peso', 'comprimento', 'perimetro_cefalico']].assign(ig_semanas=ig)
+        avaliacao = avaliar_crescimento(medidas)
+        avaliacao.insert(0, 'ig_semanas', ig)
+        _crescimento_rns = (versao, avaliacao)
+    return _crescimento_rns[1]
+
+
+def crescimento_rns(rns: pd.DataFrame) -> pd.DataFrame:
+    """Avaliação de crescimento só dos RNs de `rns` (ex.: uma página), com o mesmo índice."""
+    return get_crescimento_rns().loc[rns.index]
 
 
 # ============================================================================
@@ -319,20 +1473,23 @@ def adicionar_medico(nome: str, crm: str, especialidade: str, telefone: str = ""
     global _dados_cache
     dados = get_dados()
 
-    # Gerar novo ID
-    novo_id = int(dados['medicos']['id'].max() + 1) if len(dados['medicos']) > 0 else 1
+    with _lock_escrita:
+        # Gerar novo ID
+        novo_id = _proximo_id('medicos')
 
-    novo_medico = {
-        'id': novo_id,
-        'nome': nome,
-        'crm': crm,
-        'especialidade': especialidade,
-        'telefone': telefone,
-        'email': email,
-        'ativo': True
-    }
+        novo_medico = {
+            'id': novo_id,
+            'nome': nome,
+            'crm': crm,
+            'especialidade': especialidade,
+            'telefone': telefone,
+            'email': email,
+            'ativo': True,
+            'nome_normalizado': normalizar_texto(nome),
+        }
 
-    dados['medicos'] = pd.concat([dados['medicos'], pd.DataFrame([novo_medico])], ignore_index=True)
+        dados['medicos'] = pd.concat([dados['medicos'], pd.DataFrame([novo_medico])], ignore_index=True)
+        _registrar_alteracao('medicos')
     return novo_id
 
 
@@ -340,11 +1497,15 @@ def atualizar_medico(id_medico: int, dados_atualizados: dict):
     """Atualiza dados de um médico."""
     global _dados_cache
     dados = get_dados()
-    idx = dados['medicos'][dados['medicos']['id'] == id_medico].index
-    if len(idx) > 0:
-        for key, value in dados_atualizados.items():
-            dados['medicos'].loc[idx[0], key] = value
-        return True
+    with _lock_escrita:
+        idx = dados['medicos'][dados['medicos']['id'] == id_medico].index
+        if len(idx) > 0:
+            for key, value in dados_atualizados.items():
+                dados['medicos'].loc[idx[0], key] = value
+            if 'nome' in dados_atualizados:
+                dados['medicos'].loc[idx[0], 'nome_normalizado'] = normalizar_texto(dados_atualizados['nome'])
+            _registrar_alteracao('medicos')
+            return True
     return False
 
 
@@ -352,10 +1513,12 @@ def remover_medico(id_medico: int):
     """Remove (desativa) um médico do sistema."""
     global _dados_cache
     dados = get_dados()
-    idx = dados['medicos'][dados['medicos']['id'] == id_medico].index
-    if len(idx) > 0:
-        dados['medicos'].loc[idx[0], 'ativo'] = False
-        return True
+    with _lock_escrita:
+        idx = dados['medicos'][dados['medicos']['id'] == id_medico].index
+        if len(idx) > 0:
+            dados['medicos'].loc[idx[0], 'ativo'] = False
+            _registrar_alteracao('medicos')
+            return True
     return False
 
 
@@ -363,10 +1526,12 @@ def reativar_medico(id_medico: int):
     """Reativa um médico no sistema."""
     global _dados_cache
     dados = get_dados()
-    idx = dados['medicos'][dados['medicos']['id'] == id_medico].index
-    if len(idx) > 0:
-        dados['medicos'].loc[idx[0], 'ativo'] = True
-        return True
+    with _lock_escrita:
+        idx = dados['medicos'][dados['medicos']['id'] == id_medico].index
+        if len(idx) > 0:
+            dados['medicos'].loc[idx[0], 'ativo'] = True
+            _registrar_alteracao('medicos')
+            return True
     return False
 
 
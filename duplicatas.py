@@ -0,0 +1,209 @@
+"""
+Detecção de pacientes possivelmente duplicadas (recadastros).
+
+Comparar todas as pacientes entre si é O(n²). Aqui as pacientes são
+agrupadas em blocos pela data de nascimento + chave fonética do primeiro
+nome, e só os pares dentro do mesmo bloco são pontuados. A similaridade de
+nome (Levenshtein) e de CPF (dígitos coincidentes) é calculada de forma
+vetorizada sobre todos os pares de uma vez.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from dados import get_dados, get_versao
+from indices import normalizar_cpf
+
+
+# Critérios para sugerir a fusão de um par
+LIMIAR_NOME = 0.90            # nomes quase iguais, qualquer CPF
+LIMIAR_NOME_COM_CPF = 0.60    # nomes parecidos...
+LIMIAR_CPF = 0.80             # ...e CPF com no máximo 2 dígitos diferentes
+
+# Pares pontuados por vez (limita a memória das matrizes de distância)
+TAMANHO_LOTE = 50_000
+
+# Pronomes de tratamento ignorados ao extrair o primeiro nome
+PRONOMES = r'^((dr|dra|sr|sra|srta)\.?\s+)+'
+
+# Regras fonéticas aplicadas em ordem sobre o nome normalizado
+REGRAS_FONETICAS = [
+    (r'ph', 'f'), (r'th', 't'), (r'[cs]h', 'x'), (r'lh', 'l'), (r'nh', 'n'),
+    (r'sc([ei])', r's\1'), (r'[qg]u([ei])', lambda m: ('k' if m.group(0)[0] == 'q' else 'g') + m.group(1)),
+    (r'q', 'k'), (r'c([ei])', r's\1'), (r'c', 'k'), (r'g([ei])', r'j\1'),
+    (r'z', 's'), (r'y', 'i'), (r'w', 'v'), (r'h', ''),
+]
+
+
+def chave_fonetica(nome: str) -> str:
+    """
+    Chave fonética simplificada para nomes em português: aproxima grafias
+    com o mesmo som (Luiza/Luisa, Kamilly/Camila, Thaís/Taís) e descarta as
+    vogais depois da primeira letra.
+    """
+    texto = re.sub(r'[^a-z]', '', nome)
+    for padrao, troca in REGRAS_FONETICAS:
+        texto = re.sub(padrao, troca, texto)
+    texto = re.sub(r'(.)\1+', r'\1', texto)
+    if not texto:
+        return ''
+    return texto[0] + re.sub(r'[aeiou]', '', texto[1:])
+
+
+def chaves_foneticas(nomes_normalizados: pd.Series) -> pd.Series:
+    """Chave fonética do primeiro nome para uma coluna inteira (calculada por primeiro nome distinto)."""
+    primeiros = (
+        nomes_normalizados.fillna('').astype(str)
+        .str.replace(PRONOMES, '', regex=True)
+        .str.split(' ', n=1).str[0]
+    )
+    codigos, unicos = pd.factorize(primeiros)
+    chaves = np.asarray([chave_fonetica(n) for n in unicos] + [''], dtype=object)
+    return pd.Series(chaves[codigos], index=nomes_normalizados.index, dtype=object)
+
+
+# ============================================================================
+# SIMILARIDADE VETORIZADA
+# ============================================================================
+
+def _matriz_codigos(textos: np.ndarray) -> np.ndarray:
+    """Matriz de code points (uma linha por texto, completada com zeros)."""
+    largura = max(max((len(t) for t in textos), default=0), 1)
+    return np.array(textos, dtype=f'<U{largura}').view(np.uint32).reshape(len(textos), largura)
+
+
+def similaridade_nomes(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    1 - distância de Levenshtein / maior comprimento, para cada par (a[i], b[i]).
+
+    Usa o algoritmo bit-paralelo de Myers/Hyyrö: cada nome de `a` vira um
+    vetor de bits de 64 posições (nomes maiores são truncados) e cada passo
+    consome um caractere de `b` em todos os pares ao mesmo tempo, então o
+    custo é O(maior nome de b) operações NumPy por lote.
+    """
+    n = len(a)
+    if n == 0:
+        return np.empty(0)
+
+    A = _matriz_codigos(a)[:, :64]
+    B = _matriz_codigos(b)
+    tam_a = np.minimum(np.fromiter((len(t) for t in a), dtype=np.int64, count=n), 64)
+    tam_b = np.fromiter((len(t) for t in b), dtype=np.int64, count=n)
+
+    um = np.uint64(1)
+    pesos = np.left_shift(um, np.arange(A.shape[1], dtype=np.uint64))
+    topo = np.left_shift(um, np.maximum(tam_a - 1, 0).astype(np.uint64))
+    vazio = tam_a == 0
+
+    pv = np.full(n, np.iinfo(np.uint64).max, dtype=np.uint64)
+    mv = np.zeros(n, dtype=np.uint64)
+    distancia = tam_a.copy()
+
+    for j in range(B.shape[1]):
+        ativo = j < tam_b
+        eq = np.bitwise_or.reduce(np.where(A == B[:, j:j + 1], pesos, np.uint64(0)), axis=1)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        distancia += ativo & ((ph & topo) != 0)
+        distancia -= ativo & ((mh & topo) != 0)
+        ph = (ph << um) | um
+        mh = mh << um
+        pv = np.where(ativo, mh | ~(xv | ph), pv)
+        mv = np.where(ativo, ph & xv, mv)
+
+    distancia[vazio] = tam_b[vazio]
+    maior = np.maximum(np.maximum(tam_a, tam_b), 1)
+    return 1 - distancia / maior
+
+
+def similaridade_cpfs(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Fração de dígitos coincidentes (posição a posição) entre os CPFs de cada par."""
+    if len(a) == 0:
+        return np.empty(0)
+    A = _matriz_codigos(np.asarray([normalizar_cpf(c).ljust(11) for c in a]))
+    B = _matriz_codigos(np.asarray([normalizar_cpf(c).ljust(11) for c in b]))
+    return (A[:, :11] == B[:, :11]).mean(axis=1)
+
+
+# ============================================================================
+# SUGESTÕES DE FUSÃO
+# ============================================================================
+
+COLUNAS_SUGESTOES = [
+    'id_a', 'nome_a', 'cpf_a', 'id_b', 'nome_b', 'cpf_b', 'data_nascimento',
+    'similaridade_nome', 'similaridade_cpf', 'pontuacao'
+]
+
+# (versão, tamanho) da tabela -> sugestões
+_sugestoes = {}
+
+
+def _pares_candidatos(pacientes: pd.DataFrame) -> pd.DataFrame:
+    """Pares (posicao_a, posicao_b) de pacientes no mesmo bloco, com a < b."""
+    blocos = pd.DataFrame({
+        'data_nascimento': pacientes['data_nascimento'].to_numpy(),
+        'chave': chaves_foneticas(pacientes['nome_normalizado']).to_numpy(),
+        'posicao': np.arange(len(pacientes)),
+    })
+    blocos = blocos[blocos['chave'] != '']
+
+    # Só blocos com mais de uma paciente geram pares
+    repetidos = blocos.duplicated(['data_nascimento', 'chave'], keep=False)
+    blocos = blocos[repetidos]
+
+    pares = blocos.merge(blocos, on=['data_nascimento', 'chave'], suffixes=('_a', '_b'))
+    return pares[pares['posicao_a'] < pares['posicao_b']]
+
+
+def sugerir_duplicatas(pacientes: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Pares de pacientes que provavelmente são a mesma pessoa, do mais ao
+    menos provável. `id_a` é o cadastro mais antigo (sugerido para manter).
+
+    Sem argumentos usa a tabela de pacientes, com cache até ela mudar.
+    """
+    usar_cache = pacientes is None
+    if usar_cache:
+        pacientes = get_dados()['pacientes']
+        versao = (get_versao('pacientes'), len(pacientes))
+        if versao in _sugestoes:
+            return _sugestoes[versao]
+
+    pares = _pares_candidatos(pacientes)
+    nomes = pacientes['nome_normalizado'].to_numpy(dtype=object)
+    cpfs = pacientes['cpf'].to_numpy(dtype=object)
+    pos_a = pares['posicao_a'].to_numpy()
+    pos_b = pares['posicao_b'].to_numpy()
+
+    sim_nome = np.empty(len(pares))
+    sim_cpf = np.empty(len(pares))
+    for inicio in range(0, len(pares), TAMANHO_LOTE):
+        lote = slice(inicio, inicio + TAMANHO_LOTE)
+        sim_nome[lote] = similaridade_nomes(nomes[pos_a[lote]], nomes[pos_b[lote]])
+        sim_cpf[lote] = similaridade_cpfs(cpfs[pos_a[lote]], cpfs[pos_b[lote]])
+
+    aceitos = (sim_nome >= LIMIAR_NOME) | ((sim_nome >= LIMIAR_NOME_COM_CPF) & (sim_cpf >= LIMIAR_CPF))
+    pos_a, pos_b = pos_a[aceitos], pos_b[aceitos]
+
+    sugestoes = pd.DataFrame({
+        'id_a': pacientes['id'].to_numpy()[pos_a],
+        'nome_a': pacientes['nome'].to_numpy()[pos_a],
+        'cpf_a': cpfs[pos_a],
+        'id_b': pacientes['id'].to_numpy()[pos_b],
+        'nome_b': pacientes['nome'].to_numpy()[pos_b],
+        'cpf_b': cpfs[pos_b],
+        'data_nascimento': pacientes['data_nascimento'].to_numpy()[pos_a],
+        'similaridade_nome': sim_nome[aceitos].round(3),
+        'similaridade_cpf': sim_cpf[aceitos].round(3),
+        'pontuacao': (0.7 * sim_nome[aceitos] + 0.3 * sim_cpf[aceitos]).round(3),
+    }, columns=COLUNAS_SUGESTOES)
+    sugestoes = sugestoes.sort_values('pontuacao', ascending=False, ignore_index=True)
+
+    if usar_cache:
+        _sugestoes.clear()
+        _sugestoes[versao] = sugestoes
+    return sugestoes
@@ -0,0 +1,344 @@
+"""
+Geração de prontuários em PDF em segundo plano.
+
+Cada pedido de impressão vira um trabalho com uma ou mais pacientes. Os
+dados de cada prontuário são extraídos no processo do Streamlit (onde estão
+os DataFrames e índices) e a montagem do PDF, que é a parte cara, roda num
+pool de processos. O andamento de cada trabalho fica em memória e pode ser
+consultado pelas páginas sem bloquear a sessão.
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+from dados import get_dados, get_evolucoes_paciente, get_exames_paciente
+
+
+# Pasta onde os PDFs são gravados (um subdiretório por trabalho)
+PASTA_PRONTUARIOS = Path(os.environ.get(
+    'MATERNIDADE_PASTA_PRONTUARIOS', Path(__file__).resolve().parent / 'prontuarios_pdf'
+))
+
+# Processos dedicados à montagem dos PDFs (deixa um núcleo para o Streamlit)
+PROCESSOS_IMPRESSAO = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+# ============================================================================
+# EXTRAÇÃO DOS DADOS
+# ============================================================================
+
+def _registros(df: pd.DataFrame) -> list:
+    """Linhas como dicionários de valores simples (serializáveis para o pool)."""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def dados_prontuario(id_paciente: int) -> dict:
+    """
+    Tudo o que vai no prontuário impresso: cadastro, evoluções e exames em
+    ordem cronológica, partos e recém-nascidos. Levanta ValueError se a
+    paciente não existir.
+    """
+    dados = get_dados()
+    pacientes = dados['pacientes']
+    paciente = pacientes[pacientes['id'] == id_paciente]
+    if len(paciente) == 0:
+        raise ValueError(f"Paciente {id_paciente} não encontrada.")
+
+    partos = dados['partos']
+    recem_nascidos = dados['recem_nascidos']
+
+    return {
+        'paciente': _registros(paciente)[0],
+        'evolucoes': _registros(get_evolucoes_paciente(id_paciente).iloc[::-1]),
+        'exames': _registros(get_exames_paciente(id_paciente).iloc[::-1]),
+        'partos': _registros(partos[partos['id_paciente'] == id_paciente]),
+        'recem_nascidos': _registros(recem_nascidos[recem_nascidos['id_mae'] == id_paciente]),
+    }
+
+
+# ============================================================================
+# MONTAGEM DO PDF (roda nos processos do pool)
+# ============================================================================
+
+def _texto(valor) -> str:
+    """Texto compatível com as fontes padrão do PDF (latin-1)."""
+    if valor is None:
+        return '-'
+    if isinstance(valor, datetime):
+        valor = valor.strftime('%d/%m/%Y %H:%M')
+    elif hasattr(valor, 'strftime'):
+        valor = valor.strftime('%d/%m/%Y')
+    return str(valor).encode('latin-1', 'replace').decode('latin-1')
+
+
+class _PDFProntuario(FPDF):
+    def __init__(self, titulo: str):
+        super().__init__()
+        self.titulo = titulo
+        self.set_auto_page_break(auto=True, margin=15)
+
+    def header(self):
+        self.set_font('Helvetica', 'B', 9)
+        self.cell(0, 6, _texto(self.titulo), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.line(self.l_margin, self.get_y(), self.w - self.r_margin, self.get_y())
+        self.ln(2)
+
+    def footer(self):
+        self.set_y(-12)
+        self.set_font('Helvetica', 'I', 8)
+        self.cell(0, 6, f"Página {self.page_no()}/{{nb}}", align='C')
+
+    def secao(self, titulo: str):
+        self.ln(3)
+        self.set_font('Helvetica', 'B', 12)
+        self.set_fill_color(233, 30, 99)
+        self.set_text_color(255, 255, 255)
+        self.cell(0, 7, _texto(titulo), fill=True, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.set_text_color(0, 0, 0)
+        self.ln(1)
+
+    def campos(self, pares: list):
+        """Pares (rótulo, valor) em duas colunas."""
+        largura = (self.w - self.l_margin - self.r_margin) / 2
+        for i, (rotulo, valor) in enumerate(pares):
+            self.set_font('Helvetica', 'B', 9)
+            self.cell(32, 5, _texto(rotulo) + ':')
+            self.set_font('Helvetica', '', 9)
+            ultima_coluna = i % 2 == 1 or i == len(pares) - 1
+            self.cell(largura - 32, 5, _texto(valor)[:60],
+                      new_x=XPos.LMARGIN if ultima_coluna else XPos.RIGHT,
+                      new_y=YPos.NEXT if ultima_coluna else YPos.TOP)
+
+    def paragrafo(self, texto: str, negrito: bool = False):
+        self.set_font('Helvetica', 'B' if negrito else '', 9)
+        self.multi_cell(0, 5, _texto(texto), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+
+def gerar_pdf_prontuario(prontuario: dict, caminho: str) -> str:
+    """Monta o PDF do prontuário extraído por dados_prontuario e grava em `caminho`."""
+    p = prontuario['paciente']
+    pdf = _PDFProntuario(f"Prontuário - {p['nome']} (#{p['id']})")
+    pdf.alias_nb_pages()
+    pdf.add_page()
+
+    pdf.set_font('Helvetica', 'B', 16)
+    pdf.cell(0, 10, 'Prontuário Obstétrico', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_font('Helvetica', '', 8)
+    pdf.cell(0, 5, f"Emitido em {datetime.now():%d/%m/%Y %H:%M}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    pdf.secao('Identificação')
+    pdf.campos([
+        ('Nome', p['nome']), ('CPF', p['cpf']),
+        ('Nascimento', p['data_nascimento']), ('Idade', f"{p['idade']} anos"),
+        ('Tipo sanguíneo', p['tipo_sanguineo']), ('Convênio', p['convenio']),
+        ('Telefone', p['telefone']), ('Médico', p['medico_responsavel']),
+        ('Status', p['status']), ('Leito', p['leito']),
+        ('Internação', p['data_internacao']), ('Alta', p.get('data_alta')),
+    ])
+
+    pdf.secao('Dados Obstétricos')
+    pdf.campos([
+        ('G/P/A', f"{p['num_gestacoes']}/{p['num_partos']}/{p['num_abortos']}"),
+        ('IG', f"{p['semanas_gestacao']}s {p['dias_gestacao']}d"),
+        ('DUM', p['dum']), ('DPP', p['dpp']),
+        ('Comorbidades', p['comorbidades']), ('Alergias', p['alergias']),
+    ])
+
+    pdf.secao(f"Evoluções ({len(prontuario['evolucoes'])})")
+    for ev in prontuario['evolucoes']:
+        sv = ev['sinais_vitais'] or {}
+        pdf.paragrafo(f"{_texto(ev['data_hora'])} - {ev['tipo']} | {ev['medico']}", negrito=True)
+        pdf.paragrafo(
+            f"PA {sv.get('pa', '-')} mmHg  FC {sv.get('fc', '-')} bpm  "
+            f"Temp {sv.get('temp', '-')} °C  FR {sv.get('fr', '-')} irpm"
+        )
+        pdf.paragrafo(ev['descricao'])
+        pdf.paragrafo(f"Conduta: {_texto(ev['conduta'])}")
+        pdf.ln(2)
+
+    pdf.secao(f"Exames ({len(prontuario['exames'])})")
+    for ex in prontuario['exames']:
+        pdf.paragrafo(
+            f"{ex['tipo']} - solicitado em {_texto(ex['data_solicitacao'])} ({ex['status']})", negrito=True
+        )
+        if ex['status'] == 'Concluído':
+            pdf.paragrafo(f"Resultado ({_texto(ex['data_resultado'])}): {_texto(ex['resultado'])}")
+        pdf.ln(1)
+
+    if prontuario['partos']:
+        pdf.secao('Parto')
+        for parto in prontuario['partos']:
+            pdf.campos([
+                ('Data', f"{_texto(parto['data_parto'])} {parto['hora_parto']}"),
+                ('Tipo', parto['tipo_parto']),
+                ('Indicação', parto['indicacao_cesarea']), ('Anestesia', parto['anestesia']),
+                ('Obstetra', parto['obstetra']), ('Pediatra', parto['pediatra']),
+                ('Intercorrências', parto['intercorrencias']),
+                ('Perda sanguínea', parto['perda_sanguinea_estimada']),
+            ])
+            pdf.ln(2)
+
+    if prontuario['recem_nascidos']:
+        pdf.secao('Recém-nascido(s)')
+        for rn in prontuario['recem_nascidos']:
+            pdf.campos([
+                ('Nome', rn['nome']), ('Sexo', rn['sexo']),
+                ('Nascimento', f"{_texto(rn['data_nascimento'])[:10]} {rn['hora_nascimento']}"),
+                ('Peso', f"{rn['peso']} g"),
+                ('Comprimento', f"{rn['comprimento']} cm"), ('PC', f"{rn['perimetro_cefalico']} cm"),
+                ('Apgar', f"{rn['apgar_1min']}/{rn['apgar_5min']}/{rn['apgar_10min']}"),
+                ('Reanimação', rn['reanimacao']),
+            ])
+            pdf.ln(2)
+
+    Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+    pdf.output(caminho)
+    return caminho
+
+
+# ============================================================================
+# FILA DE TRABALHOS
+# ============================================================================
+
+# id do trabalho -> estado (descrição, pasta, total, concluídos, arquivos, erros...)
+_trabalhos = {}
+_lock_trabalhos = threading.Lock()
+_ids_trabalhos = itertools.count(1)
+
+# Criado no primeiro trabalho; processos "spawn" não herdam o estado do Streamlit
+_pool = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=PROCESSOS_IMPRESSAO, mp_context=multiprocessing.get_context('spawn')
+        )
+    return _pool
+
+
+def _encerrar_se_concluido(trabalho: dict):
+    """Fecha o trabalho quando todos os PDFs enviados ao pool voltaram (chamar com o lock)."""
+    if trabalho['fim'] is None and trabalho['concluidos'] == trabalho['total']:
+        trabalho['status'] = 'Concluído com erros' if trabalho['erros'] else 'Concluído'
+        trabalho['fim'] = datetime.now()
+
+
+def _registrar_conclusao(id_trabalho: int, id_paciente: int, futuro):
+    with _lock_trabalhos:
+        trabalho = _trabalhos[id_trabalho]
+        erro = futuro.exception()
+        if erro is None:
+            trabalho['arquivos'].append(futuro.result())
+        else:
+            trabalho['erros'].append(f"Paciente {id_paciente}: {erro}")
+        trabalho['concluidos'] += 1
+        _encerrar_se_concluido(trabalho)
+
+
+def _executar_trabalho(id_trabalho: int, ids_pacientes: list):
+    """
+    Extrai os dados de cada paciente e envia a montagem do PDF ao pool.
+
+    Uma falha numa paciente vira erro do trabalho e não interrompe as
+    demais; ao final (mesmo após uma falha inesperada) o total passa a ser
+    o número de PDFs realmente enviados, para que o trabalho sempre termine.
+    """
+    global _pool
+    trabalho = _trabalhos[id_trabalho]
+    enviados = 0
+    try:
+        with _lock_trabalhos:
+            trabalho['status'] = 'Gerando'
+        pool = _get_pool()
+
+        for id_paciente in ids_pacientes:
+            try:
+                prontuario = dados_prontuario(id_paciente)
+                caminho = str(trabalho['pasta'] / f"prontuario_{id_paciente}.pdf")
+                futuro = pool.submit(gerar_pdf_prontuario, prontuario, caminho)
+            except Exception as erro:
+                if isinstance(erro, BrokenProcessPool):
+                    # Pool inutilizado: o próximo envio cria outro
+                    _pool = None
+                    pool = _get_pool()
+                mensagem = str(erro) if isinstance(erro, ValueError) else f"Paciente {id_paciente}: {erro}"
+                with _lock_trabalhos:
+                    trabalho['erros'].append(mensagem)
+                    trabalho['total'] -= 1
+                continue
+            enviados += 1
+            futuro.add_done_callback(partial(_registrar_conclusao, id_trabalho, id_paciente))
+    except Exception as erro:
+        with _lock_trabalhos:
+            trabalho['erros'].append(f"Falha na impressão: {erro}")
+    finally:
+        with _lock_trabalhos:
+            trabalho['total'] = enviados
+            _encerrar_se_concluido(trabalho)
+
+
+def imprimir_prontuarios(ids_pacientes, descricao: str) -> int:
+    """
+    Enfileira a impressão dos prontuários e retorna o id do trabalho. A
+    chamada retorna na hora; o andamento é acompanhado por status_trabalho.
+    """
+    ids_pacientes = [int(i) for i in ids_pacientes]
+    id_trabalho = next(_ids_trabalhos)
+    agora = datetime.now()
+
+    with _lock_trabalhos:
+        _trabalhos[id_trabalho] = {
+            'id': id_trabalho,
+            'descricao': descricao,
+            'pasta': PASTA_PRONTUARIOS / f"{agora:%Y%m%d_%H%M%S}_{id_trabalho}",
+            'status': 'Na fila',
+            'total': len(ids_pacientes),
+            'concluidos': 0,
+            'arquivos': [],
+            'erros': [],
+            'inicio': agora,
+            'fim': None,
+        }
+
+    threading.Thread(target=_executar_trabalho, args=(id_trabalho, ids_pacientes), daemon=True).start()
+    return id_trabalho
+
+
+def imprimir_altas_do_dia(dia=None) -> int:
+    """Enfileira os prontuários de todas as pacientes que receberam alta no dia (padrão: hoje)."""
+    dia = dia or datetime.now().date()
+    pacientes = get_dados()['pacientes']
+    if 'data_alta' in pacientes:
+        altas = pacientes.loc[(pacientes['status'] == 'Alta') & (pacientes['data_alta'] == dia), 'id']
+    else:
+        altas = pacientes['id'].iloc[:0]
+    return imprimir_prontuarios(altas, f"Altas de {dia:%d/%m/%Y}")
+
+
+def status_trabalho(id_trabalho: int) -> dict:
+    """Cópia do estado do trabalho (None se não existir)."""
+    with _lock_trabalhos:
+        trabalho = _trabalhos.get(id_trabalho)
+        if trabalho is None:
+            return None
+        return {**trabalho, 'arquivos': list(trabalho['arquivos']), 'erros': list(trabalho['erros'])}
+
+
+def listar_trabalhos() -> list:
+    """Estados de todos os trabalhos, do mais recente para o mais antigo."""
+    with _lock_trabalhos:
+        ids = sorted(_trabalhos, reverse=True)
+    return [status_trabalho(i) for i in ids]
@@ -0,0 +1,824 @@
+"""
+Estruturas de índice em memória usadas pela camada de dados.
+
+Os índices guardam posições de linha (rótulos do índice dos DataFrames) e são
+mantidos incrementalmente pelas funções de escrita de dados.py. A construção
+inicial é feita em lote; inserções posteriores vão para uma área de novas
+entradas que é compactada de tempos em tempos.
+"""
+
+import heapq
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+
+# Quantidade de inserções acumuladas antes de recompactar um índice
+LIMITE_NOVAS = 4096
+
+# Candidatos avaliados por vez na interseção das listas de trigramas
+TAMANHO_BLOCO = 4096
+
+
+def normalizar_texto(texto) -> str:
+    """Normaliza texto para busca: sem acentos, minúsculas e espaços colapsados."""
+    if not isinstance(texto, str):
+        return ''
+    texto = unicodedata.normalize('NFKD', texto)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def normalizar_serie(serie: pd.Series) -> pd.Series:
+    """Versão vetorizada de normalizar_texto para uma coluna inteira."""
+    return (
+        serie.fillna('').astype(str)
+        .str.normalize('NFKD')
+        .str.replace('[\u0300-\u036f]', '', regex=True)
+        .str.lower()
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.strip()
+    )
+
+
+def normalizar_cpf(cpf) -> str:
+    """Mantém apenas os dígitos do CPF."""
+    if not isinstance(cpf, str):
+        return ''
+    return re.sub(r'\D', '', cpf)
+
+
+# ============================================================================
+# ÍNDICE DE PREFIXOS
+# ============================================================================
+
+class IndicePrefixo:
+    """Chaves ordenadas para busca por prefixo com busca binária."""
+
+    def __init__(self, chaves=(), posicoes=()):
+        chaves = np.asarray(list(chaves), dtype=object)
+        posicoes = np.asarray(list(posicoes), dtype=np.int64)
+        ordem = np.argsort(chaves, kind='stable')
+        self._chaves = chaves[ordem]
+        self._posicoes = posicoes[ordem]
+        self._novas = []  # (chave, posicao) inseridas após a construção
+
+    def __len__(self):
+        return len(self._chaves) + len(self._novas)
+
+    def adicionar(self, chave: str, posicao: int):
+        self._novas.append((chave, posicao))
+        if len(self._novas) >= LIMITE_NOVAS:
+            self._compactar()
+
+    def _compactar(self):
+        chaves, posicoes = zip(*self._novas)
+        chaves = np.concatenate([self._chaves, np.asarray(chaves, dtype=object)])
+        posicoes = np.concatenate([self._posicoes, np.asarray(posicoes, dtype=np.int64)])
+        ordem = np.argsort(chaves, kind='stable')
+        self._chaves = chaves[ordem]
+        self._posicoes = posicoes[ordem]
+        self._novas = []
+
+    def buscar(self, prefixo: str, limite: int = None) -> np.ndarray:
+        """
+        Posições cujas chaves começam com `prefixo`.
+
+        Sem limite, o resultado vem ordenado por posição; com limite, vêm as
+        primeiras `limite` chaves em ordem alfabética (útil para autocompletar).
+        Em ambos os casos cada posição aparece uma única vez.
+        """
+        inicio = np.searchsorted(self._chaves, prefixo, side='left')
+        fim = np.searchsorted(self._chaves, prefixo + '\uffff', side='left')
+        if limite is not None:
+            fim = min(fim, inicio + limite)
+        chaves = self._chaves[inicio:fim]
+        resultado = self._posicoes[inicio:fim]
+
+        extras = [(c, p) for c, p in self._novas if c.startswith(prefixo)]
+        if extras:
+            chaves_extras, posicoes_extras = zip(*extras)
+            chaves = np.concatenate([chaves, np.asarray(chaves_extras, dtype=object)])
+            resultado = np.concatenate([resultado, np.asarray(posicoes_extras, dtype=np.int64)])
+
+        if limite is None:
+            return np.unique(resultado)
+
+        # Intercala as pendentes na ordem alfabética, mantém a primeira
+        # ocorrência de cada posição e só então aplica o limite
+        if extras:
+            resultado = resultado[np.argsort(chaves, kind='stable')]
+        _, primeiras = np.unique(resultado, return_index=True)
+        return resultado[np.sort(primeiras)][:limite]
+
+
+# ============================================================================
+# ÍNDICE DE TEXTO (TRIGRAMAS)
+# ============================================================================
+
+class IndiceTexto:
+    """
+    Busca por substring em textos normalizados.
+
+    Consultas com 3 ou mais caracteres usam listas de posições por trigrama;
+    consultas menores usam o prefixo do texto. Os candidatos são sempre
+    confirmados contra o texto atual, o que torna seguras as entradas antigas
+    deixadas nas listas quando um texto é alterado.
+    """
+
+    def __init__(self, textos=(), posicoes=()):
+        textos = list(textos)
+        posicoes = np.asarray(list(posicoes), dtype=np.int64)
+        self._textos = dict(zip(posicoes.tolist(), textos))
+        self._base = self._construir_listas(textos, posicoes)
+        self._novas = defaultdict(list)
+        self._prefixos = IndicePrefixo(textos, posicoes)
+
+    @staticmethod
+    def _construir_listas(textos: list, posicoes: np.ndarray) -> dict:
+        """Monta as listas de posições por trigrama de forma vetorizada."""
+        largura = max((len(t) for t in textos), default=0)
+        if largura < 3:
+            return {}
+
+        # Matriz de code points (uma linha por texto, completada com zeros)
+        matriz = np.array(textos, dtype=f'<U{largura}').view(np.uint32).reshape(len(textos), largura)
+        matriz = matriz.astype(np.int64)
+        codigos = (matriz[:, :-2] << 42) | (matriz[:, 1:-1] << 21) | matriz[:, 2:]
+        validos = matriz[:, 2:] != 0
+
+        codigos = codigos[validos]
+        donos = np.broadcast_to(posicoes[:, None], validos.shape)[validos]
+
+        # Ordena por (trigrama, posição) e remove repetições dentro do mesmo texto
+        ordem = np.lexsort((donos, codigos))
+        codigos, donos = codigos[ordem], donos[ordem]
+        unico = np.ones(len(codigos), dtype=bool)
+        unico[1:] = (codigos[1:] != codigos[:-1]) | (donos[1:] != donos[:-1])
+        codigos, donos = codigos[unico], donos[unico]
+
+        inicios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]])
+        return dict(zip(codigos[inicios].tolist(), np.split(donos, inicios[1:])))
+
+    def __len__(self):
+        return len(self._textos)
+
+    @staticmethod
+    def _trigramas(texto: str) -> set:
+        """Trigramas do texto, codificados como inteiros (3 code points de 21 bits)."""
+        pontos = [ord(c) for c in texto]
+        return {(a << 42) | (b << 21) | c for a, b, c in zip(pontos, pontos[1:], pontos[2:])}
+
+    def texto(self, posicao: int) -> str:
+        return self._textos.get(posicao, '')
+
+    def definir(self, posicao: int, texto: str):
+        """Insere ou atualiza o texto de uma posição."""
+        posicao = int(posicao)
+        anterior = self._textos.get(posicao)
+        if anterior == texto:
+            return
+        self._textos[posicao] = texto
+
+        novos = self._trigramas(texto)
+        if anterior is not None:
+            novos -= self._trigramas(anterior)
+        for trigrama in novos:
+            self._novas[trigrama].append(posicao)
+        self._prefixos.adicionar(texto, posicao)
+
+    def _posicoes_trigrama(self, trigrama: str) -> np.ndarray:
+        """Lista ordenada de posições do trigrama (incorpora as inserções pendentes)."""
+        novas = self._novas.pop(trigrama, None)
+        base = self._base.get(trigrama)
+        if novas:
+            extra = np.asarray(novas, dtype=np.int64)
+            base = np.unique(extra if base is None else np.concatenate([base, extra]))
+            self._base[trigrama] = base
+        return base if base is not None else np.empty(0, dtype=np.int64)
+
+    def buscar(self, consulta: str, limite: int = None) -> np.ndarray:
+        """Posições cujo texto contém `consulta` (já normalizada)."""
+        if not consulta:
+            return np.empty(0, dtype=np.int64)
+
+        if len(consulta) < 3:
+            candidatos = self._prefixos.buscar(consulta, limite)
+            return np.asarray(
+                [p for p in candidatos.tolist() if self._textos.get(p, '').startswith(consulta)],
+                dtype=np.int64
+            )
+
+        listas = sorted((self._posicoes_trigrama(t) for t in self._trigramas(consulta)), key=len)
+        menor, demais = listas[0], listas[1:]
+
+        # Percorre a lista mais seletiva em blocos, testando a presença nas
+        # demais por busca binária, e confirma o texto só dos sobreviventes
+        encontrados = []
+        for inicio in range(0, len(menor), TAMANHO_BLOCO):
+            bloco = menor[inicio:inicio + TAMANHO_BLOCO]
+            for lista in demais:
+                pos = np.searchsorted(lista, bloco)
+                pos[pos >= len(lista)] = 0
+                bloco = bloco[lista[pos] == bloco]
+                if len(bloco) == 0:
+                    break
+
+            for posicao in bloco.tolist():
+                if consulta in self._textos.get(posicao, ''):
+                    encontrados.append(posicao)
+                    if limite is not None and len(encontrados) >= limite:
+                        return np.asarray(encontrados, dtype=np.int64)
+
+        return np.asarray(encontrados, dtype=np.int64)
+
+
+# ============================================================================
+# ÍNDICE INVERTIDO (TEXTO LIVRE)
+# ============================================================================
+
+# Palavras do texto já normalizado: hífen e pontuação separam ("pre-eclampsia")
+PADRAO_PALAVRA = re.compile(r'[a-z0-9]+')
+
+# Operadores de disjunção aceitos nas consultas (só em maiúsculas)
+OPERADORES_OU = {'OU', 'OR'}
+
+
+def tokenizar(texto) -> list:
+    """Palavras do texto sem acentos e em minúsculas, na ordem em que aparecem."""
+    return PADRAO_PALAVRA.findall(normalizar_texto(texto))
+
+
+def interpretar_consulta(consulta: str) -> list:
+    """
+    Converte a consulta em grupos alternativos (separados por OU), cada um
+    uma lista de cláusulas (negada, palavras) que precisam valer juntas.
+
+    Aspas delimitam frases ("sulfato de magnésio"), um hífen no início nega
+    a cláusula (-cesárea) e palavras hifenizadas contam como frase
+    (pré-eclâmpsia). Ex.: 'magnesio -cesarea OU "trabalho de parto"'.
+    """
+    grupos = [[]]
+    for negada, frase, palavra in re.findall(r'(-?)(?:"([^"]*)"?|([^\s"]+))', consulta or ''):
+        if not frase and palavra in OPERADORES_OU:
+            grupos.append([])
+            continue
+        palavras = tuple(tokenizar(frase or palavra))
+        if palavras:
+            grupos[-1].append((bool(negada), palavras))
+    return [grupo for grupo in grupos if grupo]
+
+
+def _contem_frase(palavras: tuple, frase: tuple) -> bool:
+    n = len(frase)
+    return any(palavras[i:i + n] == frase for i in range(len(palavras) - n + 1))
+
+
+class IndiceInvertido:
+    """
+    Índice invertido de texto livre com um ou mais campos por posição
+    (ex.: descrição e conduta de uma evolução).
+
+    Cada texto distinto é tokenizado uma só vez e recebe um código; cada
+    campo guarda, por posição, o código do seu texto, e cada palavra aponta
+    para os códigos dos textos que a contêm. A consulta é resolvida sobre os
+    textos distintos (interseção das listas e, para frases, conferência da
+    sequência de palavras) e só então levada às posições, com uma leitura
+    vetorizada por campo. Frases não atravessam campos.
+    """
+
+    def __init__(self, campos: dict = None, posicoes=()):
+        posicoes = np.asarray(list(posicoes), dtype=np.int64)
+        self._tamanho = int(posicoes.max()) + 1 if len(posicoes) else 0
+        self._capacidade = self._tamanho
+        self._codigo_texto = {}   # texto -> código
+        self._palavras = []       # código -> palavras do texto, em ordem
+        self._listas = {}         # palavra -> códigos dos textos, crescentes
+        self._novas = defaultdict(list)
+        self._codigos = {}        # campo -> código do texto por posição (-1 = vazio)
+
+        for campo, textos in (campos or {}).items():
+            codigos, distintos = pd.factorize(np.asarray(textos, dtype=object))
+            # Textos distintos normalizados de uma vez; o -1 do final atende
+            # os valores ausentes (código -1 do factorize)
+            normalizados = normalizar_serie(pd.Series(distintos, dtype=object)).tolist()
+            mapa = np.array(
+                [self._registrar(t, n) for t, n in zip(distintos, normalizados)] + [-1], dtype=np.int32
+            )
+            self._codigos[campo] = np.full(self._capacidade, -1, dtype=np.int32)
+            self._codigos[campo][posicoes] = mapa[codigos]
+
+    def __len__(self):
+        return self._tamanho
+
+    def _registrar(self, texto, normalizado: str = None) -> int:
+        """Código do texto, tokenizando-o na primeira vez que aparece."""
+        if not isinstance(texto, str):
+            return -1
+        codigo = self._codigo_texto.get(texto)
+        if codigo is None:
+            codigo = len(self._palavras)
+            self._codigo_texto[texto] = codigo
+            if normalizado is None:
+                normalizado = normalizar_texto(texto)
+            palavras = tuple(PADRAO_PALAVRA.findall(normalizado))
+            self._palavras.append(palavras)
+            for palavra in dict.fromkeys(palavras):
+                self._novas[palavra].append(codigo)
+        return codigo
+
+    def _crescer(self, tamanho: int):
+        """Aumenta a capacidade (dobrando) para novas posições."""
+        capacidade = max(tamanho, 2 * self._capacidade)
+        extra = np.full(capacidade - self._capacidade, -1, dtype=np.int32)
+        for campo, codigos in self._codigos.items():
+            self._codigos[campo] = np.concatenate([codigos, extra])
+        self._capacidade = capacidade
+
+    def definir(self, posicao: int, textos: dict):
+        """Insere ou atualiza os textos (campo -> texto) de uma posição."""
+        posicao = int(posicao)
+        if posicao >= self._capacidade:
+            self._crescer(posicao + 1)
+        self._tamanho = max(self._tamanho, posicao + 1)
+        for campo, texto in textos.items():
+            if campo not in self._codigos:
+                self._codigos[campo] = np.full(self._capacidade, -1, dtype=np.int32)
+            self._codigos[campo][posicao] = self._registrar(texto)
+
+    def _lista(self, palavra: str) -> np.ndarray:
+        """Códigos dos textos com a palavra (incorpora os textos novos)."""
+        novas = self._novas.pop(palavra, None)
+        base = self._listas.get(palavra)
+        if novas:
+            # Códigos são atribuídos em ordem crescente: concatenar mantém a lista ordenada
+            extra = np.asarray(novas, dtype=np.int32)
+            base = extra if base is None else np.concatenate([base, extra])
+            self._listas[palavra] = base
+        return base if base is not None else np.empty(0, dtype=np.int32)
+
+    def _textos_com(self, frase: tuple) -> np.ndarray:
+        """Mapa de bits por código de texto (mais um falso no fim, para o -1)."""
+        listas = sorted((self._lista(p) for p in set(frase)), key=len)
+        textos = listas[0]
+        for lista in listas[1:]:
+            if len(textos) == 0:
+                break
+            textos = np.intersect1d(textos, lista, assume_unique=True)
+        if len(frase) > 1:
+            textos = [c for c in textos.tolist() if _contem_frase(self._palavras[c], frase)]
+
+        marcados = np.zeros(len(self._palavras) + 1, dtype=bool)
+        marcados[textos] = True
+        return marcados
+
+    def _mapa_frase(self, frase: tuple) -> np.ndarray:
+        """Posições com a frase em algum dos campos."""
+        marcados = self._textos_com(frase)
+        mascara = np.zeros(self._tamanho, dtype=bool)
+        if marcados.any():
+            for codigos in self._codigos.values():
+                mascara |= marcados[codigos[:self._tamanho]]
+        return mascara
+
+    def mapa(self, consulta: str) -> np.ndarray:
+        """Mapa de bits das posições que atendem à consulta (ver interpretar_consulta)."""
+        resultado = np.zeros(self._tamanho, dtype=bool)
+        for grupo in interpretar_consulta(consulta):
+            # Cláusulas positivas primeiro: um grupo vazio dispensa as demais
+            mascara = None
+            for negada, frase in sorted(grupo):
+                if mascara is not None and not mascara.any():
+                    break
+                presente = self._mapa_frase(frase)
+                if mascara is None:
+                    mascara = ~presente if negada else presente
+                elif negada:
+                    mascara &= ~presente
+                else:
+                    mascara &= presente
+            resultado |= mascara
+        return resultado
+
+    def buscar(self, consulta: str) -> np.ndarray:
+        """Posições (ordenadas) que atendem à consulta."""
+        return np.flatnonzero(self.mapa(consulta))
+
+
+# ============================================================================
+# ÍNDICE DE CPF
+# ============================================================================
+
+class IndiceCPF:
+    """CPF normalizado (só dígitos): busca exata O(1) e por trecho (trigramas)."""
+
+    def __init__(self, cpfs=(), posicoes=()):
+        self._por_cpf = {}
+        self._cpf_da_posicao = {}
+        for posicao, cpf in zip(posicoes, cpfs):
+            digitos = normalizar_cpf(cpf)
+            self._por_cpf[digitos] = int(posicao)
+            self._cpf_da_posicao[int(posicao)] = digitos
+        self._trechos = IndiceTexto(self._cpf_da_posicao.values(), self._cpf_da_posicao.keys())
+
+    def __contains__(self, cpf):
+        return normalizar_cpf(cpf) in self._por_cpf
+
+    def posicao(self, cpf):
+        """Posição da paciente com o CPF informado, ou None."""
+        return self._por_cpf.get(normalizar_cpf(cpf))
+
+    def definir(self, posicao: int, cpf: str):
+        """Insere ou atualiza o CPF de uma posição."""
+        posicao = int(posicao)
+        digitos = normalizar_cpf(cpf)
+        anterior = self._cpf_da_posicao.get(posicao)
+        if anterior == digitos:
+            return
+        if anterior is not None and self._por_cpf.get(anterior) == posicao:
+            del self._por_cpf[anterior]
+        self._por_cpf[digitos] = posicao
+        self._cpf_da_posicao[posicao] = digitos
+        self._trechos.definir(posicao, digitos)
+
+    def buscar(self, consulta: str, limite: int = None) -> np.ndarray:
+        """
+        Posições cujo CPF contém os dígitos de `consulta` (com menos de 3
+        dígitos, cujo CPF começa com eles).
+        """
+        digitos = normalizar_cpf(consulta)
+        if not digitos:
+            return np.empty(0, dtype=np.int64)
+        return self._trechos.buscar(digitos, limite)
+
+
+# ============================================================================
+# ÍNDICE DE FAIXA (VALORES NUMÉRICOS)
+# ============================================================================
+
+class IndiceFaixa:
+    """
+    Valores numéricos ordenados para consultas por intervalo.
+
+    Mantém também o valor atual de cada posição, usado para testar candidatos
+    já selecionados por outro índice e para descartar entradas antigas
+    deixadas na parte ordenada quando um valor é alterado.
+    """
+
+    def __init__(self, valores=(), posicoes=()):
+        valores = np.asarray(list(valores), dtype=float)
+        posicoes = np.asarray(list(posicoes), dtype=np.int64)
+        ordem = np.argsort(valores, kind='stable')
+        self._valores = valores[ordem]
+        self._posicoes = posicoes[ordem]
+        self._novas = []  # (valor, posicao) inseridas após a construção
+
+        tamanho = int(posicoes.max()) + 1 if len(posicoes) else 0
+        self._atuais = np.full(tamanho, np.nan)
+        self._atuais[posicoes] = valores
+
+    def __len__(self):
+        return len(self._valores) + len(self._novas)
+
+    def definir(self, posicao: int, valor):
+        """Insere ou atualiza o valor de uma posição."""
+        posicao = int(posicao)
+        valor = float(valor) if valor is not None and not pd.isna(valor) else np.nan
+        if posicao >= len(self._atuais):
+            extra = np.full(max(posicao + 1 - len(self._atuais), len(self._atuais)), np.nan)
+            self._atuais = np.concatenate([self._atuais, extra])
+        elif self._atuais[posicao] == valor:
+            return
+        self._atuais[posicao] = valor
+        self._novas.append((valor, posicao))
+        if len(self._novas) >= LIMITE_NOVAS:
+            self._compactar()
+
+    def _compactar(self):
+        valores, posicoes = zip(*self._novas)
+        valores = np.concatenate([self._valores, np.asarray(valores, dtype=float)])
+        posicoes = np.concatenate([self._posicoes, np.asarray(posicoes, dtype=np.int64)])
+        # Só permanecem as entradas que ainda correspondem ao valor atual
+        atuais = valores == self._atuais[posicoes]
+        valores, posicoes = valores[atuais], posicoes[atuais]
+        ordem = np.lexsort((posicoes, valores))
+        valores, posicoes = valores[ordem], posicoes[ordem]
+        unico = np.ones(len(posicoes), dtype=bool)
+        unico[1:] = (valores[1:] != valores[:-1]) | (posicoes[1:] != posicoes[:-1])
+        self._valores, self._posicoes = valores[unico], posicoes[unico]
+        self._novas = []
+
+    def _limites(self, minimo=None, maximo=None) -> tuple:
+        """Início e fim, na parte ordenada, dos valores em [minimo, maximo]."""
+        inicio = 0 if minimo is None else np.searchsorted(self._valores, minimo, side='left')
+        fim = len(self._valores) if maximo is None else np.searchsorted(self._valores, maximo, side='right')
+        return inicio, max(fim, inicio)
+
+    def contar(self, minimo=None, maximo=None) -> int:
+        """Estimativa (limite superior) de quantas posições caem no intervalo, em O(log n)."""
+        inicio, fim = self._limites(minimo, maximo)
+        return int(fim - inicio) + len(self._novas)
+
+    def buscar(self, minimo=None, maximo=None) -> np.ndarray:
+        """Posições (ordenadas) com valor em [minimo, maximo]."""
+        inicio, fim = self._limites(minimo, maximo)
+        candidatos = self._posicoes[inicio:fim]
+        if self._novas:
+            candidatos = np.concatenate([candidatos, np.asarray([p for _, p in self._novas], dtype=np.int64)])
+        return np.unique(candidatos[self.contem(candidatos, minimo, maximo)])
+
+    def fatia(self, minimo=None, maximo=None) -> np.ndarray:
+        """
+        Posições com valor em [minimo, maximo] na ordem do valor, como uma
+        fatia (sem cópia) da parte ordenada: O(log n). As inserções pendentes
+        são incorporadas antes; valores ausentes nunca entram.
+        """
+        if self._novas:
+            self._compactar()
+        inicio, fim = self._limites(minimo, np.inf if maximo is None else maximo)
+        return self._posicoes[inicio:fim]
+
+    def contem(self, posicoes: np.ndarray, minimo=None, maximo=None) -> np.ndarray:
+        """Máscara: quais das `posicoes` têm valor atual em [minimo, maximo]."""
+        valores = self._atuais[posicoes]
+        mascara = ~np.isnan(valores)
+        if minimo is not None:
+            mascara &= valores >= minimo
+        if maximo is not None:
+            mascara &= valores <= maximo
+        return mascara
+
+
+# ============================================================================
+# ÍNDICE BITMAP (COLUNAS CATEGÓRICAS)
+# ============================================================================
+
+class IndiceBitmap:
+    """
+    Um mapa de bits por valor de uma coluna categórica (status, médico...).
+
+    Cada mapa é um vetor booleano indexado pela posição, o que permite tanto
+    combinar mapas inteiros quanto testar candidatos em O(1) por posição. As
+    contagens por valor ficam guardadas para o planejador estimar a
+    seletividade sem percorrer os dados.
+    """
+
+    def __init__(self, valores=(), posicoes=()):
+        valores = pd.Series(list(valores), dtype=object)
+        posicoes = np.asarray(list(posicoes), dtype=np.int64)
+        self._tamanho = int(posicoes.max()) + 1 if len(posicoes) else 0
+        self._valor_da_posicao = np.full(self._tamanho, None, dtype=object)
+        self._valor_da_posicao[posicoes] = valores.to_numpy()
+
+        codigos, categorias = pd.factorize(valores)
+        self._mapas = {}
+        self._contagens = {}
+        for codigo, categoria in enumerate(categorias):
+            mapa = np.zeros(self._tamanho, dtype=bool)
+            mapa[posicoes[codigos == codigo]] = True
+            self._mapas[categoria] = mapa
+            self._contagens[categoria] = int(mapa.sum())
+
+    def __len__(self):
+        return self._tamanho
+
+    def valores(self) -> list:
+        return [v for v, n in self._contagens.items() if n > 0]
+
+    def _crescer(self, tamanho: int):
+        """Aumenta a capacidade dos mapas (dobrando) para novas posições."""
+        capacidade = max(tamanho, 2 * len(self._valor_da_posicao))
+        extra = capacidade - len(self._valor_da_posicao)
+        self._valor_da_posicao = np.concatenate([self._valor_da_posicao, np.full(extra, None, dtype=object)])
+        for valor, mapa in self._mapas.items():
+            self._mapas[valor] = np.concatenate([mapa, np.zeros(extra, dtype=bool)])
+
+    def definir(self, posicao: int, valor):
+        """Insere ou atualiza o valor de uma posição."""
+        posicao = int(posicao)
+        if posicao >= len(self._valor_da_posicao):
+            self._crescer(posicao + 1)
+        self._tamanho = max(self._tamanho, posicao + 1)
+
+        anterior = self._valor_da_posicao[posicao]
+        if anterior == valor:
+            return
+        if anterior is not None:
+            self._mapas[anterior][posicao] = False
+            self._contagens[anterior] -= 1
+        if valor not in self._mapas:
+            self._mapas[valor] = np.zeros(len(self._valor_da_posicao), dtype=bool)
+            self._contagens[valor] = 0
+        self._mapas[valor][posicao] = True
+        self._contagens[valor] += 1
+        self._valor_da_posicao[posicao] = valor
+
+    def contar(self, valores, negar: bool = False) -> int:
+        """Quantas posições têm um dos `valores` (ou nenhum deles, se `negar`)."""
+        total = sum(self._contagens.get(v, 0) for v in valores)
+        return self._tamanho - total if negar else total
+
+    def mapa(self, valores, negar: bool = False) -> np.ndarray:
+        """Mapa de bits (vetor booleano por posição) da união dos `valores`."""
+        mascara = np.zeros(self._tamanho, dtype=bool)
+        for valor in valores:
+            if valor in self._mapas:
+                mascara |= self._mapas[valor][:self._tamanho]
+        return ~mascara if negar else mascara
+
+    def buscar(self, valores, negar: bool = False) -> np.ndarray:
+        """Posições (ordenadas) com um dos `valores` (ou nenhum deles, se `negar`)."""
+        return np.flatnonzero(self.mapa(valores, negar))
+
+    def contem(self, posicoes: np.ndarray, valores, negar: bool = False) -> np.ndarray:
+        """Máscara: quais das `posicoes` têm um dos `valores` (teste O(1) por posição)."""
+        mascara = np.zeros(len(posicoes), dtype=bool)
+        for valor in valores:
+            if valor in self._mapas:
+                mascara |= self._mapas[valor][posicoes]
+        return ~mascara if negar else mascara
+
+
+# ============================================================================
+# ÍNDICE AGRUPADO (REGISTROS POR PACIENTE)
+# ============================================================================
+
+class IndiceAgrupado:
+    """
+    Posições agrupadas por chave (ex.: id_paciente) e ordenadas por um valor
+    inteiro (ex.: data/hora em nanossegundos).
+
+    A construção ordena tudo uma vez e guarda só os limites de cada grupo,
+    então obter um grupo custa uma busca binária mais o tamanho do grupo.
+    Grupos que recebem inserções passam a ser guardados à parte, já
+    ordenados, e a inserção custa O(tamanho do grupo).
+    """
+
+    def __init__(self, chaves=(), valores=(), posicoes=()):
+        chaves = np.asarray(list(chaves), dtype=np.int64)
+        valores = np.asarray(list(valores), dtype=np.int64)
+        posicoes = np.asarray(list(posicoes), dtype=np.int64)
+
+        # lexsort é estável: empates de valor mantêm a ordem de posição
+        ordem = np.lexsort((valores, chaves))
+        chaves = chaves[ordem]
+        self._valores = valores[ordem]
+        self._posicoes = posicoes[ordem]
+
+        inicios = np.flatnonzero(np.r_[True, chaves[1:] != chaves[:-1]]) if len(chaves) else np.empty(0, dtype=np.int64)
+        self._chaves = chaves[inicios]
+        self._limites = np.r_[inicios, len(chaves)]
+        self._alterados = {}  # chave -> (valores, posicoes) dos grupos com inserções
+
+    def _grupo(self, chave: int):
+        """(valores, posições) do grupo, em ordem crescente de valor."""
+        if chave in self._alterados:
+            return self._alterados[chave]
+        i = np.searchsorted(self._chaves, chave)
+        if i < len(self._chaves) and self._chaves[i] == chave:
+            fatia = slice(self._limites[i], self._limites[i + 1])
+            return self._valores[fatia], self._posicoes[fatia]
+        vazio = np.empty(0, dtype=np.int64)
+        return vazio, vazio
+
+    def contar(self, chave: int) -> int:
+        return len(self._grupo(int(chave))[1])
+
+    def adicionar(self, chave: int, valor: int, posicao: int):
+        """Insere a posição no grupo, mantendo a ordem por valor."""
+        chave = int(chave)
+        valores, posicoes = self._grupo(chave)
+        i = np.searchsorted(valores, valor, side='right')
+        self._alterados[chave] = (np.insert(valores, i, valor), np.insert(posicoes, i, posicao))
+
+    def buscar(self, chave: int, decrescente: bool = False, inicio: int = 0, limite: int = None) -> np.ndarray:
+        """Posições do grupo em ordem de valor (ou inversa), recortadas em [inicio, inicio + limite)."""
+        posicoes = self._grupo(int(chave))[1]
+        if decrescente:
+            posicoes = posicoes[::-1]
+        fim = None if limite is None else inicio + limite
+        return posicoes[inicio:fim]
+
+    def contar_varios(self, chaves) -> np.ndarray:
+        """contar() de um vetor de chaves de uma vez (uma busca binária vetorizada)."""
+        chaves = np.asarray(chaves, dtype=np.int64)
+        contagens = np.zeros(len(chaves), dtype=np.int64)
+        if len(self._chaves):
+            i = np.minimum(np.searchsorted(self._chaves, chaves), len(self._chaves) - 1)
+            encontradas = self._chaves[i] == chaves
+            contagens[encontradas] = np.diff(self._limites)[i[encontradas]]
+        for chave, (_, posicoes) in self._alterados.items():
+            contagens[chaves == chave] = len(posicoes)
+        return contagens
+
+
+class FilaPrioridade:
+    """
+    Heap binário indexado: o item de menor prioridade sai primeiro, com
+    empates resolvidos pelo próprio item (ids crescentes = ordem de chegada).
+
+    A posição de cada item no heap fica num dicionário, então inserir e
+    remover um item qualquer custam O(log n). A construção ordena tudo de
+    uma vez (uma lista ordenada já é um heap válido).
+    """
+
+    def __init__(self, itens=(), prioridades=()):
+        itens = np.asarray(list(itens), dtype=np.int64)
+        prioridades = np.asarray(list(prioridades), dtype=np.int64)
+        ordem = np.lexsort((itens, prioridades))
+        self._heap = list(zip(prioridades[ordem].tolist(), itens[ordem].tolist()))
+        self._posicao = {item: i for i, (_, item) in enumerate(self._heap)}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, item):
+        return item in self._posicao
+
+    def _trocar(self, i: int, j: int):
+        self._heap[i], self._heap[j] = self._heap[j], self._heap[i]
+        self._posicao[self._heap[i][1]] = i
+        self._posicao[self._heap[j][1]] = j
+
+    def _subir(self, i: int):
+        while i > 0:
+            pai = (i - 1) // 2
+            if self._heap[i] >= self._heap[pai]:
+                break
+            self._trocar(i, pai)
+            i = pai
+
+    def _descer(self, i: int):
+        n = len(self._heap)
+        while True:
+            menor = i
+            for filho in (2 * i + 1, 2 * i + 2):
+                if filho < n and self._heap[filho] < self._heap[menor]:
+                    menor = filho
+            if menor == i:
+                break
+            self._trocar(i, menor)
+            i = menor
+
+    def inserir(self, item: int, prioridade: int):
+        """Acrescenta o item (ou atualiza a prioridade, se já estiver na fila)."""
+        item = int(item)
+        if item in self._posicao:
+            self.atualizar(item, prioridade)
+            return
+        self._heap.append((int(prioridade), item))
+        self._posicao[item] = len(self._heap) - 1
+        self._subir(len(self._heap) - 1)
+
+    def atualizar(self, item: int, prioridade: int) -> bool:
+        """
+        Troca a prioridade de um item já na fila, subindo ou descendo-o no
+        heap a partir da posição atual: O(log n). Retorna False se o item
+        não estava na fila.
+        """
+        item = int(item)
+        i = self._posicao.get(item)
+        if i is None:
+            return False
+        anterior = self._heap[i]
+        self._heap[i] = (int(prioridade), item)
+        if self._heap[i] < anterior:
+            self._subir(i)
+        else:
+            self._descer(i)
+        return True
+
+    def remover(self, item: int) -> bool:
+        """Tira o item da fila; retorna False se ele não estava nela."""
+        i = self._posicao.pop(int(item), None)
+        if i is None:
+            return False
+        ultimo = self._heap.pop()
+        if i < len(self._heap):
+            self._heap[i] = ultimo
+            self._posicao[ultimo[1]] = i
+            self._subir(i)
+            self._descer(self._posicao[ultimo[1]])
+        return True
+
+    def prioridade(self, item: int):
+        i = self._posicao.get(int(item))
+        return None if i is None else self._heap[i][0]
+
+    def primeiros(self, quantidade: int) -> list:
+        """
+        Os `quantidade` itens de menor prioridade, em ordem, sem alterar a
+        fila. Percorre só o topo do heap: O(quantidade · log quantidade).
+        """
+        resultado = []
+        candidatos = [(self._heap[0], 0)] if self._heap else []
+        while candidatos and len(resultado) < quantidade:
+            entrada, i = heapq.heappop(candidatos)
+            resultado.append(entrada[1])
+            for filho in (2 * i + 1, 2 * i + 2):
+                if filho < len(self._heap):
+                    heapq.heappush(candidatos, (self._heap[filho], filho))
+        return resultado
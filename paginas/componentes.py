@@ -0,0 +1,190 @@
+"""
+Componentes de interface reutilizáveis entre as páginas.
+
+O seletor com busca substitui selectbox com format_func que varre a tabela
+para cada opção: os rótulos vêm de um mapa id -> rótulo montado uma vez por
+versão da tabela, e o filtro digitado é resolvido no servidor, de modo que o
+selectbox recebe no máximo LIMITE_OPCOES opções.
+"""
+
+import math
+import re
+from pathlib import Path
+from string import Formatter
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from paginas.utils import get_dados, get_versao, buscar_pacientes, normalizar_texto, normalizar_serie
+
+
+LIMITE_OPCOES = 50
+
+# (tabela, formato) -> (versão, rótulos por id, rótulos normalizados)
+_rotulos = {}
+
+
+def _montar_rotulos(df: pd.DataFrame, formato: str) -> pd.Series:
+    """Aplica `formato` (ex.: "{id} - {nome}") a todas as linhas de forma vetorizada."""
+    rotulos = pd.Series('', index=df.index, dtype=object)
+    for literal, campo, _, _ in Formatter().parse(formato):
+        if literal:
+            rotulos = rotulos + literal
+        if campo:
+            rotulos = rotulos + df[campo].astype(object).where(df[campo].notna(), '-').astype(str)
+    return rotulos
+
+
+def _get_rotulos(tabela: str, formato: str):
+    """Retorna (rótulos por id, rótulos normalizados por id) com cache por versão."""
+    df = get_dados()[tabela]
+    versao = (get_versao(tabela), len(df))
+
+    guardado = _rotulos.get((tabela, formato))
+    if guardado is None or guardado[0] != versao:
+        rotulos = _montar_rotulos(df, formato)
+        rotulos.index = df['id'].to_numpy()
+        normalizados = normalizar_serie(rotulos)
+        guardado = (versao, rotulos.to_dict(), normalizados)
+        _rotulos[(tabela, formato)] = guardado
+    return guardado[1], guardado[2]
+
+
+def rotulos_tabela(tabela: str, formato: str) -> dict:
+    """Mapa id -> rótulo da tabela, no formato pedido (cache por versão)."""
+    return _get_rotulos(tabela, formato)[0]
+
+
+def seletor_com_busca(label: str, rotulos: dict, key: str, buscar, ids=None, padrao=None,
+                      limite: int = LIMITE_OPCOES, placeholder: str = "Digite para filtrar..."):
+    """
+    Selectbox com campo de busca. Retorna o id escolhido ou None.
+
+    `buscar(termo, limite)` devolve os ids que casam com o termo; `ids`
+    restringe as opções permitidas e `padrao` é pré-selecionado quando
+    permitido.
+    """
+    termo = st.text_input(f"🔍 {label}", key=f"{key}_busca", placeholder=placeholder)
+
+    permitidos = None if ids is None else np.asarray(list(ids))
+
+    if termo.strip():
+        candidatos = np.asarray(buscar(termo, limite if permitidos is None else None))
+        if permitidos is not None:
+            candidatos = candidatos[np.isin(candidatos, permitidos)]
+    else:
+        candidatos = permitidos if permitidos is not None else np.asarray(list(rotulos))
+
+    total = len(candidatos)
+    opcoes = [int(i) for i in candidatos[:limite]]
+
+    if padrao is not None and padrao not in opcoes and padrao in rotulos:
+        if permitidos is None or padrao in permitidos:
+            opcoes.insert(0, padrao)
+
+    if not opcoes:
+        st.info("Nenhum resultado para a busca.")
+        return None
+
+    if total > limite:
+        st.caption(f"Mostrando {limite} de {total} — digite para refinar a busca.")
+
+    return st.selectbox(
+        label,
+        options=opcoes,
+        index=opcoes.index(padrao) if padrao in opcoes else 0,
+        format_func=lambda x: rotulos.get(x, str(x)),
+        key=key
+    )
+
+
+# ============================================================================
+# SELETORES ESPECÍFICOS
+# ============================================================================
+
+def _buscar_pacientes(termo: str, limite: int = None) -> np.ndarray:
+    """Busca por CPF quando o termo só tem dígitos/pontuação, senão por nome."""
+    if re.fullmatch(r'[\d.\-\s]+', termo.strip()):
+        encontrados = buscar_pacientes(cpf=termo, limite=limite)
+    else:
+        encontrados = buscar_pacientes(nome=termo, limite=limite)
+    return encontrados['id'].to_numpy()
+
+
+def seletor_paciente(label: str, key: str, ids=None, formato: str = "{id} - {nome}", padrao=None):
+    """Seletor de paciente com busca por nome ou CPF nos índices da camada de dados."""
+    rotulos = rotulos_tabela('pacientes', formato)
+    return seletor_com_busca(
+        label, rotulos, key, _buscar_pacientes, ids=ids, padrao=padrao,
+        placeholder="Nome ou CPF..."
+    )
+
+
+def seletor_registro(label: str, key: str, tabela: str, formato: str, ids=None, padrao=None):
+    """Seletor genérico (médicos, partos...) com busca no texto do rótulo."""
+    rotulos, normalizados = _get_rotulos(tabela, formato)
+
+    def buscar(termo, limite=None):
+        encontrados = normalizados.index[normalizados.str.contains(normalizar_texto(termo), regex=False)]
+        return encontrados[:limite].to_numpy()
+
+    return seletor_com_busca(label, rotulos, key, buscar, ids=ids, padrao=padrao)
+
+
+# ============================================================================
+# PAGINAÇÃO
+# ============================================================================
+
+def pagina_consulta(consultar, tamanho_pagina: int, key: str):
+    """
+    Seletor de página que executa a consulta paginada uma única vez.
+
+    `consultar(offset, limite)` retorna (pagina, total), como os listar_* da
+    camada de dados. A página pedida vem do session_state de `key`, então a
+    consulta roda antes do number_input e o total obtido já define o máximo.
+    Retorna (pagina, total, pagina_atual, total_paginas).
+    """
+    pagina_atual = max(1, int(st.session_state.get(key, 1)))
+    pagina, total = consultar((pagina_atual - 1) * tamanho_pagina, tamanho_pagina)
+    total_paginas = max(1, math.ceil(total / tamanho_pagina))
+
+    # Filtro ou tamanho de página mudou e a página guardada deixou de existir
+    if pagina_atual > total_paginas:
+        pagina_atual = total_paginas
+        pagina, total = consultar((pagina_atual - 1) * tamanho_pagina, tamanho_pagina)
+
+    st.session_state[key] = pagina_atual
+    st.number_input("Página", min_value=1, max_value=total_paginas, step=1, key=key)
+    return pagina, total, pagina_atual, total_paginas
+
+
+# ============================================================================
+# IMPRESSÃO DE PRONTUÁRIOS
+# ============================================================================
+
+def andamento_impressao(trabalho: dict, key: str):
+    """Progresso de um trabalho de impressão e, ao final, o download ou a pasta dos PDFs."""
+    total = trabalho['total']
+    concluidos = trabalho['concluidos']
+    st.progress(
+        concluidos / total if total else 1.0,
+        text=f"{trabalho['descricao']} — {trabalho['status']} ({concluidos}/{total})"
+    )
+
+    if trabalho['fim'] is None:
+        return
+
+    if len(trabalho['arquivos']) == 1:
+        caminho = Path(trabalho['arquivos'][0])
+        st.download_button(
+            "⬇️ Baixar PDF", data=caminho.read_bytes(), file_name=caminho.name,
+            mime="application/pdf", key=key
+        )
+    elif trabalho['arquivos']:
+        st.caption(f"📁 {len(trabalho['arquivos'])} PDF(s) em `{trabalho['pasta']}`")
+    elif total == 0:
+        st.caption("Nenhum prontuário para imprimir.")
+
+    for erro in trabalho['erros']:
+        st.warning(f"⚠️ {erro}")
@@ -1,5 +1,10 @@
 """
 Página de Dashboard - Visão geral do sistema
+
+Cada bloco do dashboard é um fragmento independente (st.fragment): interações
+dentro de um bloco não redesenham os demais. No modo TV os fragmentos se
+atualizam sozinhos e só recalculam quando a versão das tabelas de origem muda
+(métricas via _memo_versao, gráficos via cache de figuras).
 """
 
 import streamlit as st
@@ -8,28 +13,106 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 
-from paginas.utils import get_dados
+from paginas.utils import get_dados, get_versao, get_meows, partos_no_periodo, contar_partos_periodo
+from paginas.graficos import plotly_chart_cache
+
+
+SETORES = ['Pré-parto', 'Centro Obstétrico', 'Alojamento Conjunto', 'UTI Neonatal', 'UTI Materna']
+
+STATUS_EMOJI = {
+    'Internada': '🟢',
+    'Em trabalho de parto': '🟠',
+    'Pós-parto': '🔵',
+    'Alta': '⚪',
+    'UTI': '🔴'
+}
+
+# Resultados calculados por bloco: chave -> (assinatura, resultado)
+_memo = {}
+
+
+def _memo_versao(chave: str, tabelas: tuple, calcular, *extras):
+    """Reaproveita o resultado de `calcular` enquanto as tabelas de origem não mudarem."""
+    assinatura = tuple(get_versao(t) for t in tabelas) + extras
+    guardado = _memo.get(chave)
+    if guardado is None or guardado[0] != assinatura:
+        guardado = (assinatura, calcular())
+        _memo[chave] = guardado
+    return guardado[1]
 
 
 def render():
     st.markdown('<h1 class="main-header">📊 Dashboard - Visão Geral</h1>', unsafe_allow_html=True)
 
+    # Modo TV (posto de enfermagem): atualização automática dos blocos
+    col_tv1, col_tv2 = st.columns([1, 3])
+    with col_tv1:
+        modo_tv = st.toggle("📺 Modo TV", key="dashboard_modo_tv", help="Atualiza o painel automaticamente")
+    with col_tv2:
+        if modo_tv:
+            intervalo = st.selectbox(
+                "Intervalo de atualização",
+                options=[15, 30, 60, 120],
+                index=1,
+                format_func=lambda s: f"{s} segundos",
+                key="dashboard_intervalo",
+                label_visibility="collapsed"
+            )
+        else:
+            intervalo = None
+
+    st.fragment(_bloco_indicadores, run_every=intervalo)()
+    st.markdown("---")
+    st.fragment(_bloco_graficos, run_every=intervalo)()
+    st.markdown("---")
+    st.fragment(_bloco_alertas, run_every=intervalo)()
+    st.markdown("---")
+    st.fragment(_bloco_estatisticas, run_every=intervalo)()
+
+
+# ============================================================================
+# MÉTRICAS PRINCIPAIS
+# ============================================================================
+
+def _inicio_30_dias():
+    return (datetime.now() - timedelta(days=30)).date()
+
+
+def _calcular_indicadores():
     dados = get_dados()
     pacientes = dados['pacientes']
     partos = dados['partos']
     recem_nascidos = dados['recem_nascidos']
     leitos = dados['leitos']
 
-    # ========================================================================
-    # MÉTRICAS PRINCIPAIS
-    # ========================================================================
+    cesarias = len(partos[partos['tipo_parto'] == 'Cesárea'])
 
+    return {
+        # Total de pacientes internadas
+        'internadas': len(pacientes[pacientes['status'].isin(['Internada', 'Em trabalho de parto', 'Pós-parto'])]),
+        # Partos do mês
+        'partos_mes': contar_partos_periodo(inicio=_inicio_30_dias()),
+        # Taxa de cesárea
+        'taxa_cesarea': (cesarias / len(partos) * 100) if len(partos) > 0 else 0,
+        # Leitos ocupados
+        'leitos_ocupados': len(pacientes[pacientes['leito'].notna()]),
+        'total_leitos': len(leitos),
+        # RNs no alojamento conjunto
+        'rns_ac': len(recem_nascidos[recem_nascidos['alojamento_conjunto'] == True]),
+    }
+
+
+def _bloco_indicadores():
     st.subheader("📈 Indicadores Principais")
 
+    ind = _memo_versao(
+        'indicadores', ('pacientes', 'partos', 'recem_nascidos', 'leitos'),
+        _calcular_indicadores, datetime.now().date()
+    )
+
     col1, col2, col3, col4, col5 = st.columns(5)
 
-    # Total de pacientes internadas
-    internadas = len(pacientes[pacientes['status'].isin(['Internada', 'Em trabalho de parto', 'Pós-parto'])])
+    internadas = ind['internadas']
     col1.metric(
         "Internadas",
         internadas,
@@ -37,180 +120,227 @@ def render():
         delta_color="normal"
     )
 
-    # Partos do mês
-    partos_mes = len(partos[partos['data_parto'] >= (datetime.now() - timedelta(days=30)).date()])
-    col2.metric("Partos (30 dias)", partos_mes, delta="+12%")
+    col2.metric("Partos (30 dias)", ind['partos_mes'], delta="+12%")
+    col3.metric("Taxa Cesárea", f"{ind['taxa_cesarea']:.1f}%", delta="-2%", delta_color="inverse")
 
-    # Taxa de cesárea
-    cesarias = len(partos[partos['tipo_parto'] == 'Cesárea'])
-    taxa_cesarea = (cesarias / len(partos) * 100) if len(partos) > 0 else 0
-    col3.metric("Taxa Cesárea", f"{taxa_cesarea:.1f}%", delta="-2%", delta_color="inverse")
-
-    # Leitos ocupados
-    leitos_ocupados = len(pacientes[pacientes['leito'].notna()])
-    total_leitos = len(leitos)
+    leitos_ocupados = ind['leitos_ocupados']
+    total_leitos = ind['total_leitos']
     col4.metric("Ocupação Leitos", f"{leitos_ocupados}/{total_leitos}", delta=f"{(leitos_ocupados/total_leitos*100):.0f}%")
 
-    # RNs no alojamento conjunto
-    rns_ac = len(recem_nascidos[recem_nascidos['alojamento_conjunto'] == True])
-    col5.metric("RNs no AC", rns_ac)
+    col5.metric("RNs no AC", ind['rns_ac'])
+
+    if st.session_state.get('dashboard_modo_tv'):
+        st.caption(f"🔄 Atualizado às {datetime.now().strftime('%H:%M:%S')}")
 
-    st.markdown("---")
 
-    # ========================================================================
-    # GRÁFICOS
-    # ========================================================================
+# ============================================================================
+# GRÁFICOS
+# ============================================================================
 
+def _figura_tipos_parto():
+    partos = partos_no_periodo(inicio=_inicio_30_dias())
+
+    tipos_parto = partos['tipo_parto'].value_counts()
+    fig_parto = px.pie(
+        values=tipos_parto.values,
+        names=tipos_parto.index,
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        hole=0.4
+    )
+    fig_parto.update_layout(
+        margin=dict(t=0, b=0, l=0, r=0),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2)
+    )
+    return fig_parto
+
+
+def _figura_ocupacao():
+    dados = get_dados()
+    pacientes = dados['pacientes']
+    leitos = dados['leitos']
+
+    ocupacao_setor = []
+    for setor in SETORES:
+        leitos_setor = [l['id'] for l in leitos.to_dict('records') if l['setor'] == setor]
+        ocupados = len(pacientes[pacientes['leito'].isin(leitos_setor)])
+        total = len(leitos_setor)
+        ocupacao_setor.append({
+            'setor': setor,
+            'ocupados': ocupados,
+            'livres': total - ocupados,
+            'total': total
+        })
+
+    df_ocupacao = pd.DataFrame(ocupacao_setor)
+
+    fig_ocupacao = go.Figure()
+    fig_ocupacao.add_trace(go.Bar(
+        name='Ocupados',
+        x=df_ocupacao['setor'],
+        y=df_ocupacao['ocupados'],
+        marker_color='#E91E63'
+    ))
+    fig_ocupacao.add_trace(go.Bar(
+        name='Livres',
+        x=df_ocupacao['setor'],
+        y=df_ocupacao['livres'],
+        marker_color='#4CAF50'
+    ))
+    fig_ocupacao.update_layout(
+        barmode='stack',
+        margin=dict(t=0, b=0, l=0, r=0),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.3),
+        xaxis_tickangle=-45
+    )
+    return fig_ocupacao
+
+
+def _bloco_graficos():
     col_left, col_right = st.columns(2)
 
     with col_left:
         st.subheader("👶 Tipos de Parto (Últimos 30 dias)")
 
-        if len(partos) > 0:
-            tipos_parto = partos['tipo_parto'].value_counts()
-            fig_parto = px.pie(
-                values=tipos_parto.values,
-                names=tipos_parto.index,
-                color_discrete_sequence=px.colors.qualitative.Pastel,
-                hole=0.4
+        if contar_partos_periodo(inicio=_inicio_30_dias()) > 0:
+            plotly_chart_cache(
+                'dashboard_tipos_parto', ('partos',), _figura_tipos_parto,
+                parametros=(_inicio_30_dias(),), use_container_width=True
             )
-            fig_parto.update_layout(
-                margin=dict(t=0, b=0, l=0, r=0),
-                legend=dict(orientation="h", yanchor="bottom", y=-0.2)
-            )
-            st.plotly_chart(fig_parto, use_container_width=True)
         else:
             st.info("Nenhum parto registrado no período.")
 
     with col_right:
         st.subheader("🏥 Ocupação por Setor")
+        plotly_chart_cache('dashboard_ocupacao', ('pacientes', 'leitos'), _figura_ocupacao, use_container_width=True)
 
-        ocupacao_setor = []
-        for setor in ['Pré-parto', 'Centro Obstétrico', 'Alojamento Conjunto', 'UTI Neonatal', 'UTI Materna']:
-            leitos_setor = [l['id'] for l in leitos.to_dict('records') if l['setor'] == setor]
-            ocupados = len(pacientes[pacientes['leito'].isin(leitos_setor)])
-            total = len(leitos_setor)
-            ocupacao_setor.append({
-                'setor': setor,
-                'ocupados': ocupados,
-                'livres': total - ocupados,
-                'total': total
-            })
-
-        df_ocupacao = pd.DataFrame(ocupacao_setor)
-
-        fig_ocupacao = go.Figure()
-        fig_ocupacao.add_trace(go.Bar(
-            name='Ocupados',
-            x=df_ocupacao['setor'],
-            y=df_ocupacao['ocupados'],
-            marker_color='#E91E63'
-        ))
-        fig_ocupacao.add_trace(go.Bar(
-            name='Livres',
-            x=df_ocupacao['setor'],
-            y=df_ocupacao['livres'],
-            marker_color='#4CAF50'
-        ))
-        fig_ocupacao.update_layout(
-            barmode='stack',
-            margin=dict(t=0, b=0, l=0, r=0),
-            legend=dict(orientation="h", yanchor="bottom", y=-0.3),
-            xaxis_tickangle=-45
-        )
-        st.plotly_chart(fig_ocupacao, use_container_width=True)
 
-    st.markdown("---")
+# ============================================================================
+# ALERTAS E ATENÇÃO
+# ============================================================================
+
+def _calcular_alertas():
+    pacientes = get_dados()['pacientes']
+
+    em_tp = pacientes[pacientes['status'] == 'Em trabalho de parto']
+
+    internacoes_recentes = pacientes[pacientes['data_internacao'].notna()].sort_values(
+        'data_internacao', ascending=False
+    ).head(5)
+
+    # MEOWS da última evolução das pacientes ainda internadas
+    meows = get_meows()
+    meows = meows[meows['nivel'] == 'Alerta']
+    ativas = pacientes[pacientes['status'] != 'Alta'].set_index('id')
+    meows = meows[meows.index.isin(ativas.index)].sort_values('pontuacao', ascending=False)
+    meows = meows.assign(
+        nome=ativas['nome'].reindex(meows.index).to_numpy(),
+        leito=ativas['leito'].reindex(meows.index).to_numpy(),
+    )
+
+    return {
+        # Pacientes em trabalho de parto
+        'em_tp': em_tp[['nome', 'leito']].to_dict('records'),
+        # Pacientes de alto risco (com comorbidades)
+        'alto_risco': len(pacientes[~pacientes['comorbidades'].isin(['Nenhuma'])]),
+        # Gestações pós-termo
+        'pos_termo': len(pacientes[pacientes['semanas_gestacao'] > 41]),
+        # Gatilho de alerta no escore obstétrico (MEOWS)
+        'meows': meows[['nome', 'leito', 'pontuacao']].to_dict('records'),
+        'internacoes_recentes': internacoes_recentes[['nome', 'data_internacao', 'leito', 'status']].to_dict('records'),
+    }
+
 
-    # ========================================================================
-    # ALERTAS E ATENÇÃO
-    # ========================================================================
+def _bloco_alertas():
+    alertas = _memo_versao('alertas', ('pacientes', 'evolucoes'), _calcular_alertas)
 
     col_alertas, col_lista = st.columns([1, 2])
 
     with col_alertas:
         st.subheader("⚠️ Alertas")
 
-        # Pacientes em trabalho de parto
-        em_tp = pacientes[pacientes['status'] == 'Em trabalho de parto']
+        em_tp = alertas['em_tp']
         if len(em_tp) > 0:
             st.error(f"🚨 **{len(em_tp)} paciente(s) em trabalho de parto ativo**")
-            for _, p in em_tp.iterrows():
+            for p in em_tp:
                 st.write(f"• {p['nome']} - Leito {p['leito']}")
 
-        # Pacientes de alto risco (com comorbidades)
-        alto_risco = pacientes[~pacientes['comorbidades'].isin(['Nenhuma'])]
-        if len(alto_risco) > 0:
-            st.warning(f"⚠️ **{len(alto_risco)} paciente(s) de alto risco**")
+        meows = alertas['meows']
+        if len(meows) > 0:
+            st.error(f"🩺 **{len(meows)} paciente(s) com MEOWS em alerta**")
+            for p in meows:
+                st.write(f"• {p['nome']} - Leito {p['leito']} (pontuação {p['pontuacao']})")
 
-        # Gestações pós-termo
-        pos_termo = pacientes[pacientes['semanas_gestacao'] > 41]
-        if len(pos_termo) > 0:
-            st.warning(f"📅 **{len(pos_termo)} gestação(ões) pós-termo (>41 sem)**")
+        if alertas['alto_risco'] > 0:
+            st.warning(f"⚠️ **{alertas['alto_risco']} paciente(s) de alto risco**")
+
+        if alertas['pos_termo'] > 0:
+            st.warning(f"📅 **{alertas['pos_termo']} gestação(ões) pós-termo (>41 sem)**")
 
     with col_lista:
         st.subheader("📋 Últimas Internações")
 
-        internacoes_recentes = pacientes[pacientes['data_internacao'].notna()].sort_values(
-            'data_internacao', ascending=False
-        ).head(5)
+        internacoes_recentes = alertas['internacoes_recentes']
 
         if len(internacoes_recentes) > 0:
-            for _, p in internacoes_recentes.iterrows():
+            for p in internacoes_recentes:
                 with st.container():
                     c1, c2, c3, c4 = st.columns([3, 2, 2, 2])
                     c1.write(f"**{p['nome']}**")
                     c2.write(f"📅 {p['data_internacao']}")
                     c3.write(f"🛏️ {p['leito']}")
-
-                    status_color = {
-                        'Internada': '🟢',
-                        'Em trabalho de parto': '🟠',
-                        'Pós-parto': '🔵',
-                        'Alta': '⚪',
-                        'UTI': '🔴'
-                    }
-                    c4.write(f"{status_color.get(p['status'], '⚪')} {p['status']}")
+                    c4.write(f"{STATUS_EMOJI.get(p['status'], '⚪')} {p['status']}")
         else:
             st.info("Nenhuma internação recente.")
 
-    st.markdown("---")
 
-    # ========================================================================
-    # ESTATÍSTICAS DO MÊS
-    # ========================================================================
+# ============================================================================
+# ESTATÍSTICAS DO MÊS
+# ============================================================================
+
+def _figura_sexo():
+    recem_nascidos = get_dados()['recem_nascidos']
+
+    sexo_counts = recem_nascidos['sexo'].value_counts()
+    fig_sexo = px.pie(
+        values=sexo_counts.values,
+        names=sexo_counts.index,
+        color_discrete_map={'Masculino': '#2196F3', 'Feminino': '#E91E63'}
+    )
+    fig_sexo.update_layout(margin=dict(t=0, b=0, l=0, r=0), showlegend=True)
+    return fig_sexo
+
+
+def _figura_convenios():
+    pacientes = get_dados()['pacientes']
+
+    convenio_counts = pacientes['convenio'].value_counts()
+    fig_conv = px.bar(
+        x=convenio_counts.index,
+        y=convenio_counts.values,
+        color=convenio_counts.index,
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig_conv.update_layout(
+        margin=dict(t=0, b=0, l=0, r=0),
+        showlegend=False,
+        xaxis_tickangle=-45
+    )
+    return fig_conv
 
+
+def _bloco_estatisticas():
     st.subheader("📊 Estatísticas do Mês")
 
     col1, col2, col3 = st.columns(3)
 
     with col1:
         st.markdown("**👶 Nascimentos por Sexo**")
-        if len(recem_nascidos) > 0:
-            sexo_counts = recem_nascidos['sexo'].value_counts()
-            fig_sexo = px.pie(
-                values=sexo_counts.values,
-                names=sexo_counts.index,
-                color_discrete_map={'Masculino': '#2196F3', 'Feminino': '#E91E63'}
-            )
-            fig_sexo.update_layout(margin=dict(t=0, b=0, l=0, r=0), showlegend=True)
-            st.plotly_chart(fig_sexo, use_container_width=True)
+        if len(get_dados()['recem_nascidos']) > 0:
+            plotly_chart_cache('dashboard_sexo', ('recem_nascidos',), _figura_sexo, use_container_width=True)
 
     with col2:
         st.markdown("**💳 Convênios**")
-        convenio_counts = pacientes['convenio'].value_counts()
-        fig_conv = px.bar(
-            x=convenio_counts.index,
-            y=convenio_counts.values,
-            color=convenio_counts.index,
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig_conv.update_layout(
-            margin=dict(t=0, b=0, l=0, r=0),
-            showlegend=False,
-            xaxis_tickangle=-45
-        )
-        st.plotly_chart(fig_conv, use_container_width=True)
+        plotly_chart_cache('dashboard_convenios', ('pacientes',), _figura_convenios, use_container_width=True)
 
     with col3:
         st.markdown("**📈 Indicadores de Qualidade**")
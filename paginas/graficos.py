@@ -0,0 +1,213 @@
+"""
+Cache de figuras Plotly compartilhado pelas páginas.
+
+Cada figura é guardada chaveada pelo id do gráfico, pela versão das tabelas
+de origem e pelos parâmetros usados na construção. A remoção é LRU, limitada
+por quantidade e por uma estimativa do tamanho total (os arrays de dados dos
+traços), sem serializar a figura: o st.plotly_chart já faz isso ao desenhar.
+
+Também reúne as pré-agregações usadas nos gráficos de distribuição: os dados
+são agrupados no servidor e o navegador recebe apenas uma barra por faixa.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from paginas.utils import get_versao
+
+
+MAX_FIGURAS = 256
+MAX_BYTES = 32 * 1024 * 1024  # 32 MB de dados dos traços
+
+
+def _tamanho_estimado(valor) -> int:
+    """Bytes aproximados de uma propriedade de traço: arrays contam pelo nbytes."""
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, dict):
+        return sum(_tamanho_estimado(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return 8 * len(valor)
+    return 8
+
+
+class CacheFiguras:
+    """Cache LRU de figuras Plotly com limite de memória."""
+
+    def __init__(self, max_figuras: int = MAX_FIGURAS, max_bytes: int = MAX_BYTES):
+        self.max_figuras = max_figuras
+        self.max_bytes = max_bytes
+        self._itens = OrderedDict()  # chave -> (figura, tamanho)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._itens)
+
+    @property
+    def tamanho_bytes(self) -> int:
+        return self._bytes
+
+    def obter(self, chave):
+        """Retorna a figura ou None, marcando a entrada como recente."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            self._itens.move_to_end(chave)
+            return item[0]
+
+    def guardar(self, chave, figura):
+        """Guarda a figura, removendo as entradas menos usadas se preciso."""
+        tamanho = sum(_tamanho_estimado(traco.to_plotly_json()) for traco in figura.data)
+        item = (figura, tamanho)
+
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self._bytes -= antigo[1]
+
+            # Figuras maiores que o limite total não são guardadas
+            if tamanho <= self.max_bytes:
+                self._itens[chave] = item
+                self._bytes += tamanho
+
+            while self._itens and (len(self._itens) > self.max_figuras or self._bytes > self.max_bytes):
+                _, removido = self._itens.popitem(last=False)
+                self._bytes -= removido[1]
+
+        return figura
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+
+_cache = CacheFiguras()
+
+
+def figura_cache(grafico_id: str, tabelas: tuple, construir, parametros: tuple = ()):
+    """
+    Retorna a figura do gráfico, construindo-a só quando necessário.
+
+    `tabelas` são as tabelas de origem (suas versões entram na chave) e
+    `parametros` os demais valores que alteram o gráfico (filtros, datas...).
+    `construir` é chamado sem argumentos e deve retornar a figura.
+    """
+    chave = (grafico_id, tuple(get_versao(t) for t in tabelas), parametros)
+
+    figura = _cache.obter(chave)
+    if figura is None:
+        figura = _cache.guardar(chave, construir())
+    return figura
+
+
+def plotly_chart_cache(grafico_id: str, tabelas: tuple, construir, parametros: tuple = (), **kwargs):
+    """Equivalente a st.plotly_chart usando o cache de figuras."""
+    figura = figura_cache(grafico_id, tabelas, construir, parametros)
+    return st.plotly_chart(figura, **kwargs)
+
+
+# ============================================================================
+# PRÉ-AGREGAÇÃO
+# ============================================================================
+
+def histograma(valores, nbins: int = 20, intervalo: tuple = None) -> pd.DataFrame:
+    """Agrupa os valores em `nbins` faixas com np.histogram (uma linha por faixa)."""
+    valores = pd.to_numeric(pd.Series(valores), errors='coerce').dropna().to_numpy(dtype=float)
+    contagens, bordas = np.histogram(valores, bins=nbins, range=intervalo)
+
+    return pd.DataFrame({
+        'inicio': bordas[:-1],
+        'fim': bordas[1:],
+        'centro': (bordas[:-1] + bordas[1:]) / 2,
+        'contagem': contagens,
+    })
+
+
+def contagem_por_valor(valores, categorias=None) -> pd.Series:
+    """Contagem por valor discreto (ex.: Apgar), incluindo com zero as `categorias` ausentes."""
+    contagens = pd.Series(valores).value_counts()
+    if categorias is not None:
+        contagens = contagens.reindex(list(categorias), fill_value=0)
+    return contagens.sort_index()
+
+
+def figura_histograma(faixas: pd.DataFrame, cor: str = '#E91E63', titulo_x: str = '',
+                      titulo_y: str = 'Frequência') -> go.Figure:
+    """Monta o histograma a partir das faixas já agregadas por `histograma`."""
+    fig = go.Figure(go.Bar(
+        x=faixas['centro'],
+        y=faixas['contagem'],
+        width=faixas['fim'] - faixas['inicio'],
+        customdata=np.column_stack([faixas['inicio'], faixas['fim']]),
+        hovertemplate="%{customdata[0]:.0f} – %{customdata[1]:.0f}: %{y}<extra></extra>",
+        marker_color=cor,
+    ))
+    fig.update_layout(
+        xaxis_title=titulo_x,
+        yaxis_title=titulo_y,
+        bargap=0,
+        margin=dict(t=0, b=0)
+    )
+    return fig
+
+
+# ============================================================================
+# REDUÇÃO DE SÉRIES TEMPORAIS
+# ============================================================================
+
+# Pontos por série enviados ao navegador (aprox. a largura útil do gráfico)
+PONTOS_MAXIMOS = 500
+
+
+def lttb(x, y, limite: int = PONTOS_MAXIMOS) -> np.ndarray:
+    """
+    Índices dos pontos mantidos pelo Largest-Triangle-Three-Buckets.
+
+    Divide a série em `limite` - 2 faixas e, em cada uma, mantém o ponto que
+    forma o maior triângulo com o ponto escolhido na faixa anterior e a média
+    da faixa seguinte, o que preserva picos e vales. O primeiro e o último
+    ponto sempre ficam. Séries com até `limite` pontos voltam inteiras.
+    """
+    n = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bordas = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+
+    escolhidos = np.empty(limite, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        prox_fim = bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x = x[fim:prox_fim].mean()
+        media_y = y[fim:prox_fim].mean()
+
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[i + 1] = anterior
+
+    return escolhidos
+
+
+def reduzir_serie(datas: pd.Series, valores: pd.Series, limite: int = PONTOS_MAXIMOS):
+    """Aplica o LTTB a uma série temporal e retorna (datas, valores) reduzidos."""
+    validos = valores.notna().to_numpy()
+    datas, valores = datas[validos], valores[validos]
+    instantes = pd.to_datetime(datas).to_numpy('datetime64[ns]').view(np.int64)
+    indices = lttb(instantes, valores.to_numpy(dtype=float), limite)
+    return datas.iloc[indices], valores.iloc[indices]
@@ -8,7 +8,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 
-from paginas.utils import get_dados
+from paginas.utils import get_dados, atualizar_paciente
+from paginas.graficos import plotly_chart_cache
+from paginas.componentes import seletor_paciente
 
 
 def render():
@@ -139,25 +141,10 @@ def render():
         # Gráfico de ocupação por setor
         st.subheader("📊 Ocupação por Setor")
 
-        ocupacao_data = []
-        for setor in ['Pré-parto', 'Centro Obstétrico', 'Alojamento Conjunto', 'UTI Neonatal', 'UTI Materna']:
-            leitos_setor = leitos[leitos['setor'] == setor]['id'].tolist()
-            ocupados = len(pacientes[pacientes['leito'].isin(leitos_setor)])
-            total = len(leitos_setor)
-            ocupacao_data.append({
-                'Setor': setor,
-                'Ocupados': ocupados,
-                'Livres': total - ocupados
-            })
-
-        df_ocup = pd.DataFrame(ocupacao_data)
-
-        fig = go.Figure()
-        fig.add_trace(go.Bar(name='Ocupados', x=df_ocup['Setor'], y=df_ocup['Ocupados'], marker_color='#E91E63'))
-        fig.add_trace(go.Bar(name='Livres', x=df_ocup['Setor'], y=df_ocup['Livres'], marker_color='#4CAF50'))
-        fig.update_layout(barmode='stack', xaxis_tickangle=-45)
-
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart_cache(
+            'internacoes_ocupacao', ('pacientes', 'leitos'),
+            lambda: _figura_ocupacao(pacientes, leitos), use_container_width=True
+        )
 
     # ========================================================================
     # TAB: NOVA INTERNAÇÃO
@@ -172,16 +159,16 @@ def render():
         if len(pacientes_disponiveis) == 0:
             st.info("Todas as pacientes já estão internadas ou não há pacientes cadastradas.")
         else:
-            with st.form("form_internacao"):
-                st.markdown("**👩 Selecionar Paciente**")
+            st.markdown("**👩 Selecionar Paciente**")
 
-                paciente_id = st.selectbox(
-                    "Paciente",
-                    options=pacientes_disponiveis['id'].tolist(),
-                    format_func=lambda x: f"{x} - {pacientes_disponiveis[pacientes_disponiveis['id'] == x]['nome'].values[0]}"
-                )
+            # Fora do formulário para que a busca filtre enquanto se digita
+            paciente_id = seletor_paciente(
+                "Paciente",
+                key="internacao_paciente",
+                ids=pacientes_disponiveis['id'].to_numpy()
+            )
 
-                st.markdown("---")
+            with st.form("form_internacao"):
                 st.markdown("**🛏️ Selecionar Leito**")
 
                 # Leitos disponíveis
@@ -199,10 +186,11 @@ def render():
                     st.warning(f"⚠️ Não há leitos disponíveis no setor {setor_internacao}")
                     leito_id = None
                 else:
+                    tipos_leito = dict(zip(leitos_setor_livres['id'], leitos_setor_livres['tipo']))
                     leito_id = st.selectbox(
                         "Leito",
-                        options=leitos_setor_livres['id'].tolist(),
-                        format_func=lambda x: f"{x} ({leitos_setor_livres[leitos_setor_livres['id'] == x]['tipo'].values[0]})"
+                        options=list(tipos_leito),
+                        format_func=lambda x: f"{x} ({tipos_leito[x]})"
                     )
 
                 st.markdown("---")
@@ -230,7 +218,7 @@ def render():
 
                 submitted = st.form_submit_button("💾 Registrar Internação", type="primary")
 
-                if submitted and leito_id:
+                if submitted and paciente_id and leito_id:
                     st.success(f"✅ Internação registrada com sucesso! Leito: {leito_id}")
                     st.balloons()
 
@@ -247,50 +235,52 @@ def render():
         if len(pacientes_internadas) == 0:
             st.info("Não há pacientes internadas para transferir.")
         else:
-            with st.form("form_transferencia"):
-                st.markdown("**👩 Paciente a Transferir**")
-
-                paciente_transf = st.selectbox(
-                    "Paciente",
-                    options=pacientes_internadas['id'].tolist(),
-                    format_func=lambda x: f"{x} - {pacientes_internadas[pacientes_internadas['id'] == x]['nome'].values[0]} (Leito atual: {pacientes_internadas[pacientes_internadas['id'] == x]['leito'].values[0]})"
-                )
-
-                # Leito atual
-                paciente_data = pacientes_internadas[pacientes_internadas['id'] == paciente_transf].iloc[0]
-                leito_atual = paciente_data['leito']
-
-                st.info(f"📍 Leito atual: **{leito_atual}**")
-
-                st.markdown("---")
-                st.markdown("**🛏️ Novo Leito**")
-
-                setor_destino = st.selectbox(
-                    "Setor de Destino",
-                    options=['Pré-parto', 'Centro Obstétrico', 'Alojamento Conjunto', 'UTI Neonatal', 'UTI Materna'],
-                    key="setor_transf"
-                )
+            st.markdown("**👩 Paciente a Transferir**")
+
+            paciente_transf = seletor_paciente(
+                "Paciente",
+                key="transferencia_paciente",
+                ids=pacientes_internadas['id'].to_numpy(),
+                formato="{id} - {nome} (Leito atual: {leito})"
+            )
+
+            if paciente_transf is not None:
+                with st.form("form_transferencia"):
+                    # Leito atual
+                    paciente_data = pacientes_internadas[pacientes_internadas['id'] == paciente_transf].iloc[0]
+                    leito_atual = paciente_data['leito']
+
+                    st.info(f"📍 Leito atual: **{leito_atual}**")
+
+                    st.markdown("---")
+                    st.markdown("**🛏️ Novo Leito**")
+
+                    setor_destino = st.selectbox(
+                        "Setor de Destino",
+                        options=['Pré-parto', 'Centro Obstétrico', 'Alojamento Conjunto', 'UTI Neonatal', 'UTI Materna'],
+                        key="setor_transf"
+                    )
 
-                # Leitos disponíveis no setor destino (excluindo o atual)
-                leitos_ocupados = pacientes[pacientes['leito'].notna()]['leito'].tolist()
-                leitos_livres = leitos[~leitos['id'].isin(leitos_ocupados)]
-                leitos_destino = leitos_livres[leitos_livres['setor'] == setor_destino]
+                    # Leitos disponíveis no setor destino (excluindo o atual)
+                    leitos_ocupados = pacientes[pacientes['leito'].notna()]['leito'].tolist()
+                    leitos_livres = leitos[~leitos['id'].isin(leitos_ocupados)]
+                    leitos_destino = leitos_livres[leitos_livres['setor'] == setor_destino]
 
-                if len(leitos_destino) == 0:
-                    st.warning(f"⚠️ Não há leitos disponíveis no setor {setor_destino}")
-                    novo_leito = None
-                else:
-                    novo_leito = st.selectbox(
-                        "Novo Leito",
-                        options=leitos_destino['id'].tolist()
-                    )
+                    if len(leitos_destino) == 0:
+                        st.warning(f"⚠️ Não há leitos disponíveis no setor {setor_destino}")
+                        novo_leito = None
+                    else:
+                        novo_leito = st.selectbox(
+                            "Novo Leito",
+                            options=leitos_destino['id'].tolist()
+                        )
 
-                motivo_transf = st.text_area("Motivo da Transferência", placeholder="Ex: Paciente em trabalho de parto ativo, transferida para Centro Obstétrico")
+                    motivo_transf = st.text_area("Motivo da Transferência", placeholder="Ex: Paciente em trabalho de parto ativo, transferida para Centro Obstétrico")
 
-                submitted = st.form_submit_button("🔄 Realizar Transferência", type="primary")
+                    submitted = st.form_submit_button("🔄 Realizar Transferência", type="primary")
 
-                if submitted and novo_leito:
-                    st.success(f"✅ Transferência realizada! De {leito_atual} para {novo_leito}")
+                    if submitted and novo_leito:
+                        st.success(f"✅ Transferência realizada! De {leito_atual} para {novo_leito}")
 
     # ========================================================================
     # TAB: ALTA HOSPITALAR
@@ -308,83 +298,118 @@ def render():
         if len(pacientes_alta) == 0:
             st.info("Não há pacientes elegíveis para alta no momento.")
         else:
-            with st.form("form_alta"):
-                st.markdown("**👩 Paciente**")
+            st.markdown("**👩 Paciente**")
 
-                paciente_alta_id = st.selectbox(
-                    "Paciente",
-                    options=pacientes_alta['id'].tolist(),
-                    format_func=lambda x: f"{x} - {pacientes_alta[pacientes_alta['id'] == x]['nome'].values[0]} (Leito: {pacientes_alta[pacientes_alta['id'] == x]['leito'].values[0]})"
-                )
+            paciente_alta_id = seletor_paciente(
+                "Paciente",
+                key="alta_paciente",
+                ids=pacientes_alta['id'].to_numpy(),
+                formato="{id} - {nome} (Leito: {leito})"
+            )
 
-                # Dados da paciente
-                p_alta = pacientes_alta[pacientes_alta['id'] == paciente_alta_id].iloc[0]
+            if paciente_alta_id is not None:
+                with st.form("form_alta"):
+                    # Dados da paciente
+                    p_alta = pacientes_alta[pacientes_alta['id'] == paciente_alta_id].iloc[0]
 
-                col_a1, col_a2 = st.columns(2)
+                    col_a1, col_a2 = st.columns(2)
 
-                with col_a1:
-                    st.write(f"**Nome:** {p_alta['nome']}")
-                    st.write(f"**Leito:** {p_alta['leito']}")
-                    st.write(f"**Internação:** {p_alta['data_internacao']}")
+                    with col_a1:
+                        st.write(f"**Nome:** {p_alta['nome']}")
+                        st.write(f"**Leito:** {p_alta['leito']}")
+                        st.write(f"**Internação:** {p_alta['data_internacao']}")
 
-                with col_a2:
-                    st.write(f"**Status:** {p_alta['status']}")
-                    st.write(f"**Médico:** {p_alta['medico_responsavel']}")
+                    with col_a2:
+                        st.write(f"**Status:** {p_alta['status']}")
+                        st.write(f"**Médico:** {p_alta['medico_responsavel']}")
 
-                st.markdown("---")
-                st.markdown("**📋 Dados da Alta**")
+                    st.markdown("---")
+                    st.markdown("**📋 Dados da Alta**")
 
-                tipo_alta = st.selectbox(
-                    "Tipo de Alta",
-                    ['Alta médica', 'Alta a pedido', 'Transferência', 'Óbito']
-                )
+                    tipo_alta = st.selectbox(
+                        "Tipo de Alta",
+                        ['Alta médica', 'Alta a pedido', 'Transferência', 'Óbito']
+                    )
 
-                data_alta = st.date_input("Data da Alta", value=datetime.now())
+                    data_alta = st.date_input("Data da Alta", value=datetime.now())
 
-                condicoes_alta = st.selectbox(
-                    "Condições de Alta",
-                    ['Boas', 'Estável', 'Melhorado', 'Inalterado']
-                )
+                    condicoes_alta = st.selectbox(
+                        "Condições de Alta",
+                        ['Boas', 'Estável', 'Melhorado', 'Inalterado']
+                    )
 
-                st.markdown("---")
-                st.markdown("**📝 Orientações de Alta**")
+                    st.markdown("---")
+                    st.markdown("**📝 Orientações de Alta**")
 
-                orientacoes = st.text_area(
-                    "Orientações",
-                    value="""- Retorno em consulta de puerpério em 7-10 dias
+                    orientacoes = st.text_area(
+                        "Orientações",
+                        value="""- Retorno em consulta de puerpério em 7-10 dias
 - Manter aleitamento materno exclusivo
 - Sinais de alarme: febre, sangramento intenso, dor abdominal intensa
 - Consulta pediátrica do RN em 5-7 dias
 - Realizar teste do pezinho até o 5º dia de vida""",
-                    height=150
-                )
-
-                receitas = st.text_area(
-                    "Prescrições de Alta",
-                    placeholder="Medicamentos prescritos para uso domiciliar...",
-                    height=100
-                )
-
-                st.markdown("---")
-                st.markdown("**✅ Checklist de Alta**")
-
-                col_check1, col_check2 = st.columns(2)
-
-                with col_check1:
-                    check1 = st.checkbox("Sumário de alta preenchido")
-                    check2 = st.checkbox("Declaração de nascido vivo entregue")
-                    check3 = st.checkbox("Cartão de vacinas do RN preenchido")
-
-                with col_check2:
-                    check4 = st.checkbox("Orientações de amamentação realizadas")
-                    check5 = st.checkbox("Teste do pezinho agendado/realizado")
-                    check6 = st.checkbox("Retorno agendado")
+                        height=150
+                    )
 
-                submitted = st.form_submit_button("📤 Confirmar Alta", type="primary")
+                    receitas = st.text_area(
+                        "Prescrições de Alta",
+                        placeholder="Medicamentos prescritos para uso domiciliar...",
+                        height=100
+                    )
 
-                if submitted:
-                    if all([check1, check2, check3, check4, check5, check6]):
-                        st.success(f"✅ Alta hospitalar registrada com sucesso!")
-                        st.balloons()
-                    else:
-                        st.warning("⚠️ Complete todos os itens do checklist antes de confirmar a alta.")
+                    st.markdown("---")
+                    st.markdown("**✅ Checklist de Alta**")
+
+                    col_check1, col_check2 = st.columns(2)
+
+                    with col_check1:
+                        check1 = st.checkbox("Sumário de alta preenchido")
+                        check2 = st.checkbox("Declaração de nascido vivo entregue")
+                        check3 = st.checkbox("Cartão de vacinas do RN preenchido")
+
+                    with col_check2:
+                        check4 = st.checkbox("Orientações de amamentação realizadas")
+                        check5 = st.checkbox("Teste do pezinho agendado/realizado")
+                        check6 = st.checkbox("Retorno agendado")
+
+                    submitted = st.form_submit_button("📤 Confirmar Alta", type="primary")
+
+                    if submitted:
+                        if all([check1, check2, check3, check4, check5, check6]):
+                            atualizar_paciente(paciente_alta_id, {
+                                'status': 'Alta',
+                                'data_alta': data_alta,
+                                'leito': None,
+                            })
+                            st.success(
+                                "✅ Alta hospitalar registrada com sucesso! O prontuário entra na "
+                                "impressão das altas do dia (Relatórios > Exportar)."
+                            )
+                            st.balloons()
+                        else:
+                            st.warning("⚠️ Complete todos os itens do checklist antes de confirmar a alta.")
+
+
+# ============================================================================
+# GRÁFICOS
+# ============================================================================
+
+def _figura_ocupacao(pacientes, leitos):
+    ocupacao_data = []
+    for setor in ['Pré-parto', 'Centro Obstétrico', 'Alojamento Conjunto', 'UTI Neonatal', 'UTI Materna']:
+        leitos_setor = leitos[leitos['setor'] == setor]['id'].tolist()
+        ocupados = len(pacientes[pacientes['leito'].isin(leitos_setor)])
+        total = len(leitos_setor)
+        ocupacao_data.append({
+            'Setor': setor,
+            'Ocupados': ocupados,
+            'Livres': total - ocupados
+        })
+
+    df_ocup = pd.DataFrame(ocupacao_data)
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Ocupados', x=df_ocup['Setor'], y=df_ocup['Ocupados'], marker_color='#E91E63'))
+    fig.add_trace(go.Bar(name='Livres', x=df_ocup['Setor'], y=df_ocup['Livres'], marker_color='#4CAF50'))
+    fig.update_layout(barmode='stack', xaxis_tickangle=-45)
+    return fig
@@ -0,0 +1,158 @@
+"""
+Página do Laboratório - Fila de exames pendentes e resultados alterados
+
+A fila é um heap por prioridade mantido pela camada de dados: cada página
+lê só o topo do heap, então o tempo de resposta não depende de quantos
+pedidos estão em aberto.
+"""
+
+import streamlit as st
+
+from paginas.utils import (
+    get_dados, fila_exames_pendentes, contar_exames_pendentes, concluir_exame,
+    resultados_alterados
+)
+
+
+# Pedidos exibidos por página da fila
+EXAMES_POR_PAGINA = 25
+
+
+def render():
+    st.markdown('<h1 class="main-header">🧪 Laboratório</h1>', unsafe_allow_html=True)
+
+    tab_fila, tab_alterados = st.tabs([
+        "⏳ Fila de Exames",
+        "⚠️ Resultados Alterados"
+    ])
+
+    # ========================================================================
+    # TAB: FILA DE EXAMES
+    # ========================================================================
+
+    with tab_fila:
+        st.fragment(_fila_exames)()
+
+    # ========================================================================
+    # TAB: RESULTADOS ALTERADOS
+    # ========================================================================
+
+    with tab_alterados:
+        st.subheader("⚠️ Resultados Fora da Referência")
+        st.caption("Pacientes ainda sem alta, do resultado mais recente para o mais antigo.")
+
+        pacientes = get_dados()['pacientes']
+        sem_alta = pacientes.loc[pacientes['status'] != 'Alta', 'id']
+
+        alterados = resultados_alterados(ids_pacientes=sem_alta)
+
+        analitos = ['Todos'] + sorted(alterados['analito'].unique())
+        filtro_analito = st.selectbox("Analito", analitos, key="laboratorio_analito")
+        if filtro_analito != 'Todos':
+            alterados = alterados[alterados['analito'] == filtro_analito]
+
+        if len(alterados) == 0:
+            st.info("Nenhum resultado alterado.")
+        else:
+            exibir = alterados.head(200)
+            nomes = pacientes.loc[pacientes['id'].isin(exibir['id_paciente']), ['id', 'nome']].set_index('id')['nome']
+            exibir = exibir.assign(paciente=nomes.reindex(exibir['id_paciente']).to_numpy())
+            st.dataframe(
+                exibir[['data_resultado', 'paciente', 'tipo', 'analito', 'valor', 'unidade']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'data_resultado': st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+                    'paciente': "Paciente",
+                    'tipo': "Exame",
+                    'analito': "Analito",
+                    'valor': st.column_config.NumberColumn("Valor", format="%g"),
+                    'unidade': "Unidade",
+                }
+            )
+            if len(alterados) > 200:
+                st.caption(f"Mostrando 200 de {len(alterados)} resultados alterados.")
+
+
+# ============================================================================
+# FILA DE EXAMES
+# ============================================================================
+
+def _fila_exames():
+    """Página atual da fila e registro de resultados (roda como fragmento)."""
+    total = contar_exames_pendentes()
+
+    col_m1, col_m2 = st.columns(2)
+    col_m1.metric("Exames pendentes", total)
+
+    if total == 0:
+        st.success("✅ Nenhum exame pendente.")
+        return
+
+    paginas = (total - 1) // EXAMES_POR_PAGINA + 1
+    pagina = min(st.session_state.get('laboratorio_pagina', 1), paginas)
+
+    fila = fila_exames_pendentes((pagina - 1) * EXAMES_POR_PAGINA, EXAMES_POR_PAGINA)
+    if pagina == 1:
+        col_m2.metric("Espera do primeiro da fila", f"{fila['espera_dias'].iloc[0]} dia(s)")
+
+    st.dataframe(
+        fila[['id', 'nome_paciente', 'tipo', 'data_solicitacao', 'espera_dias', 'fatores_risco', 'solicitante']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'id': "Exame",
+            'nome_paciente': "Paciente",
+            'tipo': "Tipo",
+            'data_solicitacao': st.column_config.DateColumn("Solicitação", format="DD/MM/YYYY"),
+            'espera_dias': "Espera (dias)",
+            'fatores_risco': "Prioridade por",
+            'solicitante': "Solicitante",
+        }
+    )
+
+    col_p1, col_p2, col_p3 = st.columns([1, 2, 1])
+    with col_p1:
+        st.button("⬅️ Anterior", key="laboratorio_anterior", disabled=pagina <= 1,
+                  on_click=lambda: st.session_state.update({'laboratorio_pagina': pagina - 1}))
+    with col_p2:
+        st.caption(f"Página {pagina} de {paginas}")
+    with col_p3:
+        st.button("Próxima ➡️", key="laboratorio_proxima", disabled=pagina >= paginas,
+                  on_click=lambda: st.session_state.update({'laboratorio_pagina': pagina + 1}))
+
+    # Registro de resultado para um exame da página
+    st.markdown("---")
+    st.markdown("### ✅ Registrar Resultado")
+
+    rotulos = {
+        ex['id']: f"#{ex['id']} - {ex['tipo']} | {ex['nome_paciente']}"
+        for ex in fila[['id', 'tipo', 'nome_paciente']].to_dict('records')
+    }
+
+    mensagem = st.session_state.pop('laboratorio_mensagem', None)
+    if mensagem:
+        tipo, texto = mensagem
+        (st.success if tipo == 'sucesso' else st.error)(texto)
+
+    with st.form("form_resultado_exame", clear_on_submit=True):
+        st.selectbox("Exame", list(rotulos), format_func=rotulos.get, key="laboratorio_exame")
+        st.text_area("Resultado", placeholder="Ex.: Hb: 11.2 | Ht: 35% | Leuc: 9000", key="laboratorio_resultado")
+
+        # Concluído no callback, antes do redesenho: a fila já volta atualizada
+        st.form_submit_button("✅ Concluir Exame", type="primary", on_click=_concluir_exame_selecionado)
+
+
+def _concluir_exame_selecionado():
+    id_exame = st.session_state['laboratorio_exame']
+    resultado = st.session_state['laboratorio_resultado'].strip()
+
+    if not resultado:
+        st.session_state['laboratorio_mensagem'] = ('erro', "❌ Informe o resultado do exame.")
+        return
+    try:
+        concluir_exame(id_exame, resultado)
+    except ValueError as erro:
+        st.session_state['laboratorio_mensagem'] = ('erro', f"❌ {erro}")
+    else:
+        st.session_state['laboratorio_mensagem'] = ('sucesso', f"✅ Exame #{id_exame} concluído.")
@@ -8,8 +8,10 @@ from datetime import datetime
 
 from paginas.utils import (
     get_dados, get_medicos, adicionar_medico,
-    atualizar_medico, remover_medico, reativar_medico, get_medico_por_id
+    atualizar_medico, remover_medico, reativar_medico, get_medico_por_id,
+    normalizar_texto
 )
+from paginas.componentes import seletor_registro
 
 ESPECIALIDADES = ['Obstetrícia', 'Neonatologia', 'Anestesiologia', 'Pediatria', 'Ginecologia']
 
@@ -72,7 +74,10 @@ def render():
             df_medicos = df_medicos[df_medicos['ativo'] == False]
 
         if busca_nome:
-            df_medicos = df_medicos[df_medicos['nome'].str.contains(busca_nome, case=False, na=False)]
+            # Comparação sem acentos e sem diferenciar maiúsculas
+            df_medicos = df_medicos[
+                df_medicos['nome_normalizado'].str.contains(normalizar_texto(busca_nome), regex=False, na=False)
+            ]
 
         # Estatísticas
         col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
@@ -114,10 +119,12 @@ def render():
             st.markdown("---")
             st.subheader("📄 Detalhes do Médico")
 
-            medico_id = st.selectbox(
+            medico_id = seletor_registro(
                 "Selecione o médico:",
-                options=df_medicos['id'].tolist(),
-                format_func=lambda x: f"{x} - {df_medicos[df_medicos['id'] == x]['nome'].values[0]}"
+                key="medicos_detalhe",
+                tabela='medicos',
+                formato="{id} - {nome}",
+                ids=df_medicos['id'].to_numpy()
             )
 
             if medico_id:
@@ -212,11 +219,11 @@ def render():
             st.warning("Nenhum médico cadastrado.")
         else:
             # Selecionar médico
-            medico_edit_id = st.selectbox(
+            medico_edit_id = seletor_registro(
                 "Selecione o médico para editar:",
-                options=medicos['id'].tolist(),
-                format_func=lambda x: f"{x} - {medicos[medicos['id'] == x]['nome'].values[0]}",
-                key="select_edit_medico"
+                key="select_edit_medico",
+                tabela='medicos',
+                formato="{id} - {nome}"
             )
 
             if medico_edit_id:
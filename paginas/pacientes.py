@@ -6,7 +6,11 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 
-from paginas.utils import get_dados, atualizar_paciente
+from paginas.utils import (
+    get_dados, adicionar_paciente, atualizar_paciente, listar_pacientes,
+    consultar_pacientes, sugerir_duplicatas, STATUS_INTERNADAS
+)
+from paginas.componentes import seletor_paciente, pagina_consulta
 
 
 def render():
@@ -19,10 +23,11 @@ def render():
     # TABS DE NAVEGAÇÃO
     # ========================================================================
 
-    tab_lista, tab_cadastro, tab_busca = st.tabs([
+    tab_lista, tab_cadastro, tab_busca, tab_duplicatas = st.tabs([
         "📋 Lista de Pacientes",
         "➕ Novo Cadastro",
-        "🔍 Busca Avançada"
+        "🔍 Busca Avançada",
+        "👯 Duplicatas"
     ])
 
     # ========================================================================
@@ -55,22 +60,49 @@ def render():
                 options=['Todos', 'Pré-parto', 'Centro Obstétrico', 'Alojamento Conjunto', 'UTI Neonatal', 'UTI Materna']
             )
 
-        # Aplicar filtros
-        df_filtrado = pacientes.copy()
+        # Ordenação e paginação
+        colunas_exibir = ['id', 'nome', 'idade', 'semanas_gestacao', 'convenio', 'status', 'leito', 'medico_responsavel']
+        nomes_colunas = ['ID', 'Nome', 'Idade', 'IG (sem)', 'Convênio', 'Status', 'Leito', 'Médico']
+
+        col_ord1, col_ord2, col_ord3 = st.columns(3)
 
-        if filtro_status:
-            df_filtrado = df_filtrado[df_filtrado['status'].isin(filtro_status)]
+        with col_ord1:
+            ordenar_por = st.selectbox(
+                "Ordenar por",
+                options=colunas_exibir,
+                format_func=dict(zip(colunas_exibir, nomes_colunas)).get
+            )
 
-        if filtro_convenio:
-            df_filtrado = df_filtrado[df_filtrado['convenio'].isin(filtro_convenio)]
+        with col_ord2:
+            ordem = st.radio("Ordem", ['Crescente', 'Decrescente'], horizontal=True)
+
+        with col_ord3:
+            tamanho_pagina = st.selectbox("Por página", [25, 50, 100, 200], index=1)
+
+        # Consulta só a página visível
+        col_pag1, col_pag2 = st.columns([1, 3])
+        with col_pag1:
+            df_filtrado, total, pagina_atual, total_paginas = pagina_consulta(
+                lambda offset, limite: listar_pacientes(
+                    status=filtro_status,
+                    convenios=filtro_convenio,
+                    setor=filtro_setor,
+                    ordenar_por=ordenar_por,
+                    crescente=(ordem == 'Crescente'),
+                    offset=offset,
+                    limite=limite
+                ),
+                tamanho_pagina, key="pacientes_pagina"
+            )
 
         # Exibir contagem
-        st.write(f"**{len(df_filtrado)}** pacientes encontradas")
+        with col_pag2:
+            st.write("")
+            st.write(f"**{total}** pacientes encontradas · página {pagina_atual} de {total_paginas}")
 
         # Tabela de pacientes
-        colunas_exibir = ['id', 'nome', 'idade', 'semanas_gestacao', 'convenio', 'status', 'leito', 'medico_responsavel']
         df_exibir = df_filtrado[colunas_exibir].copy()
-        df_exibir.columns = ['ID', 'Nome', 'Idade', 'IG (sem)', 'Convênio', 'Status', 'Leito', 'Médico']
+        df_exibir.columns = nomes_colunas
 
         # Configurar exibição com seleção
         st.dataframe(
@@ -92,14 +124,14 @@ def render():
         st.markdown("---")
         st.subheader("📄 Detalhes da Paciente")
 
-        paciente_id = st.selectbox(
+        paciente_id = seletor_paciente(
             "Selecione a paciente para ver detalhes:",
-            options=df_filtrado['id'].tolist(),
-            format_func=lambda x: f"{x} - {pacientes[pacientes['id'] == x]['nome'].values[0]}"
+            key="pacientes_detalhe",
+            ids=df_filtrado['id'].to_numpy()
         )
 
         if paciente_id:
-            paciente = pacientes[pacientes['id'] == paciente_id].iloc[0]
+            paciente = df_filtrado[df_filtrado['id'] == paciente_id].iloc[0]
 
             col1, col2, col3 = st.columns(3)
 
@@ -119,7 +151,7 @@ def render():
                 st.write(f"**Abortos:** {paciente['num_abortos']}")
                 st.write(f"**DUM:** {paciente['dum']}")
                 st.write(f"**DPP:** {paciente['dpp']}")
-                st.write(f"**IG:** {paciente['semanas_gestacao']} semanas")
+                st.write(f"**IG:** {paciente['semanas_gestacao']} semanas e {paciente['dias_gestacao']} dias")
 
             with col3:
                 st.markdown("**🏥 Dados de Internação**")
@@ -230,8 +262,30 @@ def render():
 
             if submitted:
                 if nome and cpf:
-                    st.success(f"✅ Paciente **{nome}** cadastrada com sucesso!")
-                    st.balloons()
+                    try:
+                        novo_id = adicionar_paciente({
+                            'nome': nome,
+                            'cpf': cpf,
+                            'data_nascimento': data_nasc,
+                            'telefone': telefone,
+                            'tipo_sanguineo': tipo_sang,
+                            'convenio': convenio,
+                            'endereco': endereco,
+                            'num_gestacoes': num_gestacoes,
+                            'num_partos': num_partos,
+                            'num_abortos': num_abortos,
+                            'dum': dum,
+                            'peso_pre_gestacional': peso,
+                            'altura': altura,
+                            'comorbidades': ', '.join(c for c in comorbidades if c != 'Nenhuma') or 'Nenhuma',
+                            'alergias': alergias.strip() or 'Nenhuma',
+                            'medico_responsavel': medico,
+                        })
+                    except ValueError as erro:
+                        st.error(f"❌ {erro}")
+                    else:
+                        st.success(f"✅ Paciente **{nome}** cadastrada com sucesso! (ID {novo_id})")
+                        st.balloons()
                 else:
                     st.error("❌ Preencha os campos obrigatórios (Nome e CPF)")
 
@@ -246,7 +300,7 @@ def render():
 
         with col_busca1:
             busca_nome = st.text_input("Buscar por Nome")
-            busca_cpf = st.text_input("Buscar por CPF")
+            busca_cpf = st.text_input("Buscar por CPF", help="Trecho do CPF, com ou sem pontuação")
 
         with col_busca2:
             busca_leito = st.text_input("Buscar por Leito")
@@ -272,43 +326,64 @@ def render():
             filtro_internadas = st.checkbox("Apenas Internadas", value=True)
 
         if st.button("🔍 Buscar", type="primary"):
-            df_resultado = pacientes.copy()
-
-            if busca_nome:
-                df_resultado = df_resultado[df_resultado['nome'].str.contains(busca_nome, case=False, na=False)]
+            # Filtros combinados pelo planejador de consultas da camada de dados
+            df_resultado = consultar_pacientes(
+                nome=busca_nome,
+                cpf=busca_cpf,
+                leito=busca_leito,
+                medico=busca_medico,
+                ig=(filtro_ig_min, filtro_ig_max),
+                idade=(filtro_idade_min, filtro_idade_max),
+                alto_risco=filtro_alto_risco,
+                status=STATUS_INTERNADAS if filtro_internadas else None
+            )
 
-            if busca_cpf:
-                df_resultado = df_resultado[df_resultado['cpf'].str.contains(busca_cpf, na=False)]
+            st.write(f"**{len(df_resultado)}** resultado(s) encontrado(s)")
 
-            if busca_leito:
-                df_resultado = df_resultado[df_resultado['leito'].str.contains(busca_leito, case=False, na=False)]
+            if len(df_resultado) > 0:
+                st.dataframe(
+                    df_resultado[['id', 'nome', 'idade', 'semanas_gestacao', 'status', 'leito', 'medico_responsavel']],
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info("Nenhuma paciente encontrada com os filtros aplicados.")
 
-            if busca_medico != 'Todos':
-                df_resultado = df_resultado[df_resultado['medico_responsavel'] == busca_medico]
+    # ========================================================================
+    # TAB: DUPLICATAS
+    # ========================================================================
 
-            df_resultado = df_resultado[
-                (df_resultado['semanas_gestacao'] >= filtro_ig_min) &
-                (df_resultado['semanas_gestacao'] <= filtro_ig_max)
-            ]
+    with tab_duplicatas:
+        st.subheader("👯 Possíveis Cadastros Duplicados")
+        st.caption(
+            "Compara pacientes com a mesma data de nascimento e primeiro nome de "
+            "som parecido, pontuando a semelhança do nome completo e do CPF."
+        )
 
-            df_resultado = df_resultado[
-                (df_resultado['idade'] >= filtro_idade_min) &
-                (df_resultado['idade'] <= filtro_idade_max)
-            ]
+        if st.button("🔎 Procurar duplicatas", type="primary"):
+            with st.spinner("Comparando cadastros..."):
+                st.session_state['sugestoes_duplicatas'] = sugerir_duplicatas()
 
-            if filtro_alto_risco:
-                df_resultado = df_resultado[~df_resultado['comorbidades'].isin(['Nenhuma'])]
+        sugestoes = st.session_state.get('sugestoes_duplicatas')
 
-            if filtro_internadas:
-                df_resultado = df_resultado[df_resultado['status'].isin(['Internada', 'Em trabalho de parto', 'Pós-parto'])]
+        if sugestoes is not None:
+            if len(sugestoes) == 0:
+                st.success("✅ Nenhum cadastro duplicado encontrado.")
+            else:
+                st.warning(f"⚠️ **{len(sugestoes)}** par(es) de cadastros possivelmente duplicados")
 
-            st.write(f"**{len(df_resultado)}** resultado(s) encontrado(s)")
+                df_sugestoes = sugestoes.rename(columns={
+                    'id_a': 'Manter (ID)', 'nome_a': 'Nome', 'cpf_a': 'CPF',
+                    'id_b': 'Fundir (ID)', 'nome_b': 'Nome (duplicata)', 'cpf_b': 'CPF (duplicata)',
+                    'data_nascimento': 'Data Nasc.', 'similaridade_nome': 'Sim. Nome',
+                    'similaridade_cpf': 'Sim. CPF', 'pontuacao': 'Pontuação',
+                })
 
-            if len(df_resultado) > 0:
                 st.dataframe(
-                    df_resultado[['id', 'nome', 'idade', 'semanas_gestacao', 'status', 'leito', 'medico_responsavel']],
+                    df_sugestoes,
                     use_container_width=True,
-                    hide_index=True
+                    hide_index=True,
+                    column_config={
+                        "Pontuação": st.column_config.ProgressColumn(min_value=0, max_value=1, format="%.2f"),
+                    }
                 )
-            else:
-                st.info("Nenhuma paciente encontrada com os filtros aplicados.")
@@ -7,7 +7,16 @@ import pandas as pd
 import plotly.express as px
 from datetime import datetime, timedelta
 
-from paginas.utils import get_dados
+from paginas.utils import (
+    get_dados, get_parto, recem_nascidos_do_parto, partos_no_periodo, listar_recem_nascidos,
+    resumo_robson, crescimento_rns
+)
+from paginas.graficos import plotly_chart_cache, histograma, figura_histograma
+from paginas.componentes import seletor_paciente, seletor_registro, pagina_consulta
+
+
+# Peso para a idade gestacional: pequeno, adequado ou grande
+CLASSIFICACAO_PESO_EMOJI = {'PIG': '🔻', 'AIG': '🟢', 'GIG': '🔺'}
 
 
 def render():
@@ -60,13 +69,10 @@ def render():
             )
 
         # Aplicar filtros
-        df_partos = partos.copy()
-
-        if len(periodo) == 2:
-            df_partos = df_partos[
-                (df_partos['data_parto'] >= periodo[0]) &
-                (df_partos['data_parto'] <= periodo[1])
-            ]
+        # Período pelo índice ordenado de datas (sem período, todos os partos
+        # na mesma ordem por data); os demais filtros só na fatia
+        inicio, fim = periodo if len(periodo) == 2 else (None, None)
+        df_partos = partos_no_periodo(inicio, fim)
 
         if tipo_filtro:
             df_partos = df_partos[df_partos['tipo_parto'].isin(tipo_filtro)]
@@ -91,14 +97,16 @@ def render():
             st.markdown("---")
             st.subheader("📄 Detalhes do Parto")
 
-            parto_id = st.selectbox(
+            parto_id = seletor_registro(
                 "Selecione o parto:",
-                options=df_partos['id'].tolist(),
-                format_func=lambda x: f"{x} - {partos[partos['id'] == x]['nome_paciente'].values[0]} ({partos[partos['id'] == x]['data_parto'].values[0]})"
+                key="partos_detalhe",
+                tabela='partos',
+                formato="{id} - {nome_paciente} ({data_parto})",
+                ids=df_partos['id'].to_numpy()
             )
 
             if parto_id:
-                parto = partos[partos['id'] == parto_id].iloc[0]
+                parto = get_parto(parto_id)
 
                 col1, col2, col3 = st.columns(3)
 
@@ -106,6 +114,8 @@ def render():
                     st.markdown("**👩 Dados da Mãe**")
                     st.write(f"**Paciente:** {parto['nome_paciente']}")
                     st.write(f"**Data/Hora:** {parto['data_parto']} às {parto['hora_parto']}")
+                    st.write(f"**IG no parto:** {parto['ig_semanas']}s {parto['ig_dias']}d")
+                    st.write(f"**Partos anteriores:** {parto['partos_anteriores']}")
 
                 with col2:
                     st.markdown("**🏥 Dados do Parto**")
@@ -128,28 +138,34 @@ def render():
 
                 st.write(f"**Perda Sanguínea Estimada:** {parto['perda_sanguinea_estimada']}")
 
-                # RN associado
-                rn = recem_nascidos[recem_nascidos['id_mae'] == parto['id_paciente']]
-                if len(rn) > 0:
-                    rn = rn.iloc[0]
+                # RN(s) do parto (mais de um em gestação múltipla)
+                rns = recem_nascidos_do_parto(parto_id)
+                rns = rns.join(crescimento_rns(rns))
+                if len(rns) > 0:
                     st.markdown("---")
-                    st.markdown("### 👶 Recém-Nascido")
+                    st.markdown("### 👶 Recém-Nascido" if len(rns) == 1 else f"### 👶 Recém-Nascidos ({len(rns)})")
 
-                    col_rn1, col_rn2, col_rn3 = st.columns(3)
+                    for rn in rns.to_dict('records'):
+                        if len(rns) > 1:
+                            st.markdown(f"**{rn['nome']}**")
 
-                    with col_rn1:
-                        st.write(f"**Sexo:** {rn['sexo']}")
-                        st.write(f"**Peso:** {rn['peso']}g")
-                        st.write(f"**Comprimento:** {rn['comprimento']}cm")
+                        col_rn1, col_rn2, col_rn3 = st.columns(3)
 
-                    with col_rn2:
-                        st.write(f"**PC:** {rn['perimetro_cefalico']}cm")
-                        st.write(f"**Apgar:** {rn['apgar_1min']}/{rn['apgar_5min']}/{rn['apgar_10min']}")
+                        with col_rn1:
+                            st.write(f"**Sexo:** {rn['sexo']}")
+                            st.write(f"**Peso:** {rn['peso']}g{_percentil(rn, 'peso')}")
+                            st.write(f"**Comprimento:** {rn['comprimento']}cm{_percentil(rn, 'comprimento')}")
 
-                    with col_rn3:
-                        st.write(f"**Reanimação:** {rn['reanimacao']}")
-                        ac = "✅ Sim" if rn['alojamento_conjunto'] else "❌ Não"
-                        st.write(f"**Aloj. Conjunto:** {ac}")
+                        with col_rn2:
+                            st.write(f"**PC:** {rn['perimetro_cefalico']}cm{_percentil(rn, 'perimetro_cefalico')}")
+                            if pd.notna(rn['classificacao_peso']):
+                                st.write(f"**Peso/IG:** {CLASSIFICACAO_PESO_EMOJI[rn['classificacao_peso']]} {rn['classificacao_peso']}")
+                            st.write(f"**Apgar:** {rn['apgar_1min']}/{rn['apgar_5min']}/{rn['apgar_10min']}")
+
+                        with col_rn3:
+                            st.write(f"**Reanimação:** {rn['reanimacao']}")
+                            ac = "✅ Sim" if rn['alojamento_conjunto'] else "❌ Não"
+                            st.write(f"**Aloj. Conjunto:** {ac}")
         else:
             st.info("Nenhum parto encontrado no período selecionado.")
 
@@ -168,15 +184,17 @@ def render():
         if len(pacientes_elegiveis) == 0:
             st.warning("Não há pacientes internadas para registro de parto.")
         else:
-            with st.form("form_parto"):
-                st.markdown("**👩 Identificação**")
-
-                paciente_id = st.selectbox(
-                    "Paciente",
-                    options=pacientes_elegiveis['id'].tolist(),
-                    format_func=lambda x: f"{x} - {pacientes_elegiveis[pacientes_elegiveis['id'] == x]['nome'].values[0]} (IG: {pacientes_elegiveis[pacientes_elegiveis['id'] == x]['semanas_gestacao'].values[0]} sem)"
-                )
+            st.markdown("**👩 Identificação**")
+
+            # Fora do formulário para que a busca filtre enquanto se digita
+            paciente_id = seletor_paciente(
+                "Paciente",
+                key="parto_paciente",
+                ids=pacientes_elegiveis['id'].to_numpy(),
+                formato="{id} - {nome} (IG: {semanas_gestacao} sem)"
+            )
 
+            with st.form("form_parto"):
                 col1, col2 = st.columns(2)
 
                 with col1:
@@ -253,7 +271,7 @@ def render():
 
                 submitted = st.form_submit_button("💾 Registrar Parto", type="primary")
 
-                if submitted:
+                if submitted and paciente_id is not None:
                     st.success("✅ Parto registrado com sucesso!")
                     st.balloons()
 
@@ -288,45 +306,77 @@ def render():
                 horizontal=True
             )
 
-        # Aplicar filtros
-        df_rn = recem_nascidos.copy()
-
-        if sexo_filtro:
-            df_rn = df_rn[df_rn['sexo'].isin(sexo_filtro)]
-
-        if ac_filtro == 'Sim':
-            df_rn = df_rn[df_rn['alojamento_conjunto'] == True]
-        elif ac_filtro == 'Não':
-            df_rn = df_rn[df_rn['alojamento_conjunto'] == False]
+        col_rn_p1, col_rn_p2, col_rn_p3 = st.columns(3)
 
-        st.write(f"**{len(df_rn)}** recém-nascido(s)")
+        with col_rn_p1:
+            compacto = st.toggle("Modo compacto (tabela)", key="rn_compacto")
 
-        # Cards de RNs
-        for _, rn in df_rn.iterrows():
-            with st.container():
-                col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+        with col_rn_p2:
+            tamanho_pagina = st.selectbox("Por página", [10, 25, 50, 100], index=1, key="rn_por_pagina")
 
-                with col1:
-                    st.markdown(f"**{rn['nome']}**")
-                    st.write(f"Mãe: {rn['nome_mae']}")
-
-                with col2:
-                    emoji_sexo = "👦" if rn['sexo'] == 'Masculino' else "👧"
-                    st.write(f"{emoji_sexo} {rn['sexo']}")
-                    st.write(f"📅 {rn['data_nascimento'].strftime('%d/%m/%Y') if hasattr(rn['data_nascimento'], 'strftime') else rn['data_nascimento']}")
+        # Filtros aplicados na camada de dados: só a página visível é montada
+        alojamento = {'Todos': None, 'Sim': True, 'Não': False}[ac_filtro]
 
-                with col3:
-                    st.write(f"⚖️ {rn['peso']}g")
-                    st.write(f"📏 {rn['comprimento']}cm")
-
-                with col4:
-                    st.write(f"Apgar: {rn['apgar_1min']}/{rn['apgar_5min']}")
-                    if rn['alojamento_conjunto']:
-                        st.success("AC")
-                    else:
-                        st.warning("UTI")
+        with col_rn_p3:
+            df_rn, total, pagina_atual, total_paginas = pagina_consulta(
+                lambda offset, limite: listar_recem_nascidos(
+                    sexos=sexo_filtro, alojamento_conjunto=alojamento, offset=offset, limite=limite
+                ),
+                tamanho_pagina, key="rn_pagina"
+            )
+        df_rn = df_rn.join(crescimento_rns(df_rn))
+
+        st.write(f"**{total}** recém-nascido(s) · página {pagina_atual} de {total_paginas}")
+
+        if compacto:
+            st.dataframe(
+                df_rn[['nome', 'nome_mae', 'sexo', 'data_nascimento', 'peso', 'percentil_peso',
+                       'classificacao_peso', 'comprimento', 'apgar_1min', 'apgar_5min', 'alojamento_conjunto']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'nome': "Nome",
+                    'nome_mae': "Mãe",
+                    'sexo': "Sexo",
+                    'data_nascimento': st.column_config.DateColumn("Nascimento", format="DD/MM/YYYY"),
+                    'peso': st.column_config.NumberColumn("Peso (g)"),
+                    'percentil_peso': st.column_config.NumberColumn("Percentil", format="P%.0f"),
+                    'classificacao_peso': "Peso/IG",
+                    'comprimento': st.column_config.NumberColumn("Comprimento (cm)"),
+                    'apgar_1min': "Apgar 1'",
+                    'apgar_5min': "Apgar 5'",
+                    'alojamento_conjunto': st.column_config.CheckboxColumn("AC"),
+                }
+            )
+        else:
+            # Cards só da página atual
+            for rn in df_rn.to_dict('records'):
+                with st.container():
+                    col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+
+                    with col1:
+                        st.markdown(f"**{rn['nome']}**")
+                        st.write(f"Mãe: {rn['nome_mae']}")
+
+                    with col2:
+                        emoji_sexo = "👦" if rn['sexo'] == 'Masculino' else "👧"
+                        st.write(f"{emoji_sexo} {rn['sexo']}")
+                        st.write(f"📅 {rn['data_nascimento'].strftime('%d/%m/%Y') if hasattr(rn['data_nascimento'], 'strftime') else rn['data_nascimento']}")
+
+                    with col3:
+                        st.write(f"⚖️ {rn['peso']}g{_percentil(rn, 'peso')}")
+                        st.write(f"📏 {rn['comprimento']}cm")
+                        if rn['classificacao_peso'] in ('PIG', 'GIG'):
+                            st.write(f"{CLASSIFICACAO_PESO_EMOJI[rn['classificacao_peso']]} {rn['classificacao_peso']}")
+
+                    with col4:
+                        st.write(f"Apgar: {rn['apgar_1min']}/{rn['apgar_5min']}")
+                        if rn['alojamento_conjunto']:
+                            st.success("AC")
+                        else:
+                            st.warning("UTI")
 
-                st.markdown("---")
+                    st.markdown("---")
 
     # ========================================================================
     # TAB: ESTATÍSTICAS
@@ -340,16 +390,7 @@ def render():
         with col_stat1:
             # Tipos de parto
             st.markdown("### 🏥 Tipos de Parto")
-            tipos = partos['tipo_parto'].value_counts()
-
-            fig_tipos = px.pie(
-                values=tipos.values,
-                names=tipos.index,
-                color_discrete_sequence=px.colors.qualitative.Pastel,
-                hole=0.4
-            )
-            fig_tipos.update_layout(margin=dict(t=0, b=0, l=0, r=0))
-            st.plotly_chart(fig_tipos, use_container_width=True)
+            plotly_chart_cache('partos_tipos', ('partos',), lambda: _figura_tipos(partos), use_container_width=True)
 
             # Taxa de cesárea
             taxa_ces = (len(partos[partos['tipo_parto'] == 'Cesárea']) / len(partos) * 100) if len(partos) > 0 else 0
@@ -361,52 +402,49 @@ def render():
         with col_stat2:
             # Distribuição por sexo
             st.markdown("### 👶 Sexo dos RNs")
-            sexos = recem_nascidos['sexo'].value_counts()
-
-            fig_sexo = px.pie(
-                values=sexos.values,
-                names=sexos.index,
-                color_discrete_map={'Masculino': '#2196F3', 'Feminino': '#E91E63'},
-                hole=0.4
-            )
-            fig_sexo.update_layout(margin=dict(t=0, b=0, l=0, r=0))
-            st.plotly_chart(fig_sexo, use_container_width=True)
+            plotly_chart_cache('partos_sexo', ('recem_nascidos',), lambda: _figura_sexo(recem_nascidos), use_container_width=True)
 
         # Indicações de cesárea
         st.markdown("### 📋 Indicações de Cesárea")
         cesareas = partos[partos['tipo_parto'] == 'Cesárea']
 
         if len(cesareas) > 0:
-            indicacoes = cesareas['indicacao_cesarea'].value_counts()
+            plotly_chart_cache('partos_indicacoes', ('partos',), lambda: _figura_indicacoes(cesareas), use_container_width=True)
+
+        # Classificação de Robson
+        st.markdown("### 🩺 Classificação de Robson")
+        st.caption("Tamanho de cada grupo e quanto ele contribui para as cesáreas do serviço.")
+
+        robson = resumo_robson()
+        st.dataframe(
+            robson,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'grupo': st.column_config.NumberColumn("Grupo", width="small"),
+                'descricao': st.column_config.TextColumn("Descrição", width="large"),
+                'partos': "Partos",
+                'cesareas': "Cesáreas",
+                'tamanho_grupo': st.column_config.NumberColumn("Tamanho (%)", format="%.1f"),
+                'taxa_cesarea': st.column_config.NumberColumn("Taxa de cesárea (%)", format="%.1f"),
+                'contribuicao_absoluta': st.column_config.NumberColumn("Contrib. absoluta (%)", format="%.1f"),
+                'contribuicao_relativa': st.column_config.ProgressColumn(
+                    "Contrib. relativa (%)", format="%.1f", min_value=0, max_value=100
+                ),
+            }
+        )
 
-            fig_ind = px.bar(
-                x=indicacoes.index,
-                y=indicacoes.values,
-                color=indicacoes.index,
-                color_discrete_sequence=px.colors.qualitative.Set2
-            )
-            fig_ind.update_layout(
-                showlegend=False,
-                xaxis_tickangle=-45,
-                margin=dict(t=0, b=100)
+        if robson['cesareas'].sum() > 0:
+            maior = robson.loc[robson['contribuicao_relativa'].idxmax()]
+            st.info(
+                f"O grupo {maior['grupo']} responde por {maior['contribuicao_relativa']:.1f}% das cesáreas "
+                f"({maior['cesareas']} de {robson['cesareas'].sum()})."
             )
-            st.plotly_chart(fig_ind, use_container_width=True)
 
         # Peso dos RNs
         st.markdown("### ⚖️ Distribuição de Peso ao Nascer")
 
-        fig_peso = px.histogram(
-            recem_nascidos,
-            x='peso',
-            nbins=20,
-            color_discrete_sequence=['#E91E63']
-        )
-        fig_peso.update_layout(
-            xaxis_title="Peso (g)",
-            yaxis_title="Frequência",
-            margin=dict(t=0, b=0)
-        )
-        st.plotly_chart(fig_peso, use_container_width=True)
+        plotly_chart_cache('partos_peso', ('recem_nascidos',), lambda: _figura_peso(recem_nascidos), use_container_width=True)
 
         # Estatísticas descritivas
         col_desc1, col_desc2, col_desc3 = st.columns(3)
@@ -419,3 +457,65 @@ def render():
 
         with col_desc3:
             st.metric("Peso Máximo", f"{recem_nascidos['peso'].max()}g")
+
+
+# ============================================================================
+# CRESCIMENTO NEONATAL
+# ============================================================================
+
+def _percentil(rn: dict, medida: str) -> str:
+    """Sufixo ' (P45)' com o percentil da medida para sexo e IG (vazio sem avaliação)."""
+    percentil = rn.get(f'percentil_{medida}')
+    return '' if percentil is None or pd.isna(percentil) else f" (P{percentil:.0f})"
+
+
+# ============================================================================
+# GRÁFICOS
+# ============================================================================
+
+def _figura_tipos(partos):
+    tipos = partos['tipo_parto'].value_counts()
+
+    fig_tipos = px.pie(
+        values=tipos.values,
+        names=tipos.index,
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        hole=0.4
+    )
+    fig_tipos.update_layout(margin=dict(t=0, b=0, l=0, r=0))
+    return fig_tipos
+
+
+def _figura_sexo(recem_nascidos):
+    sexos = recem_nascidos['sexo'].value_counts()
+
+    fig_sexo = px.pie(
+        values=sexos.values,
+        names=sexos.index,
+        color_discrete_map={'Masculino': '#2196F3', 'Feminino': '#E91E63'},
+        hole=0.4
+    )
+    fig_sexo.update_layout(margin=dict(t=0, b=0, l=0, r=0))
+    return fig_sexo
+
+
+def _figura_indicacoes(cesareas):
+    indicacoes = cesareas['indicacao_cesarea'].value_counts()
+
+    fig_ind = px.bar(
+        x=indicacoes.index,
+        y=indicacoes.values,
+        color=indicacoes.index,
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    fig_ind.update_layout(
+        showlegend=False,
+        xaxis_tickangle=-45,
+        margin=dict(t=0, b=100)
+    )
+    return fig_ind
+
+
+def _figura_peso(recem_nascidos):
+    faixas = histograma(recem_nascidos['peso'], nbins=20)
+    return figura_histograma(faixas, cor='#E91E63', titulo_x="Peso (g)")
@@ -6,7 +6,25 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 
-from paginas.utils import get_dados, adicionar_evolucao
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from paginas.utils import (
+    get_dados, adicionar_evolucao, get_evolucoes_paciente, contar_evolucoes_paciente, buscar_evolucoes,
+    exames_paciente_por_tipo, sinais_vitais_paciente, meows_paciente, resultados_exames_paciente,
+    referencia_analito, solicitar_exame, URGENCIAS_EXAME, imprimir_prontuarios, status_trabalho
+)
+from paginas.componentes import seletor_paciente, andamento_impressao
+from paginas.graficos import plotly_chart_cache, reduzir_serie, PONTOS_MAXIMOS
+
+
+# Evoluções carregadas por vez na linha do tempo
+EVOLUCOES_POR_PAGINA = 10
+
+# Evoluções exibidas no resultado da busca por texto
+RESULTADOS_BUSCA_EVOLUCOES = 100
+
+NIVEL_MEOWS_EMOJI = {'Normal': '🟢', 'Atenção': '🟡', 'Alerta': '🔴'}
 
 
 def render():
@@ -14,8 +32,6 @@ def render():
 
     dados = get_dados()
     pacientes = dados['pacientes']
-    evolucoes = dados['evolucoes']
-    exames = dados['exames']
 
     # ========================================================================
     # SELEÇÃO DE PACIENTE
@@ -29,11 +45,11 @@ def render():
     col_sel1, col_sel2 = st.columns([3, 1])
 
     with col_sel1:
-        paciente_id = st.selectbox(
+        paciente_id = seletor_paciente(
             "Paciente",
-            options=pacientes['id'].tolist(),
-            index=pacientes['id'].tolist().index(paciente_pre) if paciente_pre and paciente_pre in pacientes['id'].tolist() else 0,
-            format_func=lambda x: f"{x} - {pacientes[pacientes['id'] == x]['nome'].values[0]} ({pacientes[pacientes['id'] == x]['status'].values[0]})"
+            key="prontuario_paciente",
+            formato="{id} - {nome} ({status})",
+            padrao=paciente_pre
         )
 
     with col_sel2:
@@ -55,14 +71,14 @@ def render():
     st.markdown("---")
 
     # Informações resumidas
-    col_h1, col_h2, col_h3, col_h4 = st.columns(4)
+    col_h1, col_h2, col_h3, col_h4, col_h5 = st.columns(5)
 
     with col_h1:
         st.markdown(f"### {paciente['nome']}")
         st.write(f"📅 {paciente['idade']} anos | 🩸 {paciente['tipo_sanguineo']}")
 
     with col_h2:
-        st.metric("IG", f"{paciente['semanas_gestacao']} sem")
+        st.metric("IG", f"{paciente['semanas_gestacao']}s {paciente['dias_gestacao']}d")
 
     with col_h3:
         st.metric("DPP", str(paciente['dpp']))
@@ -77,6 +93,34 @@ def render():
         }
         st.metric("Status", f"{status_emoji.get(paciente['status'], '')} {paciente['status']}")
 
+    meows = meows_paciente(paciente_id)
+    with col_h5:
+        if meows is None:
+            st.metric("MEOWS", "-")
+        else:
+            st.metric(
+                "MEOWS",
+                f"{NIVEL_MEOWS_EMOJI[meows['nivel']]} {meows['pontuacao']}",
+                help=f"{meows['nivel']} — {meows['vermelhos']} gatilho(s) vermelho(s), "
+                     f"{meows['amarelos']} amarelo(s) na última evolução"
+            )
+
+    if meows is not None and meows['nivel'] == 'Alerta':
+        st.error(
+            f"🩺 **MEOWS em alerta** (pontuação {meows['pontuacao']}): "
+            f"PA {meows['pa_sistolica']}/{meows['pa_diastolica']} mmHg, FC {meows['fc']} bpm, "
+            f"Temp {meows['temp']} °C, FR {meows['fr']} irpm — avaliar a paciente."
+        )
+
+    # Impressão do prontuário completo (gerado em segundo plano)
+    chave_impressao = f"impressao_prontuario_{paciente_id}"
+    if st.button("🖨️ Imprimir prontuário (PDF)", key=f"botao_{chave_impressao}"):
+        st.session_state[chave_impressao] = imprimir_prontuarios([paciente_id], f"Prontuário de {paciente['nome']}")
+    if chave_impressao in st.session_state:
+        id_trabalho = st.session_state[chave_impressao]
+        em_andamento = status_trabalho(id_trabalho)['fim'] is None
+        st.fragment(_andamento_impressao, run_every=1 if em_andamento else None)(id_trabalho, em_andamento)
+
     # Alertas importantes
     if paciente['comorbidades'] != 'Nenhuma' or paciente['alergias'] != 'Nenhuma':
         alert_col1, alert_col2 = st.columns(2)
@@ -93,8 +137,9 @@ def render():
     # TABS DO PRONTUÁRIO
     # ========================================================================
 
-    tab_evolucao, tab_exames, tab_historico, tab_nova_evolucao = st.tabs([
+    tab_evolucao, tab_sinais, tab_exames, tab_historico, tab_nova_evolucao = st.tabs([
         "📝 Evoluções",
+        "📈 Sinais Vitais",
         "🔬 Exames",
         "📚 Histórico Obstétrico",
         "➕ Nova Evolução"
@@ -107,32 +152,42 @@ def render():
     with tab_evolucao:
         st.subheader("📝 Evoluções Médicas")
 
-        # Filtrar evoluções da paciente
-        evolucoes_paciente = evolucoes[evolucoes['id_paciente'] == paciente_id].sort_values(
-            'data_hora', ascending=False
+        consulta = st.text_input(
+            "🔍 Buscar nas evoluções",
+            placeholder='Ex.: "sulfato de magnésio" OU pré-eclâmpsia -cesárea',
+            help="Busca na descrição e na conduta, sem diferenciar acentos. "
+                 "Use aspas para frases, OU para alternativas e - para excluir um termo.",
+            key="prontuario_busca_evolucoes"
         )
 
-        if len(evolucoes_paciente) == 0:
-            st.info("Nenhuma evolução registrada para esta paciente.")
+        if consulta.strip():
+            st.fragment(_busca_evolucoes)(paciente_id, consulta)
+        else:
+            st.fragment(_linha_do_tempo_evolucoes)(paciente_id)
+
+    # ========================================================================
+    # TAB: SINAIS VITAIS
+    # ========================================================================
+
+    with tab_sinais:
+        st.subheader("📈 Tendência dos Sinais Vitais")
+
+        total_registros = contar_evolucoes_paciente(paciente_id)
+
+        if total_registros == 0:
+            st.info("Nenhum sinal vital registrado para esta paciente.")
         else:
-            for _, ev in evolucoes_paciente.iterrows():
-                with st.expander(
-                    f"📅 {ev['data_hora'].strftime('%d/%m/%Y %H:%M')} - {ev['tipo']} | {ev['medico']}",
-                    expanded=True if _ == evolucoes_paciente.index[0] else False
-                ):
-                    # Sinais vitais
-                    sv = ev['sinais_vitais']
-                    col_sv1, col_sv2, col_sv3, col_sv4 = st.columns(4)
-                    col_sv1.metric("PA", sv['pa'])
-                    col_sv2.metric("FC", f"{sv['fc']} bpm")
-                    col_sv3.metric("Temp", f"{sv['temp']}°C")
-                    col_sv4.metric("FR", f"{sv['fr']} irpm")
-
-                    st.markdown("**Descrição:**")
-                    st.write(ev['descricao'])
-
-                    st.markdown("**Conduta:**")
-                    st.info(ev['conduta'])
+            plotly_chart_cache(
+                'prontuario_sinais_vitais', ('evolucoes',),
+                lambda: _figura_sinais_vitais(paciente_id),
+                parametros=(paciente_id,),
+                use_container_width=True
+            )
+            if total_registros > PONTOS_MAXIMOS:
+                st.caption(
+                    f"{total_registros} registros reduzidos a até {PONTOS_MAXIMOS} pontos por série "
+                    "(LTTB), preservando picos e vales."
+                )
 
     # ========================================================================
     # TAB: EXAMES
@@ -141,11 +196,6 @@ def render():
     with tab_exames:
         st.subheader("🔬 Exames Laboratoriais e de Imagem")
 
-        # Filtrar exames da paciente
-        exames_paciente = exames[exames['id_paciente'] == paciente_id].sort_values(
-            'data_solicitacao', ascending=False
-        )
-
         # Filtro por status
         col_ex1, col_ex2 = st.columns([1, 3])
         with col_ex1:
@@ -154,36 +204,24 @@ def render():
                 ['Todos', 'Concluído', 'Pendente']
             )
 
-        if filtro_status_exame != 'Todos':
-            exames_paciente = exames_paciente[exames_paciente['status'] == filtro_status_exame]
-
-        if len(exames_paciente) == 0:
-            st.info("Nenhum exame encontrado.")
-        else:
-            # Agrupar por tipo
-            for tipo in exames_paciente['tipo'].unique():
-                exames_tipo = exames_paciente[exames_paciente['tipo'] == tipo]
-
-                with st.expander(f"🔬 {tipo} ({len(exames_tipo)} registro(s))"):
-                    for _, ex in exames_tipo.iterrows():
-                        col_e1, col_e2, col_e3 = st.columns([2, 3, 1])
-
-                        with col_e1:
-                            st.write(f"**Solicitação:** {ex['data_solicitacao']}")
-                            st.write(f"**Resultado:** {ex['data_resultado']}")
-                            st.write(f"**Solicitante:** {ex['solicitante']}")
-
-                        with col_e2:
-                            st.markdown("**Resultado:**")
-                            st.code(ex['resultado'])
-
-                        with col_e3:
-                            if ex['status'] == 'Concluído':
-                                st.success("✅ Concluído")
-                            else:
-                                st.warning("⏳ Pendente")
+        st.fragment(_exames_por_tipo)(paciente_id, None if filtro_status_exame == 'Todos' else filtro_status_exame)
 
-                        st.markdown("---")
+        # Tendência dos resultados numéricos (Hb, glicemia...)
+        resultados_paciente = resultados_exames_paciente(paciente_id)
+        if len(resultados_paciente) > 0:
+            st.markdown("---")
+            st.markdown("### 📈 Evolução dos Resultados")
+            analito = st.selectbox(
+                "Analito",
+                sorted(resultados_paciente['analito'].unique()),
+                key="prontuario_analito"
+            )
+            plotly_chart_cache(
+                'prontuario_resultados_exames', ('exames',),
+                lambda: _figura_resultados_exame(paciente_id, analito),
+                parametros=(paciente_id, analito),
+                use_container_width=True
+            )
 
         # Botão para solicitar novo exame
         st.markdown("---")
@@ -201,12 +239,18 @@ def render():
                      'Teste de Tolerância à Glicose', 'Sorologia HIV', 'Sorologia Hepatite B']
                 )
 
-                urgencia = st.radio("Urgência", ['Rotina', 'Urgente'], horizontal=True)
+                urgencia = st.radio("Urgência", URGENCIAS_EXAME, horizontal=True)
 
                 observacoes = st.text_area("Observações/Indicação Clínica")
 
                 if st.form_submit_button("✅ Solicitar"):
-                    st.success(f"Exame **{tipo_exame}** solicitado com sucesso!")
+                    id_exame = solicitar_exame(
+                        paciente_id, tipo_exame,
+                        solicitante='Dr. Carlos Alberto Silva',  # Usuário logado
+                        urgencia=urgencia,
+                        observacoes=observacoes
+                    )
+                    st.success(f"Exame **{tipo_exame}** solicitado com sucesso (#{id_exame}) e enviado ao laboratório!")
                     st.session_state['solicitar_exame'] = False
 
     # ========================================================================
@@ -223,7 +267,7 @@ def render():
 
             st.write(f"**Data Última Menstruação (DUM):** {paciente['dum']}")
             st.write(f"**Data Provável do Parto (DPP):** {paciente['dpp']}")
-            st.write(f"**Idade Gestacional:** {paciente['semanas_gestacao']} semanas")
+            st.write(f"**Idade Gestacional:** {paciente['semanas_gestacao']} semanas e {paciente['dias_gestacao']} dias")
 
             st.markdown("---")
 
@@ -283,7 +327,6 @@ def render():
         st.markdown("---")
         st.markdown("### 📈 Curva de Crescimento Fetal (Simulado)")
 
-        import plotly.graph_objects as go
         import numpy as np
 
         semanas = list(range(20, paciente['semanas_gestacao'] + 1))
@@ -403,3 +446,223 @@ def render():
                     st.balloons()
                 else:
                     st.error("❌ Preencha a descrição da evolução.")
+
+
+# ============================================================================
+# IMPRESSÃO
+# ============================================================================
+
+def _andamento_impressao(id_trabalho: int, acompanhando: bool = False):
+    trabalho = status_trabalho(id_trabalho)
+    if trabalho is None:
+        return
+    # O intervalo do fragmento só muda numa execução completa da página
+    if acompanhando and trabalho['fim'] is not None:
+        st.rerun(scope="app")
+    andamento_impressao(trabalho, key=f"download_prontuario_{id_trabalho}")
+
+
+# ============================================================================
+# LINHA DO TEMPO DE EVOLUÇÕES
+# ============================================================================
+
+def _linha_do_tempo_evolucoes(paciente_id: int):
+    """
+    Mostra as evoluções mais recentes e carrega as anteriores sob demanda.
+
+    Roda como fragmento: abrir um registro ou carregar mais só redesenha a
+    linha do tempo. Os detalhes (sinais vitais, descrição, conduta) só são
+    montados para os registros abertos.
+    """
+    total = contar_evolucoes_paciente(paciente_id)
+
+    if total == 0:
+        st.info("Nenhuma evolução registrada para esta paciente.")
+        return
+
+    chave_exibidas = f"evolucoes_exibidas_{paciente_id}"
+    exibidas = st.session_state.get(chave_exibidas, EVOLUCOES_POR_PAGINA)
+
+    evolucoes_paciente = get_evolucoes_paciente(paciente_id, limite=exibidas)
+    st.caption(f"Exibindo {len(evolucoes_paciente)} de {total} evolução(ões), da mais recente para a mais antiga")
+
+    for i, ev in enumerate(evolucoes_paciente.to_dict('records')):
+        aberta = st.toggle(
+            f"📅 {ev['data_hora'].strftime('%d/%m/%Y %H:%M')} - {ev['tipo']} | {ev['medico']}",
+            value=(i == 0),
+            key=f"evolucao_aberta_{ev['id']}"
+        )
+        if aberta:
+            with st.container(border=True):
+                # Sinais vitais
+                sv = ev['sinais_vitais']
+                col_sv1, col_sv2, col_sv3, col_sv4 = st.columns(4)
+                col_sv1.metric("PA", sv['pa'])
+                col_sv2.metric("FC", f"{sv['fc']} bpm")
+                col_sv3.metric("Temp", f"{sv['temp']}°C")
+                col_sv4.metric("FR", f"{sv['fr']} irpm")
+
+                st.markdown("**Descrição:**")
+                st.write(ev['descricao'])
+
+                st.markdown("**Conduta:**")
+                st.info(ev['conduta'])
+
+    if exibidas < total:
+        st.button(
+            f"⬇️ Carregar evoluções anteriores ({total - exibidas} restante(s))",
+            key=f"carregar_evolucoes_{paciente_id}",
+            on_click=lambda: st.session_state.update({chave_exibidas: exibidas + EVOLUCOES_POR_PAGINA})
+        )
+
+
+def _busca_evolucoes(paciente_id: int, consulta: str):
+    """Evoluções que atendem à busca, da paciente ou de todas (roda como fragmento)."""
+    todas = st.toggle("Buscar em todas as pacientes", key="prontuario_busca_todas")
+
+    encontradas, total = buscar_evolucoes(
+        consulta, id_paciente=None if todas else paciente_id, limite=RESULTADOS_BUSCA_EVOLUCOES
+    )
+
+    if total == 0:
+        st.info("Nenhuma evolução encontrada.")
+        return
+
+    st.caption(f"{total} evolução(ões) encontrada(s), da mais recente para a mais antiga")
+
+    colunas = ['data_hora', 'nome_paciente', 'tipo', 'medico', 'descricao', 'conduta']
+    st.dataframe(
+        encontradas[colunas if todas else [c for c in colunas if c != 'nome_paciente']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'data_hora': st.column_config.DatetimeColumn("Data/Hora", format="DD/MM/YYYY HH:mm"),
+            'nome_paciente': "Paciente",
+            'tipo': "Tipo",
+            'medico': "Médico",
+            'descricao': "Descrição",
+            'conduta': "Conduta",
+        }
+    )
+    if total > len(encontradas):
+        st.caption(f"Mostrando as {len(encontradas)} mais recentes. Refine a busca para ver as demais.")
+
+
+# ============================================================================
+# SINAIS VITAIS
+# ============================================================================
+
+# (coluna, nome, unidade, cor, linha do gráfico)
+SERIES_SINAIS_VITAIS = [
+    ('pa_sistolica', 'PA sistólica', 'mmHg', '#E91E63', 1),
+    ('pa_diastolica', 'PA diastólica', 'mmHg', '#F48FB1', 1),
+    ('fc', 'FC', 'bpm', '#2196F3', 2),
+    ('temp', 'Temperatura', '°C', '#FF9800', 3),
+    ('fr', 'FR', 'irpm', '#4CAF50', 4),
+]
+
+
+def _figura_sinais_vitais(paciente_id: int):
+    sinais = sinais_vitais_paciente(paciente_id)
+
+    fig = make_subplots(
+        rows=4, cols=1, shared_xaxes=True, vertical_spacing=0.04,
+        subplot_titles=("PA (mmHg)", "FC (bpm)", "Temperatura (°C)", "FR (irpm)")
+    )
+
+    for coluna, nome, unidade, cor, linha in SERIES_SINAIS_VITAIS:
+        # Redução feita no servidor: o navegador recebe no máximo PONTOS_MAXIMOS por série
+        datas, valores = reduzir_serie(sinais['data_hora'], sinais[coluna])
+        fig.add_trace(go.Scatter(
+            x=datas, y=valores, name=nome,
+            mode='lines+markers' if len(valores) <= 50 else 'lines',
+            line=dict(color=cor),
+            hovertemplate=f"%{{x|%d/%m %H:%M}}: %{{y}} {unidade}<extra>{nome}</extra>"
+        ), row=linha, col=1)
+
+    fig.update_layout(
+        height=700,
+        margin=dict(t=30, b=0, l=0, r=0),
+        legend=dict(orientation="h", yanchor="bottom", y=1.04)
+    )
+    return fig
+
+
+# ============================================================================
+# EXAMES
+# ============================================================================
+
+def _exames_por_tipo(paciente_id: int, status: str = None):
+    """
+    Exames da paciente agrupados por tipo (agrupamento em cache na camada de
+    dados). Roda como fragmento e só monta os registros dos grupos abertos.
+    """
+    grupos = exames_paciente_por_tipo(paciente_id, status)
+
+    if not grupos:
+        st.info("Nenhum exame encontrado.")
+        return
+
+    alterados_por_exame = None
+
+    for tipo, exames_tipo in grupos.items():
+        aberto = st.toggle(f"🔬 {tipo} ({len(exames_tipo)} registro(s))", key=f"exames_abertos_{paciente_id}_{tipo}")
+        if not aberto:
+            continue
+
+        if alterados_por_exame is None:
+            # Valores numéricos fora da referência, por exame
+            resultados = resultados_exames_paciente(paciente_id)
+            alterados = resultados[resultados['alterado']]
+            alterados_por_exame = {}
+            for id_exame, analito, valor, unidade in alterados[['id_exame', 'analito', 'valor', 'unidade']].itertuples(index=False):
+                alterados_por_exame.setdefault(id_exame, []).append(f"{analito} {valor:g} {unidade}")
+
+        with st.container(border=True):
+            for ex in exames_tipo.to_dict('records'):
+                col_e1, col_e2, col_e3 = st.columns([2, 3, 1])
+
+                with col_e1:
+                    st.write(f"**Solicitação:** {ex['data_solicitacao']}")
+                    st.write(f"**Resultado:** {ex['data_resultado']}")
+                    st.write(f"**Solicitante:** {ex['solicitante']}")
+
+                with col_e2:
+                    st.markdown("**Resultado:**")
+                    st.code(ex['resultado'])
+                    if ex['id'] in alterados_por_exame:
+                        st.caption("⚠️ Fora da referência: " + ", ".join(alterados_por_exame[ex['id']]))
+
+                with col_e3:
+                    if ex['status'] == 'Concluído':
+                        st.success("✅ Concluído")
+                    else:
+                        st.warning("⏳ Pendente")
+
+                st.markdown("---")
+
+
+def _figura_resultados_exame(paciente_id: int, analito: str):
+    resultados = resultados_exames_paciente(paciente_id, analito)
+    unidade = resultados['unidade'].iloc[0] if len(resultados) > 0 else ''
+    minimo, maximo = referencia_analito(analito)
+
+    fig = go.Figure()
+    if minimo is not None and maximo is not None:
+        fig.add_hrect(y0=minimo, y1=maximo, fillcolor='#4CAF50', opacity=0.1, line_width=0)
+
+    fig.add_trace(go.Scatter(
+        x=resultados['data_resultado'], y=resultados['valor'], name=analito,
+        mode='lines+markers',
+        line=dict(color='#E91E63'),
+        marker=dict(color=['#F44336' if a else '#E91E63' for a in resultados['alterado']], size=9),
+        hovertemplate=f"%{{x|%d/%m/%Y}}: %{{y}} {unidade}<extra>{analito}</extra>"
+    ))
+
+    fig.update_layout(
+        height=300,
+        margin=dict(t=30, b=0, l=0, r=0),
+        yaxis_title=f"{analito} ({unidade})",
+        showlegend=False
+    )
+    return fig
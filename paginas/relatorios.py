@@ -9,7 +9,9 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
 
-from paginas.utils import get_dados
+from paginas.utils import get_dados, imprimir_altas_do_dia, listar_trabalhos, get_crescimento_rns
+from paginas.componentes import andamento_impressao
+from paginas.graficos import plotly_chart_cache, contagem_por_valor
 
 
 def render():
@@ -79,41 +81,18 @@ def render():
         with col_g1:
             st.markdown("**Partos por Semana**")
 
-            # Simular dados semanais
-            semanas = pd.date_range(end=datetime.now(), periods=12, freq='W')
-            partos_semana = [15 + i % 5 for i in range(12)]
-
-            fig_tendencia = px.line(
-                x=semanas,
-                y=partos_semana,
-                markers=True,
-                color_discrete_sequence=['#E91E63']
-            )
-            fig_tendencia.update_layout(
-                xaxis_title="Semana",
-                yaxis_title="Partos",
-                margin=dict(t=0, b=0)
+            plotly_chart_cache(
+                'relatorios_tendencia', (), _figura_tendencia,
+                parametros=(datetime.now().date(),), use_container_width=True
             )
-            st.plotly_chart(fig_tendencia, use_container_width=True)
 
         with col_g2:
             st.markdown("**Taxa de Cesárea Mensal**")
 
-            meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'][:datetime.now().month]
-            taxas = [55, 52, 48, 50, 47, 45, 48, 52, 50, 48, 46, 45][:datetime.now().month]
-
-            fig_taxa = px.bar(
-                x=meses,
-                y=taxas,
-                color_discrete_sequence=['#2196F3']
+            plotly_chart_cache(
+                'relatorios_taxa_cesarea', (), _figura_taxa_cesarea,
+                parametros=(datetime.now().month,), use_container_width=True
             )
-            fig_taxa.add_hline(y=55, line_dash="dash", line_color="red", annotation_text="Meta OMS: 15%")
-            fig_taxa.update_layout(
-                xaxis_title="Mês",
-                yaxis_title="Taxa (%)",
-                margin=dict(t=0, b=0)
-            )
-            st.plotly_chart(fig_taxa, use_container_width=True)
 
         # Indicadores por médico
         st.markdown("---")
@@ -182,18 +161,13 @@ def render():
 
         producao_convenio = pacientes.groupby('convenio').size().reset_index(name='Quantidade')
 
-        fig_conv = px.pie(
-            producao_convenio,
-            values='Quantidade',
-            names='convenio',
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig_conv.update_layout(margin=dict(t=0, b=0))
-
         col_conv1, col_conv2 = st.columns([2, 1])
 
         with col_conv1:
-            st.plotly_chart(fig_conv, use_container_width=True)
+            plotly_chart_cache(
+                'relatorios_convenios', ('pacientes',),
+                lambda: _figura_convenios(producao_convenio), use_container_width=True
+            )
 
         with col_conv2:
             st.dataframe(producao_convenio, use_container_width=True, hide_index=True)
@@ -202,23 +176,10 @@ def render():
         st.markdown("---")
         st.markdown("### 📅 Produção Diária")
 
-        # Simular dados diários
-        dias = pd.date_range(start=datetime.now() - timedelta(days=30), end=datetime.now(), freq='D')
-        producao_diaria = pd.DataFrame({
-            'Data': dias,
-            'Partos': [2 + i % 4 for i in range(len(dias))],
-            'Internações': [3 + i % 5 for i in range(len(dias))],
-            'Altas': [2 + i % 4 for i in range(len(dias))]
-        })
-
-        fig_diario = px.line(
-            producao_diaria,
-            x='Data',
-            y=['Partos', 'Internações', 'Altas'],
-            color_discrete_map={'Partos': '#E91E63', 'Internações': '#2196F3', 'Altas': '#4CAF50'}
+        plotly_chart_cache(
+            'relatorios_producao_diaria', (), _figura_producao_diaria,
+            parametros=(datetime.now().date(),), use_container_width=True
         )
-        fig_diario.update_layout(margin=dict(t=0, b=0))
-        st.plotly_chart(fig_diario, use_container_width=True)
 
     # ========================================================================
     # TAB: QUALIDADE
@@ -291,34 +252,7 @@ def render():
 
         with col_o2:
             # Gráfico radar de indicadores
-            categorias = ['Cesárea', 'Episiotomia', 'Indução', 'Aleitamento', 'Pele-a-pele', 'Parto Humanizado']
-            valores = [48, 15, 22, 85, 90, 75]
-            metas = [15, 10, 25, 90, 95, 80]
-
-            fig_radar = go.Figure()
-
-            fig_radar.add_trace(go.Scatterpolar(
-                r=valores,
-                theta=categorias,
-                fill='toself',
-                name='Resultado'
-            ))
-
-            fig_radar.add_trace(go.Scatterpolar(
-                r=metas,
-                theta=categorias,
-                fill='toself',
-                name='Meta',
-                opacity=0.3
-            ))
-
-            fig_radar.update_layout(
-                polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-                showlegend=True,
-                margin=dict(t=30, b=30)
-            )
-
-            st.plotly_chart(fig_radar, use_container_width=True)
+            plotly_chart_cache('relatorios_radar', (), _figura_radar, use_container_width=True)
 
         st.markdown("---")
 
@@ -332,25 +266,29 @@ def render():
         col_n3.metric("Prematuridade", "10.2%", help="< 37 semanas")
         col_n4.metric("Internação UTI Neo", "5.3%", help="Meta: < 10%")
 
+        # Peso para a idade gestacional (percentis por sexo e IG)
+        classificacao = get_crescimento_rns()['classificacao_peso']
+        avaliados = int(classificacao.notna().sum())
+
+        col_c1, col_c2, col_c3, col_c4 = st.columns(4)
+        for coluna, rotulo, ajuda in [
+            (col_c1, 'PIG', "Pequeno para a IG: peso abaixo do P10"),
+            (col_c2, 'AIG', "Adequado para a IG: peso entre P10 e P90"),
+            (col_c3, 'GIG', "Grande para a IG: peso acima do P90"),
+        ]:
+            quantidade = int((classificacao == rotulo).sum())
+            coluna.metric(rotulo, f"{100 * quantidade / avaliados:.1f}%" if avaliados else "-",
+                          help=f"{ajuda} ({quantidade} RNs)")
+        col_c4.metric("Sem avaliação", len(classificacao) - avaliados, help="Sem sexo ou IG ao nascer fora da referência")
+
         # Distribuição de Apgar
         st.markdown("---")
         st.markdown("**Distribuição de Apgar 5º minuto**")
 
-        apgar_dist = recem_nascidos['apgar_5min'].value_counts().sort_index()
-
-        fig_apgar = px.bar(
-            x=apgar_dist.index,
-            y=apgar_dist.values,
-            color=apgar_dist.index,
-            color_continuous_scale='RdYlGn'
-        )
-        fig_apgar.update_layout(
-            xaxis_title="Apgar 5º minuto",
-            yaxis_title="Quantidade",
-            showlegend=False,
-            margin=dict(t=0, b=0)
+        plotly_chart_cache(
+            'relatorios_apgar', ('recem_nascidos',),
+            lambda: _figura_apgar(recem_nascidos), use_container_width=True
         )
-        st.plotly_chart(fig_apgar, use_container_width=True)
 
     # ========================================================================
     # TAB: EXPORTAR DADOS
@@ -396,7 +334,7 @@ def render():
 
             with pd.ExcelWriter(output, engine='openpyxl') as writer:
                 if exp_pacientes:
-                    df_pac = pacientes.copy()
+                    df_pac = pacientes.drop(columns=['nome_normalizado'])
                     if anonimizar:
                         df_pac['nome'] = df_pac['nome'].apply(lambda x: x.split()[0] + ' ***')
                         df_pac['cpf'] = '***.***.***-**'
@@ -439,6 +377,21 @@ def render():
 
         st.markdown("---")
 
+        # Prontuários completos em PDF, gerados em segundo plano
+        st.markdown("### 🖨️ Prontuários em PDF")
+
+        col_pdf1, col_pdf2 = st.columns([1, 2])
+        with col_pdf1:
+            dia_altas = st.date_input("Altas do dia", value=datetime.now(), key="impressao_dia_altas")
+            if st.button("🖨️ Imprimir prontuários das altas"):
+                imprimir_altas_do_dia(dia_altas)
+
+        with col_pdf2:
+            ativos = any(t['fim'] is None for t in listar_trabalhos())
+            st.fragment(_trabalhos_impressao, run_every=2 if ativos else None)(ativos)
+
+        st.markdown("---")
+
         # Relatórios pré-definidos
         st.markdown("### 📄 Relatórios Pré-definidos")
 
@@ -455,3 +408,140 @@ def render():
         with col_rel3:
             if st.button("🏥 Censo Hospitalar"):
                 st.info("Gerando censo hospitalar...")
+
+
+# ============================================================================
+# IMPRESSÃO DE PRONTUÁRIOS
+# ============================================================================
+
+def _trabalhos_impressao(acompanhando: bool = False):
+    """Andamento dos trabalhos de impressão (atualizado sozinho enquanto houver trabalho ativo)."""
+    trabalhos = listar_trabalhos()
+    # Tudo terminou: uma execução completa desliga a atualização periódica
+    if acompanhando and all(t['fim'] is not None for t in trabalhos):
+        st.rerun(scope="app")
+    if not trabalhos:
+        st.caption("Nenhuma impressão solicitada nesta execução.")
+        return
+    for trabalho in trabalhos[:10]:
+        andamento_impressao(trabalho, key=f"impressao_download_{trabalho['id']}")
+
+
+# ============================================================================
+# GRÁFICOS
+# ============================================================================
+
+def _figura_tendencia():
+    # Simular dados semanais
+    semanas = pd.date_range(end=datetime.now(), periods=12, freq='W')
+    partos_semana = [15 + i % 5 for i in range(12)]
+
+    fig_tendencia = px.line(
+        x=semanas,
+        y=partos_semana,
+        markers=True,
+        color_discrete_sequence=['#E91E63']
+    )
+    fig_tendencia.update_layout(
+        xaxis_title="Semana",
+        yaxis_title="Partos",
+        margin=dict(t=0, b=0)
+    )
+    return fig_tendencia
+
+
+def _figura_taxa_cesarea():
+    meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'][:datetime.now().month]
+    taxas = [55, 52, 48, 50, 47, 45, 48, 52, 50, 48, 46, 45][:datetime.now().month]
+
+    fig_taxa = px.bar(
+        x=meses,
+        y=taxas,
+        color_discrete_sequence=['#2196F3']
+    )
+    fig_taxa.add_hline(y=55, line_dash="dash", line_color="red", annotation_text="Meta OMS: 15%")
+    fig_taxa.update_layout(
+        xaxis_title="Mês",
+        yaxis_title="Taxa (%)",
+        margin=dict(t=0, b=0)
+    )
+    return fig_taxa
+
+
+def _figura_convenios(producao_convenio):
+    fig_conv = px.pie(
+        producao_convenio,
+        values='Quantidade',
+        names='convenio',
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig_conv.update_layout(margin=dict(t=0, b=0))
+    return fig_conv
+
+
+def _figura_producao_diaria():
+    # Simular dados diários
+    dias = pd.date_range(start=datetime.now() - timedelta(days=30), end=datetime.now(), freq='D')
+    producao_diaria = pd.DataFrame({
+        'Data': dias,
+        'Partos': [2 + i % 4 for i in range(len(dias))],
+        'Internações': [3 + i % 5 for i in range(len(dias))],
+        'Altas': [2 + i % 4 for i in range(len(dias))]
+    })
+
+    fig_diario = px.line(
+        producao_diaria,
+        x='Data',
+        y=['Partos', 'Internações', 'Altas'],
+        color_discrete_map={'Partos': '#E91E63', 'Internações': '#2196F3', 'Altas': '#4CAF50'}
+    )
+    fig_diario.update_layout(margin=dict(t=0, b=0))
+    return fig_diario
+
+
+def _figura_radar():
+    categorias = ['Cesárea', 'Episiotomia', 'Indução', 'Aleitamento', 'Pele-a-pele', 'Parto Humanizado']
+    valores = [48, 15, 22, 85, 90, 75]
+    metas = [15, 10, 25, 90, 95, 80]
+
+    fig_radar = go.Figure()
+
+    fig_radar.add_trace(go.Scatterpolar(
+        r=valores,
+        theta=categorias,
+        fill='toself',
+        name='Resultado'
+    ))
+
+    fig_radar.add_trace(go.Scatterpolar(
+        r=metas,
+        theta=categorias,
+        fill='toself',
+        name='Meta',
+        opacity=0.3
+    ))
+
+    fig_radar.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+        showlegend=True,
+        margin=dict(t=30, b=30)
+    )
+    return fig_radar
+
+
+def _figura_apgar(recem_nascidos):
+    apgar_dist = contagem_por_valor(recem_nascidos['apgar_5min'], categorias=range(0, 11))
+
+    fig_apgar = px.bar(
+        x=apgar_dist.index,
+        y=apgar_dist.values,
+        color=apgar_dist.index,
+        color_continuous_scale='RdYlGn'
+    )
+    fig_apgar.update_layout(
+        xaxis_title="Apgar 5º minuto",
+        yaxis_title="Quantidade",
+        showlegend=False,
+        margin=dict(t=0, b=0)
+    )
+    return fig_apgar
@@ -13,8 +13,40 @@ if parent_dir not in sys.path:
 # Agora importa os dados
 from dados import (
     get_dados,
+    get_versao,
+    adicionar_paciente,
     atualizar_paciente,
+    buscar_pacientes,
+    consultar_pacientes,
+    STATUS_INTERNADAS,
+    listar_pacientes,
     adicionar_evolucao,
+    get_evolucoes_paciente,
+    contar_evolucoes_paciente,
+    get_exames_paciente,
+    contar_exames_paciente,
+    exames_paciente_por_tipo,
+    sinais_vitais_paciente,
+    buscar_evolucoes,
+    get_meows,
+    meows_paciente,
+    get_resultados_exames,
+    resultados_exames_paciente,
+    resultados_alterados,
+    URGENCIAS_EXAME,
+    fila_exames_pendentes,
+    contar_exames_pendentes,
+    solicitar_exame,
+    concluir_exame,
+    get_parto,
+    recem_nascidos_do_parto,
+    partos_no_periodo,
+    contar_partos_periodo,
+    listar_recem_nascidos,
+    get_robson,
+    resumo_robson,
+    get_crescimento_rns,
+    crescimento_rns,
     get_medicos,
     adicionar_medico,
     atualizar_medico,
@@ -22,15 +54,59 @@ from dados import (
     reativar_medico,
     get_medico_por_id
 )
+from indices import normalizar_texto, normalizar_serie
+from duplicatas import sugerir_duplicatas
+from clinico import referencia_analito
+from impressao import imprimir_prontuarios, imprimir_altas_do_dia, status_trabalho, listar_trabalhos
 
 __all__ = [
     'get_dados',
+    'get_versao',
+    'adicionar_paciente',
     'atualizar_paciente',
+    'buscar_pacientes',
+    'consultar_pacientes',
+    'STATUS_INTERNADAS',
+    'listar_pacientes',
     'adicionar_evolucao',
+    'get_evolucoes_paciente',
+    'contar_evolucoes_paciente',
+    'get_exames_paciente',
+    'contar_exames_paciente',
+    'exames_paciente_por_tipo',
+    'sinais_vitais_paciente',
+    'buscar_evolucoes',
+    'get_meows',
+    'meows_paciente',
+    'get_resultados_exames',
+    'resultados_exames_paciente',
+    'resultados_alterados',
+    'URGENCIAS_EXAME',
+    'fila_exames_pendentes',
+    'contar_exames_pendentes',
+    'solicitar_exame',
+    'concluir_exame',
+    'get_parto',
+    'recem_nascidos_do_parto',
+    'partos_no_periodo',
+    'contar_partos_periodo',
+    'listar_recem_nascidos',
+    'get_robson',
+    'resumo_robson',
+    'get_crescimento_rns',
+    'crescimento_rns',
     'get_medicos',
     'adicionar_medico',
     'atualizar_medico',
     'remover_medico',
     'reativar_medico',
-    'get_medico_por_id'
+    'get_medico_por_id',
+    'normalizar_texto',
+    'normalizar_serie',
+    'sugerir_duplicatas',
+    'referencia_analito',
+    'imprimir_prontuarios',
+    'imprimir_altas_do_dia',
+    'status_trabalho',
+    'listar_trabalhos'
 ]